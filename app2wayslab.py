@@ -1,14 +1,23 @@
+import contextlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
 import streamlit as st
-import matplotlib
-
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import math
-import io
-import base64
 import streamlit.components.v1 as components
 
+from twowayslab import BAR_INFO, CASE_DESC, DESIGN_FIELDS, calculate_min_thickness, render_section
+from twowayslab.cli import parse_combinations
+from twowayslab.optimize import optimize_slab
+from twowayslab.pipeline import DesignGraph
+from twowayslab.sweep import SWEEP_PARAMS, governing, sweep
+from twowayslab.tracing import Tracer, span
+
+# Max entries kept per memoized stage (LRU); bounds memory on long-lived servers
+CACHE_ENTRIES = int(os.environ.get("TWOWAYSLAB_CACHE_ENTRIES", "64"))
+
 # ==========================================
 # 1. SETUP & CSS
 # ==========================================
@@ -38,422 +47,177 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ==========================================
-# 2. DATABASE & CONSTANTS
-# ==========================================
-CASE_DESC = {
-    1: "All Continuous", 2: "Short Discontinuous", 3: "Long Discontinuous",
-    4: "2 Short + 1 Long Discont.", 5: "2 Long + 1 Short Discont.", 6: "2 Adjacent Discont.",
-    7: "1 Short Discont.", 8: "1 Long Discont.", 9: "All Discontinuous"
-}
-
-ACI_COEFFICIENTS = {
-    1: {1.00: [0.033, 0.018, 0.027, 0.033, 0.018, 0.027], 0.95: [0.036, 0.020, 0.030, 0.033, 0.017, 0.026],
-        0.90: [0.040, 0.023, 0.032, 0.033, 0.016, 0.025], 0.85: [0.045, 0.025, 0.035, 0.033, 0.015, 0.024],
-        0.80: [0.050, 0.028, 0.039, 0.033, 0.014, 0.022], 0.75: [0.056, 0.031, 0.043, 0.033, 0.013, 0.021],
-        0.70: [0.063, 0.035, 0.047, 0.033, 0.012, 0.019], 0.65: [0.070, 0.038, 0.052, 0.033, 0.011, 0.017],
-        0.60: [0.077, 0.042, 0.057, 0.033, 0.010, 0.016], 0.55: [0.084, 0.045, 0.062, 0.033, 0.009, 0.014],
-        0.50: [0.091, 0.049, 0.068, 0.033, 0.008, 0.012]},
-    2: {1.00: [0.041, 0.021, 0.031, 0.041, 0.021, 0.031], 0.90: [0.048, 0.026, 0.036, 0.037, 0.018, 0.027],
-        0.80: [0.058, 0.031, 0.042, 0.032, 0.015, 0.023], 0.70: [0.070, 0.037, 0.050, 0.027, 0.012, 0.019],
-        0.60: [0.083, 0.044, 0.059, 0.022, 0.009, 0.015], 0.50: [0.097, 0.051, 0.069, 0.017, 0.007, 0.011]},
-    3: {1.00: [0.041, 0.021, 0.031, 0.041, 0.021, 0.031], 0.90: [0.040, 0.021, 0.030, 0.045, 0.023, 0.034],
-        0.80: [0.039, 0.020, 0.029, 0.051, 0.025, 0.037], 0.70: [0.036, 0.019, 0.027, 0.057, 0.028, 0.041],
-        0.60: [0.033, 0.017, 0.024, 0.065, 0.031, 0.046], 0.50: [0.029, 0.015, 0.022, 0.074, 0.035, 0.052]},
-    4: {1.00: [0.049, 0.025, 0.036, 0.048, 0.025, 0.036], 0.90: [0.057, 0.030, 0.041, 0.044, 0.022, 0.032],
-        0.80: [0.067, 0.035, 0.048, 0.038, 0.018, 0.027], 0.70: [0.078, 0.041, 0.056, 0.032, 0.015, 0.022],
-        0.60: [0.090, 0.048, 0.065, 0.025, 0.011, 0.017], 0.50: [0.103, 0.055, 0.074, 0.019, 0.008, 0.012]},
-    5: {1.00: [0.048, 0.025, 0.036, 0.049, 0.025, 0.036], 0.90: [0.048, 0.024, 0.035, 0.055, 0.028, 0.040],
-        0.80: [0.046, 0.023, 0.033, 0.062, 0.031, 0.045], 0.70: [0.044, 0.022, 0.031, 0.071, 0.035, 0.051],
-        0.60: [0.040, 0.020, 0.028, 0.081, 0.040, 0.058], 0.50: [0.036, 0.018, 0.025, 0.092, 0.045, 0.065]},
-    6: {1.00: [0.048, 0.025, 0.036, 0.048, 0.025, 0.036], 0.90: [0.055, 0.029, 0.041, 0.044, 0.022, 0.032],
-        0.80: [0.063, 0.033, 0.047, 0.039, 0.019, 0.027], 0.70: [0.074, 0.039, 0.054, 0.033, 0.016, 0.023],
-        0.60: [0.086, 0.045, 0.063, 0.027, 0.012, 0.018], 0.50: [0.099, 0.052, 0.072, 0.021, 0.009, 0.013]},
-    7: {1.00: [0.041, 0.021, 0.031, 0.041, 0.021, 0.031], 0.90: [0.045, 0.024, 0.034, 0.039, 0.020, 0.028],
-        0.80: [0.051, 0.027, 0.038, 0.036, 0.017, 0.025], 0.70: [0.058, 0.031, 0.043, 0.032, 0.015, 0.021],
-        0.60: [0.066, 0.036, 0.049, 0.028, 0.012, 0.018], 0.50: [0.074, 0.040, 0.055, 0.024, 0.010, 0.014]},
-    8: {1.00: [0.041, 0.021, 0.031, 0.041, 0.021, 0.031], 0.90: [0.043, 0.022, 0.032, 0.044, 0.023, 0.033],
-        0.80: [0.045, 0.023, 0.033, 0.048, 0.024, 0.035], 0.70: [0.047, 0.024, 0.035, 0.052, 0.026, 0.038],
-        0.60: [0.050, 0.025, 0.037, 0.057, 0.028, 0.042], 0.50: [0.053, 0.027, 0.039, 0.063, 0.031, 0.046]},
-    9: {1.00: [0.057, 0.029, 0.041, 0.057, 0.029, 0.041], 0.90: [0.064, 0.033, 0.046, 0.053, 0.027, 0.037],
-        0.80: [0.072, 0.037, 0.052, 0.048, 0.024, 0.033], 0.70: [0.082, 0.043, 0.059, 0.042, 0.020, 0.028],
-        0.60: [0.093, 0.049, 0.067, 0.036, 0.017, 0.022], 0.50: [0.106, 0.056, 0.076, 0.029, 0.013, 0.017]}
-}
-
-BAR_INFO = {
-    'RB6': {'A_cm2': 0.283, 'd_mm': 6},
-    'RB9': {'A_cm2': 0.636, 'd_mm': 9},
-    'DB10': {'A_cm2': 0.785, 'd_mm': 10},
-    'DB12': {'A_cm2': 1.131, 'd_mm': 12},
-    'DB16': {'A_cm2': 2.011, 'd_mm': 16}
-}
-
-
-# ==========================================
-# 3. HELPER FUNCTIONS
+# 2. CACHED PIPELINE
 # ==========================================
-def fmt(n, digits=2):
-    try:
-        val = float(n)
-        if math.isnan(val): return "-"
-        return f"{val:,.{digits}f}"
-    except:
-        return "-"
-
-
-def get_coefficients(case_num, m):
-    m = max(0.5, min(1.0, m))
-    table = ACI_COEFFICIENTS[case_num]
-    if m in table: return table[m]
-
-    sorted_keys = sorted(table.keys())
-    m1 = 0.5;
-    m2 = 1.0
-    for k in sorted_keys:
-        if k <= m: m1 = k
-        if k >= m: m2 = k; break
-    if m1 == m2: return table[m1]
-
-    vals1 = table[m1];
-    vals2 = table[m2]
-    interp_vals = []
-    ratio = (m - m1) / (m2 - m1)
-    for v1, v2 in zip(vals1, vals2):
-        interp_vals.append(v1 + (v2 - v1) * ratio)
-    return interp_vals
-
-
-def fig_to_base64(fig):
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight')
-    buf.seek(0)
-    plt.close(fig)
-    return f"data:image/png;base64,{base64.b64encode(buf.read()).decode()}"
-
-
-# --- NEW FUNCTION: Auto Calc Thickness ---
-def calculate_min_thickness(Lx_m, Ly_m, fy_ksc, beam_w_m=0.3):
+# The session's DesignGraph is updated with the form inputs on every run.
+# Recent reports are memoized on their normalized inputs, so switching back
+# to a design costs nothing; a miss reads the graph, where each stage
+# (loads, moments, reinforcement, drawing, HTML, ...) reruns only when one
+# of its declared inputs changed, e.g. editing the project name only
+# rebuilds the HTML. Drawings are additionally memoized on what is
+# actually drawn (cover is not).
+def design_key(inputs):
+    """Normalized engineering inputs (DESIGN_FIELDS order) used as the cache key."""
+    return tuple(int(inputs[k]) if k == 'case' else str(inputs[k]) if k == 'bar' else float(inputs[k])
+                 for k in DESIGN_FIELDS)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def cached_drawing(h, bar, spacings, Lx, backend):
+    res_sum = dict(zip(('s_a_neg', 's_a_pos', 's_b_neg', 's_b_pos'), spacings))
+    return render_section(h, None, bar, res_sum, Lx, backend=backend)
+
+
+def render_cached(h, cover, bar, res_sum, Lx, backend="svg"):
+    spacings = (res_sum['s_a_neg'], res_sum['s_a_pos'], res_sum['s_b_neg'], res_sum['s_b_pos'])
+    return cached_drawing(h, bar, spacings, Lx, backend)
+
+
+def design_graph(inputs, backend, combinations=None):
+    """The session's DesignGraph, updated to `inputs`. Raises ValueError for invalid inputs."""
+    graph = st.session_state.get('graph')
+    if graph is None:
+        graph = st.session_state.graph = DesignGraph(inputs, backend=backend, render=render_cached,
+                                                     combinations=combinations)
+    else:
+        graph.update(backend=backend, combinations=combinations, **inputs)
+    return graph
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def cached_report(key, project, slab_id, engineer, backend, combinations, _graph):
     """
-    Calculate min thickness based on ACI 318 for Two-Way Slabs with Beams (alpha_m >= 2.0).
-    Formula: h = Ln * (0.8 + fy/14000) / (36 + 9*beta)
-    fy in ksc
+    HTML report of these inputs (combinations as a tuple of items, or None).
+    `_graph` (not hashed) must already hold exactly them; reading its html
+    only fills the graph's own stage values.
     """
-    # Ensure Ly is long span
-    long_span = max(Lx_m, Ly_m)
-    short_span = min(Lx_m, Ly_m)
-
-    # Clear spans (Approximate by subtracting beam width)
-    ln = long_span - beam_w_m
-    sn = short_span - beam_w_m
-
-    if ln <= 0 or sn <= 0: return 10.0  # Fallback
-
-    beta = ln / sn
-
-    # ACI Formula Metric Equivalent (fy in ksc)
-    # Factor (0.8 + fy/14000) comes from (0.8 + fy_psi/200000)
-    numerator = ln * (0.8 + (fy_ksc / 14000))
-    denominator = 36 + (9 * beta)
-
-    h_m = numerator / denominator
-    h_cm = h_m * 100
-
-    # Check minimum 9cm per ACI
-    h_final = max(h_cm, 9.0)
-
-    # Round up to nearest 0.5 cm
-    h_final = math.ceil(h_final * 2) / 2
-    return h_final
+    return _graph.html
 
 
 # ==========================================
-# 4. PLOTTING FUNCTION
+# 3. PARAMETRIC SWEEP
 # ==========================================
-def plot_twoway_section_detailed(h_cm, cover_cm, bar_name, res_sum, Lx_val):
-    fig, ax = plt.subplots(figsize=(10, 5))
-    beam_w = 0.30;
-    beam_d = 0.50;
-    slab_span = 2.5
-
-    slab_h_draw = 0.25  # Schematic drawing height (fixed)
-
-    # --- 1. Structure ---
-    # Beams
-    ax.add_patch(
-        patches.Rectangle((-beam_w, -beam_d), beam_w, beam_d, facecolor='white', edgecolor='black', linewidth=1.5))
-    ax.add_patch(
-        patches.Rectangle((slab_span, -beam_d), beam_w, beam_d, facecolor='white', edgecolor='black', linewidth=1.5))
-    # Slab
-    ax.add_patch(patches.Rectangle((0, -slab_h_draw), slab_span, slab_h_draw, facecolor='#f9f9f9', edgecolor='black',
-                                   linewidth=1.5))
-
-    pad = 0.04
-
-    # --- 2. Short Span Bars (Lines) ---
-    bar_y_top = -pad
-    bar_y_bot = -slab_h_draw + pad
-    top_len = slab_span * 0.25
-
-    # Short Neg (Top Line)
-    ax.plot([-beam_w + 0.05, -beam_w + 0.05, top_len], [-beam_d / 2, bar_y_top, bar_y_top], color='blue',
-            linewidth=2.5)  # Left
-    ax.plot([slab_span + beam_w - 0.05, slab_span + beam_w - 0.05, slab_span - top_len],
-            [-beam_d / 2, bar_y_top, bar_y_top], color='blue', linewidth=2.5)  # Right
-
-    # Short Pos (Bot Line)
-    ax.plot([0.1, slab_span - 0.1], [bar_y_bot, bar_y_bot], color='blue', linewidth=2.5)
-    ax.plot([0.1, 0.1], [bar_y_bot, bar_y_bot + 0.06], color='blue', linewidth=2.5)  # Hook
-    ax.plot([slab_span - 0.1, slab_span - 0.1], [bar_y_bot, bar_y_bot + 0.06], color='blue', linewidth=2.5)  # Hook
-
-    # --- 3. Long Span Bars (Dots) ---
-    dot_y_top = bar_y_top - 0.025
-    dot_y_bot = bar_y_bot + 0.025
-
-    # Long Neg (Top Dots)
-    for x in [0, 0.15, slab_span, slab_span - 0.15]:
-        ax.add_patch(patches.Circle((x, dot_y_top), radius=0.02, color='red'))
-
-    # Long Pos (Bot Dots)
-    for i in range(1, 8):
-        ax.add_patch(patches.Circle((slab_span / 8 * i, dot_y_bot), radius=0.02, color='red'))
-
-    # --- 4. Dimensions & Annotations ---
-    # Dimension: Thickness (h)
-    ax.annotate("", xy=(slab_span + beam_w + 0.1, -slab_h_draw), xytext=(slab_span + beam_w + 0.1, 0),
-                arrowprops=dict(arrowstyle='<->', linewidth=0.8))
-    ax.text(slab_span + beam_w + 0.15, -slab_h_draw / 2, f"h = {h_cm / 100:.2f} m", va='center', rotation=90)
-
-    # Dimension: Span (L)
-    ax.annotate("", xy=(0, -beam_d - 0.1), xytext=(slab_span, -beam_d - 0.1),
-                arrowprops=dict(arrowstyle='<->', linewidth=0.8))
-    ax.text(slab_span / 2, -beam_d - 0.2, f"L = {Lx_val:.2f} m", ha='center', fontweight='bold')
-
-    # --- 5. Labels ---
-    # Short Span (Neg/Top)
-    txt_short_neg = f"Short(Top): {bar_name}@{res_sum['s_a_neg']:.0f}cm"
-    ax.annotate(txt_short_neg, xy=(top_len / 2, bar_y_top), xytext=(top_len, 0.4),
-                arrowprops=dict(arrowstyle='->', connectionstyle="angle,angleA=0,angleB=90,rad=10", color='blue'),
-                fontsize=9, color='blue', fontweight='bold',
-                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="blue", alpha=0.9))
-
-    # Long Span (Neg/Top)
-    txt_long_neg = f"Long(Top): {bar_name}@{res_sum['s_b_neg']:.0f}cm"
-    ax.annotate(txt_long_neg, xy=(0.15, dot_y_top), xytext=(0.5, 0.2),
-                arrowprops=dict(arrowstyle='->', color='red'),
-                fontsize=9, color='red', fontweight='bold',
-                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="red", alpha=0.9))
-
-    # Short Span (Pos/Bot)
-    txt_short_pos = f"Short(Bot): {bar_name}@{res_sum['s_a_pos']:.0f}cm"
-    ax.annotate(txt_short_pos, xy=(slab_span / 2, bar_y_bot), xytext=(slab_span / 2, -0.6),
-                arrowprops=dict(arrowstyle='->', color='blue'),
-                fontsize=9, ha='center', color='blue', fontweight='bold',
-                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="blue", alpha=0.9))
-
-    # Long Span (Pos/Bot)
-    txt_long_pos = f"Long(Bot): {bar_name}@{res_sum['s_b_pos']:.0f}cm"
-    ax.annotate(txt_long_pos, xy=(slab_span / 2 + 0.3, dot_y_bot), xytext=(slab_span / 2 + 0.6, -0.4),
-                arrowprops=dict(arrowstyle='->', color='red'),
-                fontsize=9, color='red', fontweight='bold',
-                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="red", alpha=0.9))
-
-    ax.axis('off')
-    ax.set_ylim(-1.0, 0.6)
-    ax.set_xlim(-0.5, slab_span + 0.8)
-    plt.tight_layout()
-    return fig
-
-
-# ==========================================
-# 5. CALCULATION LOGIC
-# ==========================================
-def calculate_detailed(inputs):
-    rows = []
-
-    def sec(title):
-        rows.append(["SECTION", title, "", "", "", ""])
-
-    def row(item, form, subst, res, unit, stat=""):
-        rows.append([item, form, subst, res, unit, stat])
-
-    Lx = inputs['Lx'];
-    Ly = inputs['Ly'];
-    h = inputs['h'];
-    cov = inputs['cover']
-    fc = inputs['fc'];
-    fy = inputs['fy'];
-    bar_name = inputs['bar']
-    Ab = BAR_INFO[bar_name]['A_cm2']
-
-    # 1. Geometry
-    sec("1. GEOMETRY & LOADS")
-    m = Lx / Ly
-    row("Short Span", "Lx", "-", f"{Lx:.2f}", "m")
-    row("Long Span", "Ly", "-", f"{Ly:.2f}", "m")
-    row("Ratio m", "Lx / Ly", f"{Lx:.2f} / {Ly:.2f}", f"{m:.2f}", "-", "OK" if m >= 0.5 else "WARN")
-
-    w_sw = 2400 * (h / 100);
-    w_dl = w_sw + inputs['sdl'];
-    w_ll = inputs['ll']
-    wu = 1.4 * w_dl + 1.7 * w_ll
-    row("Dead Load", "SW + SDL", f"{w_sw:.0f} + {inputs['sdl']}", f"{w_dl:.0f}", "kg/m²")
-    row("Factored Load", "1.4DL + 1.7LL", f"1.4({w_dl:.0f}) + 1.7({w_ll})", f"{wu:.0f}", "kg/m²")
-
-    # 2. Moments & Design
-    case_id = inputs['case']
-    sec(f"2. MOMENT & REINF. (CASE {case_id}: {CASE_DESC[case_id]})")
-    coefs = get_coefficients(case_id, m)
-
-    db = BAR_INFO[bar_name]['d_mm']
-    d_short = h - cov - db / 20
-    d_long = d_short - db / 10
-    S = Lx
-
-    def calc_As_Spacing(Mu_val, d_val):
-        Mu_kgcm = Mu_val * 100
-        Rn = Mu_kgcm / (0.9 * 100 * d_val ** 2)
-        try:
-            rho = (0.85 * fc / fy) * (1 - math.sqrt(1 - (2 * Rn) / (0.85 * fc)))
-        except:
-            rho = 0.002
-        As_req = max(rho * 100 * d_val, 0.0018 * 100 * h)
-        s = (Ab * 100) / As_req
-        s_final = math.floor(min(s, 3 * h, 45) * 2) / 2
-        return As_req, s, s_final
-
-    # --- Short Neg ---
-    Ma_neg = coefs[0] * wu * S ** 2
-    As_a_neg, _, s_a_neg = calc_As_Spacing(Ma_neg, d_short)
-    row("Ma (Neg)", "Ca_neg · wu · Lx²", f"{coefs[0]:.3f}·{wu:.0f}·{S}²", f"{Ma_neg:.2f}", "kg-m")
-    row("As (Short-Neg)", "Calc", f"d={d_short:.2f}", f"{As_a_neg:.2f}", "cm²")
-    row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{s_a_neg:.1f}", "cm", "OK")
-
-    # --- Short Pos ---
-    Ma_pos = (coefs[1] * 1.4 * w_dl * S ** 2) + (coefs[2] * 1.7 * w_ll * S ** 2)
-    As_a_pos, _, s_a_pos = calc_As_Spacing(Ma_pos, d_short)
-    row("Ma (Pos)", "Ca_dl·D + Ca_ll·L", "-", f"{Ma_pos:.2f}", "kg-m")
-    row("As (Short-Pos)", "Calc", f"d={d_short:.2f}", f"{As_a_pos:.2f}", "cm²")
-    row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{s_a_pos:.1f}", "cm", "OK")
-
-    # --- Long Neg ---
-    Mb_neg = coefs[3] * wu * S ** 2
-    As_b_neg, _, s_b_neg = calc_As_Spacing(Mb_neg, d_long)
-    row("Mb (Neg)", "Cb_neg · wu · Lx²", f"{coefs[3]:.3f}·{wu:.0f}·{S}²", f"{Mb_neg:.2f}", "kg-m")
-    row("As (Long-Neg)", "Calc", f"d={d_long:.2f}", f"{As_b_neg:.2f}", "cm²")
-    row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{s_b_neg:.1f}", "cm", "OK")
-
-    # --- Long Pos ---
-    Mb_pos = (coefs[4] * 1.4 * w_dl * S ** 2) + (coefs[5] * 1.7 * w_ll * S ** 2)
-    As_b_pos, _, s_b_pos = calc_As_Spacing(Mb_pos, d_long)
-    row("Mb (Pos)", "Cb_dl·D + Cb_ll·L", "-", f"{Mb_pos:.2f}", "kg-m")
-    row("As (Long-Pos)", "Calc", f"d={d_long:.2f}", f"{As_b_pos:.2f}", "cm²")
-    row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{s_b_pos:.1f}", "cm", "OK")
-
-    res_sum = {'s_a_neg': s_a_neg, 's_a_pos': s_a_pos, 's_b_neg': s_b_neg, 's_b_pos': s_b_pos}
-
-    sec("3. CHECK SHEAR")
-    Vu = wu * Lx / 3
-    Vc = 0.53 * math.sqrt(fc) * 100 * d_short
-    phiVc = 0.85 * Vc
-    status = "PASS" if phiVc >= Vu else "FAIL"
-    row("Shear Check", "φVc ≥ Vu", f"{fmt(phiVc)} ≥ {fmt(Vu)}", status, "kg", status)
-
-    return rows, res_sum
+# Slider limits and default range per swept input
+SWEEP_RANGES = {
+    'm': (0.3, 1.0, (0.5, 1.0)), 'Lx': (1.0, 10.0, (2.0, 6.0)), 'Ly': (1.0, 12.0, (3.0, 8.0)),
+    'h': (6.0, 40.0, (10.0, 25.0)), 'cover': (1.0, 6.0, (2.0, 4.0)), 'sdl': (0.0, 1000.0, (50.0, 400.0)),
+    'll': (0.0, 2000.0, (100.0, 800.0)), 'fc': (150.0, 500.0, (180.0, 350.0)), 'fy': (2000.0, 6000.0, (2400.0, 5000.0)),
+}
+SWEEP_OUTPUTS = {
+    's_min': "Spacing, governing (cm)", 'As_max': "Required As, governing (cm²/m)",
+    'shear_margin': "Shear margin φVc/Vu − 1",
+    's_a_neg': "Spacing short span, top (cm)", 's_a_pos': "Spacing short span, bottom (cm)",
+    's_b_neg': "Spacing long span, top (cm)", 's_b_pos': "Spacing long span, bottom (cm)",
+    'As_a_neg': "As short span, top (cm²/m)", 'As_a_pos': "As short span, bottom (cm²/m)",
+    'As_b_neg': "As long span, top (cm²/m)", 'As_b_pos': "As long span, bottom (cm²/m)",
+}
 
 
-# ==========================================
-# 6. HTML REPORT
-# ==========================================
-def generate_html_report(inputs, rows, img_base64, res_sum):
-    table_rows = ""
-    for r in rows:
-        if r[0] == "SECTION":
-            table_rows += f"<tr style='background-color:#ddd; font-weight:bold;'><td colspan='6'>{r[1]}</td></tr>"
-        else:
-            status_class = "pass-ok"
-            if r[5] == "FAIL":
-                status_class = "pass-no"
-            elif "WARN" in r[5]:
-                status_class = "pass-warn"
-            bg = "background-color:#f9fbe7;" if "Spacing" in r[0] else ""
-            table_rows += f"<tr style='{bg}'><td>{r[0]}</td><td>{r[1]}</td><td>{r[2]}</td><td style='color:#D32F2F; font-weight:bold;'>{r[3]}</td><td>{r[4]}</td><td class='{status_class}'>{r[5]}</td></tr>"
-
-    html = f"""
-    <!DOCTYPE html>
-    <html lang="th">
-    <head>
-        <link href="https://fonts.googleapis.com/css2?family=Sarabun:wght@400;700&display=swap" rel="stylesheet">
-        <style>
-            body {{ font-family: 'Sarabun', sans-serif; padding: 20px; }}
-            .report-table {{ width: 100%; border-collapse: collapse; font-size: 14px; margin-top: 20px; }}
-            .report-table th, .report-table td {{ border: 1px solid #444; padding: 8px; }}
-            .report-table th {{ background-color: #eee; text-align: center; }}
-            .pass-ok {{ color: green; font-weight: bold; }}
-            .pass-no {{ color: red; font-weight: bold; }}
-            @media print {{ .no-print {{ display: none !important; }} }}
-        </style>
-    </head>
-    <body>
-        <div class="no-print" style="text-align: center; margin-bottom: 20px;">
-            <button onclick="window.print()" style="background-color: #4CAF50; border: none; color: white; padding: 12px 24px; display: inline-flex; align-items: center; gap: 8px; font-size: 16px; cursor: pointer; border-radius: 5px; font-family: 'Sarabun'; font-weight: bold;">
-                🖨️ Print This Page / พิมพ์หน้านี้
-            </button>
-        </div>
-
-        <div style="border-bottom: 2px solid #333; padding-bottom: 10px; margin-bottom: 20px; position: relative;">
-            <div style="position: absolute; top:0; right:0; border: 2px solid #000; padding: 5px 15px; font-weight: bold;">{inputs['slab_id']}</div>
-            <h1 style="text-align:center; margin:0;">ENGINEERING DESIGN REPORT</h1>
-            <h3 style="text-align:center; margin:5px;">RC Two-Way Slab Design (ACI Method 2)</h3>
-        </div>
-
-        <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px; margin-bottom: 20px;">
-            <div style="border: 1px solid #ddd; padding: 10px;">
-                <strong>Project:</strong> {inputs['project']}<br>
-                <strong>Engineer:</strong> {inputs['engineer']}<br>
-                <strong>Date:</strong> 16/12/2568
-            </div>
-            <div style="border: 1px solid #ddd; padding: 10px;">
-                <strong>Size:</strong> {inputs['Lx']} x {inputs['Ly']} m (Case {inputs['case']})<br>
-                <strong>Thickness:</strong> {inputs['h']} cm (Cover {inputs['cover']} cm)<br>
-                <strong>Materials:</strong> fc'={inputs['fc']}, fy={inputs['fy']} ksc
-            </div>
-        </div>
-
-        <h3 style="text-align:center;">Design Visualization</h3>
-        <div style="text-align:center; border:1px solid #eee; padding:10px;">
-            <img src="{img_base64}" style="max-width:90%; height:auto;" />
-        </div>
-
-        <h3>Calculation Details</h3>
-        <table class="report-table">
-            <thead>
-                <tr><th width="25%">Item</th><th width="20%">Formula</th><th width="20%">Substitution</th><th width="15%">Result</th><th width="10%">Unit</th><th width="10%">Status</th></tr>
-            </thead>
-            <tbody>{table_rows}</tbody>
-        </table>
-
-        <div style="margin-top: 40px; page-break-inside: avoid;">
-            <h4>Reinforcement Summary (Use {inputs['bar']})</h4>
-            <ul>
-                <li><strong>Short Span (Neg/Top):</strong> @ {res_sum['s_a_neg']:.1f} cm</li>
-                <li><strong>Short Span (Pos/Bot):</strong> @ {res_sum['s_a_pos']:.1f} cm</li>
-                <li><strong>Long Span (Neg/Top):</strong> @ {res_sum['s_b_neg']:.1f} cm</li>
-                <li><strong>Long Span (Pos/Bot):</strong> @ {res_sum['s_b_pos']:.1f} cm</li>
-            </ul>
-            <div style="width: 250px; text-align: center; margin-top: 20px;">
-                <div style="text-align: left; font-weight: bold;">Designed by:</div>
-                <div style="border-bottom: 1px solid #000; margin: 30px 0 5px 0;"></div>
-                <div>({inputs['engineer']})</div>
-                <div>Civil Engineer</div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    return html
+def sweep_axis(label, key, points, exclude=None):
+    names = [n for n in SWEEP_PARAMS if n != exclude and not {n, exclude} <= {'m', 'Ly'}]
+    name = st.selectbox(label, names, format_func=SWEEP_PARAMS.get, key=f"{key}_name",
+                        index=names.index('h') if 'h' in names else 0)
+    if name == 'bar':
+        return name, list(BAR_INFO)
+    lo, hi, default = SWEEP_RANGES[name]
+    a, b = st.slider(SWEEP_PARAMS[name], lo, hi, default, key=f"{key}_{name}")
+    return name, np.linspace(a, b, points)
+
+
+def _axis_encoding(res, axis):
+    name = res[f'{axis}_name']
+    if name == 'bar':
+        return {axis: {'field': axis, 'type': 'ordinal', 'sort': None, 'title': SWEEP_PARAMS[name]}}
+    return {axis: {'field': f'{axis}0', 'type': 'quantitative', 'title': SWEEP_PARAMS[name],
+                   'scale': {'zero': False, 'nice': False}},
+            f'{axis}2': {'field': f'{axis}1'}}
+
+
+def _cell_edges(values):
+    v = np.asarray(values, dtype=float)
+    if len(v) == 1:
+        return v - 0.5, v + 0.5
+    mid = (v[1:] + v[:-1]) / 2
+    return np.r_[v[0] - (mid[0] - v[0]), mid], np.r_[mid, v[-1] + (v[-1] - mid[-1])]
+
+
+def heatmap(res, z, title, nominal=False):
+    """Vega-Lite rect heatmap of a (y, x) array."""
+    X, Y = np.meshgrid(np.arange(len(res['x'])), np.arange(len(res['y'])))
+    data = {'x': res['x'][X.ravel()], 'y': res['y'][Y.ravel()], 'value': np.asarray(z).ravel()}
+    for axis, idx in (('x', X), ('y', Y)):
+        if res[f'{axis}_name'] != 'bar':
+            lo, hi = _cell_edges(res[axis])
+            data[f'{axis}0'], data[f'{axis}1'] = lo[idx.ravel()], hi[idx.ravel()]
+    if nominal:
+        color = {'field': 'value', 'type': 'nominal', 'title': title}
+    elif title == SWEEP_OUTPUTS['shear_margin']:
+        color = {'field': 'value', 'type': 'quantitative', 'title': title,
+                 'scale': {'scheme': 'redblue', 'domainMid': 0}}
+    else:
+        color = {'field': 'value', 'type': 'quantitative', 'title': title, 'scale': {'scheme': 'viridis'}}
+    spec = {'mark': {'type': 'rect'}, 'height': 360,
+            'encoding': {**_axis_encoding(res, 'x'), **_axis_encoding(res, 'y'), 'color': color,
+                         'tooltip': [{'field': 'x', 'title': res['x_name']}, {'field': 'y', 'title': res['y_name']},
+                                     {'field': 'value', 'title': title}]}}
+    st.vega_lite_chart(pd.DataFrame(data), spec, width="stretch")
+
+
+def line_plot(res, key, title):
+    """One line per case of a one-input sweep."""
+    n = len(res['x'])
+    data = pd.DataFrame({'x': np.tile(res['x'], len(res['cases'])), 'case': np.repeat(res['cases'], n).astype(str),
+                         'value': res[key][:, 0, :].ravel()})
+    x_type = 'ordinal' if res['x_name'] == 'bar' else 'quantitative'
+    spec = {'mark': {'type': 'line', 'point': x_type == 'ordinal'}, 'height': 300,
+            'encoding': {'x': {'field': 'x', 'type': x_type, 'sort': None, 'title': SWEEP_PARAMS[res['x_name']],
+                               'scale': {'zero': False}},
+                         'y': {'field': 'value', 'type': 'quantitative', 'title': title},
+                         'color': {'field': 'case', 'type': 'nominal', 'title': "Case"}}}
+    st.vega_lite_chart(data, spec, width="stretch")
+
+
+def sweep_view(base):
+    """Live sweep around the submitted sidebar inputs; every widget change reruns it."""
+    st.subheader("Parametric Sweep")
+    c1, c2, c3 = st.columns(3)
+    with c3:
+        points = st.slider("Grid points per axis", 10, 400, 200, step=10, key="sweep_points")
+        all_cases = st.checkbox("All 9 cases", key="sweep_cases")
+        two_d = st.checkbox("Second input (y)", value=True, key="sweep_2d")
+        output = st.selectbox("Plot", list(SWEEP_OUTPUTS), format_func=SWEEP_OUTPUTS.get, key="sweep_output",
+                              disabled=not two_d)
+    with c1:
+        x = sweep_axis("Vary (x)", "sweep_x", points)
+    with c2:
+        y = sweep_axis("Vary (y)", "sweep_y", points, exclude=x[0]) if two_d else None
+
+    t0 = time.perf_counter()
+    try:
+        res = sweep(base, x, y, cases=sorted(CASE_DESC) if all_cases else None)
+    except ValueError as e:
+        st.error(f"Invalid input: {e}")
+        return
+    ms = (time.perf_counter() - t0) * 1000
+    st.caption(f"{res['s_min'].size:,} designs in {ms:.1f} ms · case {', '.join(map(str, res['cases']))} · "
+               f"other inputs from the sidebar")
+
+    if not two_d:
+        for key in ('As_max', 's_min', 'shear_margin'):
+            line_plot(res, key, SWEEP_OUTPUTS[key])
+    elif all_cases:
+        worst, case_no = governing(res, output)
+        c1, c2 = st.columns(2)
+        with c1:
+            heatmap(res, worst, SWEEP_OUTPUTS[output])
+        with c2:
+            heatmap(res, case_no, "Governing case", nominal=True)
+    else:
+        heatmap(res, res[output][0], SWEEP_OUTPUTS[output])
 
 
 # ==========================================
-# 7. MAIN APP UI
+# 4. MAIN APP UI
 # ==========================================
 st.title("RC Two-Way Slab Design (Report Mode)")
 
@@ -461,6 +225,8 @@ st.title("RC Two-Way Slab Design (Report Mode)")
 if 'h_val' not in st.session_state:
     st.session_state.h_val = 12.0
 
+view = st.sidebar.radio("View", ["Report", "Parametric sweep"], horizontal=True)
+
 with st.sidebar.form("input_form"):
     st.header("Project Info")
     project = st.text_input("Project Name", "อาคารพักอาศัย")
@@ -474,27 +240,11 @@ with st.sidebar.form("input_form"):
 
     # --- AUTO THICKNESS LOGIC ---
     st.markdown("---")
-    if st.form_submit_button("⚡ Auto Calculate Minimum h"):
-        # We need fy from inputs, but inputs are below. Use default or temp logic.
-        # It's cleaner to access widget state if available, but for simplicity:
-        # We will use the values currently in the widget boxes (will reload script)
-        # Note: In a form, we might need to be careful.
-        # Hack: Since this is inside a form, it submits the form.
-        # We calculate h here and update session state.
-
-        # NOTE: Form inputs aren't available in `st.session_state` until submitted.
-        # But `st.form_submit_button` IS a submit action.
-        # We need to capture the current inputs from the widget keys or args.
-        # Streamlit doesn't pass form values until the script reruns.
-        # So we will use the variables Lx, Ly defined above and assume fy=4000 (standard) or read from previous run.
-        # Better approach for Form: Calculation happens AFTER the form block.
-        # But we want to update the 'h' input field.
-
-        # Workaround: Using session state logic outside is better, but to keep UI structure:
-        temp_fy = 4000  # Default if not set
-        calc_h = calculate_min_thickness(Lx, Ly, temp_fy, beam_w_m=0.30)
-        st.session_state.h_val = calc_h
-        st.success(f"Recommended Thickness: {calc_h} cm")
+    # A submit button inside the form: the value is handled after the form,
+    # once fy (further down) has been read.
+    auto_h_btn = st.form_submit_button("⚡ Auto Calculate Minimum h")
+    if 'h_msg' in st.session_state:
+        st.success(st.session_state.pop('h_msg'))
 
     h = st.number_input("Thickness (cm)", value=st.session_state.h_val, min_value=0.0, step=1.0,
                         help="Min req: Perimeter/180 or ACI Eq.")
@@ -512,16 +262,46 @@ with st.sidebar.form("input_form"):
     case = st.selectbox("Case Type (Edge Conditions)", range(1, 10), index=0,
                         format_func=lambda x: f"{x}: {CASE_DESC[x]}")
     bar = st.selectbox("Rebar Size", list(BAR_INFO.keys()), index=1)
+    combo_spec = st.text_input("Load Combinations", "",
+                               help="Empty: 1.4DL + 1.7LL as before. A preset (legacy, aci318) or a list such as "
+                                    "1.4D, 1.2D+1.6L designs for their envelope; append :uniform to a term to "
+                                    "drop pattern loading.")
+    backend = st.radio("Drawing Output", ["svg", "matplotlib"], horizontal=True,
+                       format_func=lambda x: {"svg": "SVG (fast, vector)", "matplotlib": "PNG (matplotlib)"}[x])
+    show_timings = st.checkbox("Show timing panel", help="Wall time, allocations and payload size per stage")
 
     run_btn = st.form_submit_button("Calculate & Preview")
-
-# UPDATE: Because the button "Auto Calculate" is inside the form,
-# it acts as a submit. We need to check if the logic above updated the session state.
-# If the user clicked "Auto Calculate", the script reruns.
-# `st.session_state.h_val` is updated.
-# The `h` widget reads `st.session_state.h_val` and displays the new value.
-
-if run_btn:
+    opt_btn = st.form_submit_button("💰 Optimize h & Bars")
+
+# The `h` widget reads `st.session_state.h_val`, so after updating it the
+# script is rerun to show the new value in the form.
+if auto_h_btn:
+    calc_h = calculate_min_thickness(Lx, Ly, fy, beam_w_m=0.30)
+    st.session_state.h_val = calc_h
+    st.session_state.h_msg = f"Recommended Thickness: {calc_h} cm"
+    st.rerun()
+
+if view == "Parametric sweep":
+    sweep_view({'Lx': Lx, 'Ly': Ly, 'h': h, 'cover': cover, 'sdl': sdl, 'll': ll, 'fc': fc, 'fy': fy,
+                'case': case, 'bar': bar})
+elif opt_btn:
+    if Lx > Ly and Ly > 0:
+        Lx, Ly = Ly, Lx
+    opt = optimize_slab({'Lx': Lx, 'Ly': Ly, 'cover': cover, 'sdl': sdl, 'll': ll, 'fc': fc, 'fy': fy,
+                         'case': case})
+    if not opt['feasible']:
+        st.error("No thickness in the search range passes the spacing and shear checks.")
+    else:
+        st.subheader("Optimized Design (min. concrete + steel cost)")
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Thickness h", f"{opt['h']:.1f} cm")
+        m2.metric("Steel", f"{opt['steel_kg']:.1f} kg")
+        m3.metric("Cost", f"{opt['cost']:,.0f}")
+        st.table([{"Location": label, "Bar": opt[f'bar_{loc}'], "Spacing (cm)": f"{opt[f's_{loc}']:.1f}"}
+                  for label, loc in (("Short Span (Neg/Top)", 'a_neg'), ("Short Span (Pos/Bot)", 'a_pos'),
+                                     ("Long Span (Neg/Top)", 'b_neg'), ("Long Span (Pos/Bot)", 'b_pos'))])
+        st.caption("Concrete 2,400 /m³, steel 28 /kg. Set h in the sidebar to use this thickness.")
+elif run_btn:
     if Lx > Ly and Ly > 0:
         Lx, Ly = Ly, Lx
         st.sidebar.warning(f"Auto-swapped: Lx={Lx}, Ly={Ly}")
@@ -533,11 +313,30 @@ if run_btn:
         'case': case, 'bar': bar
     }
 
-    rows, res_sum = calculate_detailed(inputs)
-    img_base64 = fig_to_base64(plot_twoway_section_detailed(h, cover, bar, res_sum, Lx))
-    html_report = generate_html_report(inputs, rows, img_base64, res_sum)
-
-    st.success("✅ Design Complete! See report below.")
-    components.html(html_report, height=1300, scrolling=True)
+    # Only stages that actually rerun show up: cached drawings and unchanged
+    # pipeline stages cost nothing on this run.
+    with Tracer(allocations=True) if show_timings else contextlib.nullcontext() as tracer:
+        try:
+            combinations = parse_combinations(combo_spec) if combo_spec.strip() else None
+            graph = design_graph(inputs, backend, combinations)
+        except ValueError as e:
+            st.error(f"Invalid input: {e}")
+            st.stop()
+        html_report = cached_report(design_key(inputs), project, slab_id, engineer, backend,
+                                    tuple(combinations.items()) if combinations else None, graph)
+
+        st.success("✅ Design Complete! See report below.")
+        with span("components.html", payload_bytes=len(html_report.encode('utf-8'))):
+            components.html(html_report, height=1300, scrolling=True)
+
+    if tracer:
+        with st.expander("⏱️ Timings", expanded=True):
+            st.table([{"Stage": s['stage'], "Calls": s['count'], "Total (ms)": f"{s['total_ms']:.2f}",
+                       "Allocated (kB)": f"{s['alloc_bytes'] / 1024:.1f}",
+                       "Peak (kB)": f"{s['peak_bytes'] / 1024:.1f}",
+                       "Payload (kB)": f"{s['payload_bytes'] / 1024:.1f}"} for s in tracer.summary()])
+            st.download_button("Download Chrome trace", json.dumps(tracer.chrome_trace()),
+                               file_name="trace.json", mime="application/json")
 else:
     st.info("👈 Enter design parameters in the sidebar to generate report.")
+
@@ -0,0 +1,123 @@
+"""
+The original scalar design routine of app2wayslab.py, kept verbatim (minus
+Streamlit) as the reference the engine is checked against.
+"""
+import math
+
+from twowayslab.core import ACI_COEFFICIENTS, BAR_INFO, CASE_DESC, fmt
+
+
+def get_coefficients(case_num, m):
+    m = max(0.5, min(1.0, m))
+    table = ACI_COEFFICIENTS[case_num]
+    if m in table: return table[m]
+
+    sorted_keys = sorted(table.keys())
+    m1 = 0.5;
+    m2 = 1.0
+    for k in sorted_keys:
+        if k <= m: m1 = k
+        if k >= m: m2 = k; break
+    if m1 == m2: return table[m1]
+
+    vals1 = table[m1];
+    vals2 = table[m2]
+    interp_vals = []
+    ratio = (m - m1) / (m2 - m1)
+    for v1, v2 in zip(vals1, vals2):
+        interp_vals.append(v1 + (v2 - v1) * ratio)
+    return interp_vals
+
+
+def calculate_detailed(inputs):
+    rows = []
+
+    def sec(title):
+        rows.append(["SECTION", title, "", "", "", ""])
+
+    def row(item, form, subst, res, unit, stat=""):
+        rows.append([item, form, subst, res, unit, stat])
+
+    Lx = inputs['Lx'];
+    Ly = inputs['Ly'];
+    h = inputs['h'];
+    cov = inputs['cover']
+    fc = inputs['fc'];
+    fy = inputs['fy'];
+    bar_name = inputs['bar']
+    Ab = BAR_INFO[bar_name]['A_cm2']
+
+    # 1. Geometry
+    sec("1. GEOMETRY & LOADS")
+    m = Lx / Ly
+    row("Short Span", "Lx", "-", f"{Lx:.2f}", "m")
+    row("Long Span", "Ly", "-", f"{Ly:.2f}", "m")
+    row("Ratio m", "Lx / Ly", f"{Lx:.2f} / {Ly:.2f}", f"{m:.2f}", "-", "OK" if m >= 0.5 else "WARN")
+
+    w_sw = 2400 * (h / 100);
+    w_dl = w_sw + inputs['sdl'];
+    w_ll = inputs['ll']
+    wu = 1.4 * w_dl + 1.7 * w_ll
+    row("Dead Load", "SW + SDL", f"{w_sw:.0f} + {inputs['sdl']}", f"{w_dl:.0f}", "kg/m²")
+    row("Factored Load", "1.4DL + 1.7LL", f"1.4({w_dl:.0f}) + 1.7({w_ll})", f"{wu:.0f}", "kg/m²")
+
+    # 2. Moments & Design
+    case_id = inputs['case']
+    sec(f"2. MOMENT & REINF. (CASE {case_id}: {CASE_DESC[case_id]})")
+    coefs = get_coefficients(case_id, m)
+
+    db = BAR_INFO[bar_name]['d_mm']
+    d_short = h - cov - db / 20
+    d_long = d_short - db / 10
+    S = Lx
+
+    def calc_As_Spacing(Mu_val, d_val):
+        Mu_kgcm = Mu_val * 100
+        Rn = Mu_kgcm / (0.9 * 100 * d_val ** 2)
+        try:
+            rho = (0.85 * fc / fy) * (1 - math.sqrt(1 - (2 * Rn) / (0.85 * fc)))
+        except:
+            rho = 0.002
+        As_req = max(rho * 100 * d_val, 0.0018 * 100 * h)
+        s = (Ab * 100) / As_req
+        s_final = math.floor(min(s, 3 * h, 45) * 2) / 2
+        return As_req, s, s_final
+
+    # --- Short Neg ---
+    Ma_neg = coefs[0] * wu * S ** 2
+    As_a_neg, _, s_a_neg = calc_As_Spacing(Ma_neg, d_short)
+    row("Ma (Neg)", "Ca_neg · wu · Lx²", f"{coefs[0]:.3f}·{wu:.0f}·{S}²", f"{Ma_neg:.2f}", "kg-m")
+    row("As (Short-Neg)", "Calc", f"d={d_short:.2f}", f"{As_a_neg:.2f}", "cm²")
+    row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{s_a_neg:.1f}", "cm", "OK")
+
+    # --- Short Pos ---
+    Ma_pos = (coefs[1] * 1.4 * w_dl * S ** 2) + (coefs[2] * 1.7 * w_ll * S ** 2)
+    As_a_pos, _, s_a_pos = calc_As_Spacing(Ma_pos, d_short)
+    row("Ma (Pos)", "Ca_dl·D + Ca_ll·L", "-", f"{Ma_pos:.2f}", "kg-m")
+    row("As (Short-Pos)", "Calc", f"d={d_short:.2f}", f"{As_a_pos:.2f}", "cm²")
+    row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{s_a_pos:.1f}", "cm", "OK")
+
+    # --- Long Neg ---
+    Mb_neg = coefs[3] * wu * S ** 2
+    As_b_neg, _, s_b_neg = calc_As_Spacing(Mb_neg, d_long)
+    row("Mb (Neg)", "Cb_neg · wu · Lx²", f"{coefs[3]:.3f}·{wu:.0f}·{S}²", f"{Mb_neg:.2f}", "kg-m")
+    row("As (Long-Neg)", "Calc", f"d={d_long:.2f}", f"{As_b_neg:.2f}", "cm²")
+    row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{s_b_neg:.1f}", "cm", "OK")
+
+    # --- Long Pos ---
+    Mb_pos = (coefs[4] * 1.4 * w_dl * S ** 2) + (coefs[5] * 1.7 * w_ll * S ** 2)
+    As_b_pos, _, s_b_pos = calc_As_Spacing(Mb_pos, d_long)
+    row("Mb (Pos)", "Cb_dl·D + Cb_ll·L", "-", f"{Mb_pos:.2f}", "kg-m")
+    row("As (Long-Pos)", "Calc", f"d={d_long:.2f}", f"{As_b_pos:.2f}", "cm²")
+    row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{s_b_pos:.1f}", "cm", "OK")
+
+    res_sum = {'s_a_neg': s_a_neg, 's_a_pos': s_a_pos, 's_b_neg': s_b_neg, 's_b_pos': s_b_pos}
+
+    sec("3. CHECK SHEAR")
+    Vu = wu * Lx / 3
+    Vc = 0.53 * math.sqrt(fc) * 100 * d_short
+    phiVc = 0.85 * Vc
+    status = "PASS" if phiVc >= Vu else "FAIL"
+    row("Shear Check", "φVc ≥ Vu", f"{fmt(phiVc)} ≥ {fmt(Vu)}", status, "kg", status)
+
+    return rows, res_sum
@@ -0,0 +1,25 @@
+import random
+
+import pytest
+
+from twowayslab.core import BAR_INFO, CASE_DESC
+
+
+def random_inputs(rng):
+    """One valid slab, with round and awkward values mixed (m on and off the table keys)."""
+    Lx = round(rng.uniform(1.0, 8.0), rng.choice([1, 2, 3]))
+    Ly = Lx if rng.random() < 0.1 else round(rng.uniform(Lx, 2.5 * Lx), 2)
+    return {
+        'project': "Test", 'slab_id': "S-1", 'engineer': "pytest",
+        'Lx': Lx, 'Ly': Ly, 'h': rng.choice([6, 9, 10.0, 12.5, 15.0, 20.0, rng.uniform(8, 30)]),
+        'cover': rng.choice([2.0, 2.5, 3.0]), 'sdl': rng.choice([0.0, 50, 150.0, 300.0]),
+        'll': rng.choice([0.0, 100.0, 200, 500.0, 1500.0]), 'fc': rng.choice([180.0, 240, 320.0]),
+        'fy': rng.choice([2400.0, 4000, 5000.0]), 'case': rng.choice(sorted(CASE_DESC)),
+        'bar': rng.choice(list(BAR_INFO)),
+    }
+
+
+@pytest.fixture
+def slabs():
+    rng = random.Random(20251017)
+    return [random_inputs(rng) for _ in range(1500)]
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app2wayslab.py")
+
+
+@pytest.fixture
+def app():
+    return AppTest.from_file(APP, default_timeout=60).run()
+
+
+def _calculate(app, combinations=None, **values):
+    for label, v in values.items():
+        [n for n in app.number_input if n.label.startswith(label)][0].set_value(v)
+    if combinations is not None:
+        [t for t in app.text_input if t.label == "Load Combinations"][0].set_value(combinations)
+    [b for b in app.button if b.label.startswith("Calculate")][0].click()
+    app.run()
+    assert not app.exception, app.exception
+    return app.session_state.get('graph')
+
+
+def test_report_cache_keeps_the_session_graph_current(app):
+    graph = _calculate(app, Thickness=12.0)
+    _calculate(app, Thickness=15.0)
+    stats = dict(graph.stats)
+    _calculate(app, Thickness=12.0)
+    assert graph.stats == stats  # cached report: no stage reran
+    assert graph.params['h'] == 12.0  # ... but the graph still follows the form
+    assert app.success
+
+
+def test_invalid_input_shows_an_error(app):
+    assert _calculate(app, Cover=3.0, Thickness=2.0) is None
+    assert [e.value for e in app.error] == ["Invalid input: h must be greater than cover (h=2.0, cover=3.0)"]
+
+
+def test_load_combinations_reach_the_report(app):
+    graph = _calculate(app, combinations="aci318")
+    assert graph.result.governs['Vu'][0] == "1.2D+1.6L"
+    assert "<th>Combination</th>" in graph.html
+    assert _calculate(app, combinations="").result.governs is None
+    _calculate(app, combinations="1.2D1.6L")
+    assert app.error and app.error[0].value.startswith("Invalid input: bad load combination")
@@ -0,0 +1,43 @@
+import json
+import time
+
+from twowayslab.bench import check_regressions, main, run_stage, run_suite, synthetic_schedule
+from twowayslab.core import BAR_INFO, CASE_DESC, check_inputs
+
+
+def test_schedule_is_reproducible_and_covers_every_table():
+    s = synthetic_schedule(200, seed=3)
+    assert s == synthetic_schedule(200, seed=3) != synthetic_schedule(200, seed=4)
+    assert {p['case'] for p in s} == set(CASE_DESC) and {p['bar'] for p in s} == set(BAR_INFO)
+    for p in s:
+        check_inputs(p)
+
+
+def test_setup_is_not_timed():
+    r = run_stage("sleepy", True, lambda x: x, [1, 2, 3], 3, setup=lambda x: time.sleep(0.05) or x)
+    assert r['total_s'] < 0.05 and r['n'] == 3
+    assert r['p50_ms'] <= r['p95_ms'] <= r['p99_ms']
+
+
+def test_suite_runs_selected_stages_at_every_size():
+    res = run_suite((1, 10), {"design_batch", "calculate_detailed"}, min_time=0, out=None)
+    assert [(r['stage'], r['n']) for r in res] == [("calculate_detailed", 1), ("calculate_detailed", 10),
+                                                   ("design_batch", 1), ("design_batch", 10)]
+
+
+def test_regressions_beyond_the_tolerance_are_reported():
+    base = [{'stage': "a", 'n': 10, 'throughput': 100.0}, {'stage': "b", 'n': 10, 'throughput': 100.0}]
+    cur = [{'stage': "a", 'n': 10, 'throughput': 80.0}, {'stage': "b", 'n': 10, 'throughput': 70.0},
+           {'stage': "c", 'n': 10, 'throughput': 1.0}]
+    assert check_regressions(cur, base) == [("b", 10, 100.0, 70.0)]
+
+
+def test_baseline_gate_exit_code(tmp_path):
+    path = tmp_path / "baseline.json"
+    args = ["--sizes", "1,5", "--stages", "design_batch", "--min-time", "0"]
+    assert main(args + ["--save-baseline", str(path)]) == 0
+    base = json.loads(path.read_text())
+    for b in base:
+        b['throughput'] *= 1000
+    path.write_text(json.dumps(base))
+    assert main(args + ["--baseline", str(path)]) == 1
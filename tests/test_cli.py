@@ -0,0 +1,104 @@
+import csv
+import io
+
+import pytest
+
+import baseline
+from twowayslab.cli import COMBINATION_PRESETS, design_rows, main, parse_combinations, parse_row, read_schedule
+
+ROW = {'slab_id': "S-1", 'Lx': "4.0", 'Ly': "5.5", 'h': "12", 'cover': "2.5", 'sdl': "150", 'll': "300",
+       'fc': "240", 'fy': "4000", 'case': "4", 'bar': "DB12"}
+
+
+@pytest.mark.parametrize("change", [{'h': "0"}, {'Ly': "0"}, {'h': "2.5"}, {'fc': "-240"}, {'Lx': "-4"},
+                                    {'sdl': "nan"}, {'ll': "-50"}, {'h': "inf"}])
+def test_parse_row_rejects_degenerate(change):
+    with pytest.raises(ValueError):
+        parse_row({**ROW, **change})
+
+
+def test_design_rows_match_baseline_and_number_errors():
+    rows = [ROW, {**ROW, 'h': "0"}, {**ROW, 'Lx': "6.2", 'Ly': "3.1", 'case': "9"}]
+    out = list(design_rows(rows, chunk_size=2))
+    assert out[1]['error'].startswith("row 2:")
+    for raw, res in ((rows[0], out[0]), (rows[2], out[2])):
+        _, res_sum = baseline.calculate_detailed(parse_row(raw))
+        assert {k: res[k] for k in res_sum} == res_sum
+
+
+def test_bad_jsonl_lines_become_error_rows():
+    lines = ['{"slab_id": "A", "Lx": 4, "Ly": 5}', '{"slab_id": "B",', '[1, 2]', '{"slab_id": "C", "Lx": 4, "Ly": 5}']
+    out = list(design_rows(read_schedule(io.StringIO("\n".join(lines)), 'jsonl')))
+    assert [r['slab_id'] for r in out] == ["A", "", "", "C"]
+    assert out[1]['error'].startswith("row 2: invalid JSON")
+    assert out[2]['error'] == "row 3: expected a JSON object, got list"
+    assert not out[0]['error'] and not out[3]['error']
+
+
+def _write_schedule(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:  # with a BOM, as Excel saves it
+        w = csv.DictWriter(f, ROW)
+        w.writeheader()
+        w.writerows(rows)
+
+
+def _read_results(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_main_reads_bom_csv(tmp_path):
+    src, out = tmp_path / "s.csv", tmp_path / "out.csv"
+    _write_schedule(src, [ROW, {**ROW, 'slab_id': "S-2", 'h': "0"}])
+    assert main([str(src), "-o", str(out)]) == 0
+    rows = _read_results(out)
+    assert [(r['slab_id'], bool(r['error'])) for r in rows] == [("S-1", False), ("S-2", True)]
+    assert float(rows[0]['s_a_neg']) == baseline.calculate_detailed(parse_row(ROW))[1]['s_a_neg']
+
+
+@pytest.mark.parametrize("flag", ["--pdf", "--html", "--html-dir"])
+def test_stdin_rejects_report_outputs_before_designing(tmp_path, capsys, flag):
+    out = tmp_path / "out.csv"
+    with pytest.raises(SystemExit):
+        main(["-", "-o", str(out), flag, str(tmp_path / "x")])
+    assert not out.exists()
+    assert "needs a schedule file" in capsys.readouterr().err
+
+
+def test_parse_combinations():
+    assert parse_combinations("1.4D, 1.2D+1.6L") == {'1.4D': (1.4, 0.0, True), '1.2D+1.6L': (1.2, 1.6, True)}
+    assert parse_combinations("1.6L") == {'1.6L': (0.0, 1.6, True)}
+    assert parse_combinations("1.2D+1.6L:uniform, 1.2D + 1.6L : Pattern") == {
+        '1.2D+1.6L:uniform': (1.2, 1.6, False), '1.2D+1.6L': (1.2, 1.6, True)}
+    for name, preset in COMBINATION_PRESETS.items():
+        assert parse_combinations(name.upper()) == preset
+    for bad in ("1.2D1.6L", "1.2D+", "D+L", "1.4D,1.4D", "1.2D+1.6L, 1.2 D + 1.6 L", "1.2D+1.6L:pattern,1.2D+1.6L",
+                "1.2D+1.6L:even", "1.4D:"):
+        with pytest.raises(ValueError):
+            parse_combinations(bad)
+
+
+def test_legacy_combinations_leave_results_unchanged(tmp_path):
+    src, plain, legacy = tmp_path / "s.csv", tmp_path / "plain.csv", tmp_path / "legacy.csv"
+    _write_schedule(src, [ROW, {**ROW, 'll': "800", 'case': "1"}])
+    assert main([str(src), "-o", str(plain)]) == 0
+    assert main([str(src), "-o", str(legacy), "--combinations", "legacy"]) == 0
+    plain_rows, legacy_rows = _read_results(plain), _read_results(legacy)
+    assert [r['slab_id'] for r in plain_rows] == ["S-1", "S-1"]
+    assert [{k: r[k] for k in plain_rows[0]} for r in legacy_rows] == plain_rows
+
+
+def test_combinations_reach_store_and_reports(tmp_path):
+    src, plain, stored = tmp_path / "s.csv", tmp_path / "plain.csv", tmp_path / "stored.csv"
+    _write_schedule(src, [ROW, {**ROW, 'slab_id': "S-2", 'll': "50", 'case': "1"}])
+    assert main([str(src), "-o", str(plain), "--combinations", "aci318"]) == 0
+    for _ in range(2):  # a fresh store, then one that already holds the envelope results
+        assert main([str(src), "-o", str(stored), "--combinations", "aci318", "--store", str(tmp_path / "r.sqlite"),
+                     "--html", str(tmp_path / "floor.html"), "--html-dir", str(tmp_path / "html"),
+                     "--backend", "svg", "--workers", "1", "--pdf", str(tmp_path / "floor.pdf")]) == 0
+        assert _read_results(stored) == _read_results(plain)
+    assert {r['combo_Ma_neg'] for r in _read_results(plain)} == {"1.4D", "1.2D+1.6L"}
+    doc = (tmp_path / "floor.html").read_text(encoding='utf-8')
+    assert doc.count("<th>Combination</th>") == 2 and "<td>1.4D</td>" in doc
+    assert all("<th>Combination</th>" in p.read_text(encoding='utf-8') for p in (tmp_path / "html").iterdir())
+    assert (tmp_path / "floor.pdf").read_bytes().startswith(b"%PDF")
@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+import pytest
+
+import baseline
+from twowayslab.core import (ACI_318_COMBINATIONS, DESIGN_FIELDS, LOAD_COMBINATIONS, SlabResult, calculate_detailed,
+                            design_batch, design_table, get_coefficients, get_coefficients_batch)
+
+
+def _columns(slabs):
+    return [[p[k] for p in slabs] for k in DESIGN_FIELDS]
+
+
+def test_calculate_detailed_matches_baseline(slabs):
+    for p in slabs:
+        assert calculate_detailed(p) == baseline.calculate_detailed(p), p
+
+
+def test_get_coefficients_matches_baseline_and_batch():
+    rng = random.Random(1)
+    ms = [0.3, 0.5, 0.55, 0.6, 0.999, 1.0, 1.7] + [rng.uniform(0.4, 1.1) for _ in range(2000)]
+    for case in range(1, 10):
+        batch = get_coefficients_batch(np.full(len(ms), case), np.array(ms)).tolist()
+        for m, row in zip(ms, batch):
+            assert get_coefficients(case, m) == list(baseline.get_coefficients(case, m)) == row, (case, m)
+
+
+def test_design_batch_matches_single_panel(slabs):
+    table = design_table(*_columns(slabs))
+    for p, rec in zip(slabs, table.tolist()):
+        assert rec[10:] == SlabResult.from_inputs(p).record()[10:], p
+
+
+@pytest.mark.parametrize("change", [
+    {'h': 0}, {'h': -5.0}, {'Ly': 0}, {'Lx': -3.0}, {'fc': 0}, {'fy': -1.0},
+    {'h': 2.5, 'cover': 2.5}, {'h': 2.0, 'cover': 3.0},
+    {'sdl': float('nan')}, {'ll': -100.0}, {'sdl': -1.0}, {'cover': -0.5}, {'h': float('inf')}, {'Ly': float('nan')},
+])
+def test_degenerate_inputs_raise(slabs, change):
+    p = {**slabs[0], **change}
+    with pytest.raises(ValueError):
+        calculate_detailed(p)
+    with pytest.raises(ValueError, match="panel 1"):
+        design_batch(*_columns([slabs[1], p]))
+
+
+def test_legacy_combination_is_bitwise_no_combination(slabs):
+    plain = design_batch(*_columns(slabs))
+    legacy = design_batch(*_columns(slabs), combinations=LOAD_COMBINATIONS)
+    for k, v in plain.items():
+        assert np.array_equal(legacy[k], v), k
+    assert set(legacy['combo_Ma_neg']) == set(LOAD_COMBINATIONS)
+    for p in slabs[:200]:
+        assert SlabResult.from_inputs(p, LOAD_COMBINATIONS).record() == SlabResult.from_inputs(p).record()
+
+
+def test_envelope_is_max_over_combinations(slabs):
+    cols = _columns(slabs)
+    env = design_batch(*cols, combinations=ACI_318_COMBINATIONS)
+    each = {name: design_batch(*cols, combinations={name: f}) for name, f in ACI_318_COMBINATIONS.items()}
+    for k in ('wu', 'Ma_neg', 'Ma_pos', 'Mb_neg', 'Mb_pos', 'Vu'):
+        assert np.array_equal(env[k], np.maximum(*[r[k] for r in each.values()])), k
+    for k in ('Ma_neg', 'Mb_pos', 'Vu'):
+        picked = np.choose(env[f'combo_{k}'] == '1.4D', [each['1.2D+1.6L'][k], each['1.4D'][k]])
+        assert np.array_equal(picked, env[k]), k
+
+
+def test_governing_combination_gets_its_own_column(slabs):
+    rows = SlabResult.from_inputs(slabs[0], ACI_318_COMBINATIONS).rows()
+    assert {len(r) for r in rows if r[0] != "SECTION"} == {7}
+    assert all(r[6] in ACI_318_COMBINATIONS for r in rows if r[0] in ("Factored Load", "Shear Check"))
+    assert {len(r) for r in SlabResult.from_inputs(slabs[0]).rows()} == {6}
+
+
+def test_uniform_live_load_takes_the_dead_load_coefficients(slabs):
+    cols = _columns(slabs)
+    res = design_batch(*cols, combinations={'1.2D+1.6L:uniform': (1.2, 1.6, False)})
+    S2 = np.asarray(cols[0]) ** 2
+    for M, c in (('Ma_pos', 1), ('Mb_pos', 4)):
+        assert np.allclose(res[M], res['coefs'][:, c] * res['wu'] * S2)
+    assert np.array_equal(res['Ma_neg'], res['coefs'][:, 0] * res['wu'] * S2)
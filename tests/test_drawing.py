@@ -0,0 +1,56 @@
+import base64
+import os
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from twowayslab.core import calculate_detailed
+from twowayslab.drawing import render_section
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _section(p, **kw):
+    return (p['h'], p['cover'], kw.get('bar', p['bar']), calculate_detailed(p)[1], p['Lx'])
+
+
+def test_svg_is_valid_markup_with_the_design_labels(slabs):
+    p = slabs[0]
+    rs = calculate_detailed(p)[1]
+    root = ET.fromstring(render_section(*_section(p)))
+    texts = [t.text for t in root.iter(f"{SVG}text")]
+    assert f"Short(Top): {p['bar']}@{rs['s_a_neg']:.0f}cm" in texts
+    assert f"Long(Bot): {p['bar']}@{rs['s_b_pos']:.0f}cm" in texts
+    assert f"L = {p['Lx']:.2f} m" in texts
+    markers = {m.get('id') for m in root.iter(f"{SVG}marker")}
+    refs = {v[5:-1] for e in root.iter() for k, v in e.attrib.items() if v.startswith("url(#")}
+    assert refs and refs <= markers
+
+
+def test_svg_labels_are_escaped(slabs):
+    root = ET.fromstring(render_section(*_section(slabs[0], bar="<DB12 & co>")))
+    assert any(t.text.startswith("Short(Top): <DB12 & co>@") for t in root.iter(f"{SVG}text"))
+
+
+def test_svg_backend_does_not_import_matplotlib(slabs):
+    code = ("import sys\n"
+            "from twowayslab.core import calculate_detailed\n"
+            "from twowayslab.drawing import render_section\n"
+            f"p = {slabs[0]!r}\n"
+            "render_section(p['h'], p['cover'], p['bar'], calculate_detailed(p)[1], p['Lx'])\n"
+            "assert 'matplotlib' not in sys.modules\n")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
+
+
+def test_matplotlib_backend_gives_a_png(slabs):
+    pytest.importorskip("matplotlib")
+    img = render_section(*_section(slabs[0]), backend="matplotlib")
+    assert base64.b64decode(img.split(",", 1)[1])[:8] == b"\x89PNG\r\n\x1a\n"
+
+
+def test_unknown_backend_raises(slabs):
+    with pytest.raises(ValueError, match="Unknown drawing backend"):
+        render_section(*_section(slabs[0]), backend="tikz")
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from twowayslab.core import BAR_INFO, SlabResult
+from twowayslab.floor import FloorGrid
+
+
+def test_cases_follow_discontinuous_edges():
+    floor = FloorGrid([0, 4, 8, 12], [0, 4, 8, 12])
+    assert [floor.classify(*c)[2] for c in ((1, 1), (0, 0), (1, 0))] == [1, 6, 7]
+    floor.add_hole(1, 1)
+    assert floor.classify(1, 0)[2] == 2
+    assert floor.panel_at(5.0, 1.0) == (1, 0) and floor.panel_at(12.0, 12.0) == (2, 2)
+    assert floor.panel_at(-1.0, 1.0) is None
+
+
+def _rebuilt(floor):
+    fresh = FloorGrid(floor.xs, floor.ys, floor.holes, **floor.defaults)
+    for cell, props in floor.overrides.items():
+        fresh.set_panel(*cell, **props)
+    fresh.design()
+    return fresh
+
+
+def _edit(floor, rng):
+    nx, ny = floor.shape
+    axis = rng.choice('xy')
+    lines = floor.xs if axis == 'x' else floor.ys
+    op = rng.randrange(7)
+    if op == 0 and len(lines) > 2:
+        k = rng.randrange(len(lines))
+        lo = lines[k - 1] if k else lines[k] - 2
+        hi = lines[k + 1] if k + 1 < len(lines) else lines[k] + 2
+        floor.move_line(axis, k, round(rng.uniform(lo, hi), 2) if hi - lo > 0.05 else lines[k])
+    elif op == 1 and len(lines) < 7:
+        k = rng.randrange(len(lines) - 1)
+        if lines[k + 1] - lines[k] > 1.0:
+            floor.insert_line(axis, round(rng.uniform(lines[k] + 0.4, lines[k + 1] - 0.4), 2))
+    elif op == 2 and len(lines) > 3:
+        floor.remove_line(axis, rng.randrange(1, len(lines) - 1))
+    elif op == 3:
+        floor.add_hole(rng.randrange(nx), rng.randrange(ny))
+    elif op == 4 and floor.holes:
+        floor.remove_hole(*rng.choice(sorted(floor.holes)))
+    elif op == 5:
+        floor.set_panel(rng.randrange(nx), rng.randrange(ny), h=rng.choice([10.0, 12.5, 15.0]),
+                        bar=rng.choice(list(BAR_INFO)))
+    else:
+        floor.set_defaults(**{rng.choice(['ll', 'sdl', 'fc']): rng.choice([150.0, 240.0, 300.0])})
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_floor_edits_match_full_recompute(seed):
+    rng = random.Random(seed)
+    floor = FloorGrid([0, 4, 8.5, 12], [0, 5, 10, 13.5], holes=[(1, 1)], ll=300.0)
+    floor.design()
+    edits = designed = panels = 0
+    for step in range(60):
+        try:
+            _edit(floor, rng)
+        except ValueError:
+            continue  # a move that would cross a neighbouring line
+        edits += 1
+        designed += floor.design()
+        panels += len(floor.results)
+        fresh = _rebuilt(floor)
+        assert floor.results.keys() == fresh.results.keys(), step
+        for cell, r in floor.results.items():
+            assert r.record() == fresh.results[cell].record(), (step, cell)
+            assert r.record() == SlabResult.from_inputs(floor.panel_inputs(*cell)).record(), (step, cell)
+    assert edits > 30
+    assert designed < panels  # edits re-designed only the panels they touched
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from twowayslab.core import DESIGN_FIELDS, design_batch, min_thickness_batch
+from twowayslab.optimize import LOCATIONS, optimize_batch
+
+OPT_FIELDS = ('Lx', 'Ly', 'cover', 'sdl', 'll', 'fc', 'fy', 'case')
+
+
+@pytest.fixture
+def panels(slabs):
+    return slabs[:300]
+
+
+def _optimize(panels, **kw):
+    return optimize_batch(*[[p[k] for p in panels] for k in OPT_FIELDS], **kw)
+
+
+def _same(a, b):
+    for k, v in a.items():
+        assert np.array_equal(v, b[k]) or np.array_equal(v, b[k], equal_nan=True), k
+
+
+def test_chosen_design_passes_the_design_checks(panels):
+    res = _optimize(panels)
+    assert res['feasible'].mean() > 0.9
+    h_min = min_thickness_batch(*[np.array([p[k] for p in panels]) for k in ('Lx', 'Ly', 'fy')])
+    ok = np.flatnonzero(res['feasible'])
+    assert (res['h'][ok] >= h_min[ok]).all()
+    for face in ('neg', 'pos'):
+        # Each short bar, redesigned by design_batch at the chosen h, gets the same spacing
+        rows = [{**panels[i], 'h': res['h'][i], 'bar': res[f'bar_a_{face}'][i]} for i in ok]
+        check = design_batch(*[[r[k] for r in rows] for k in DESIGN_FIELDS])
+        assert np.array_equal(check[f's_a_{face}'], res[f's_a_{face}'][ok]), face
+        assert check['shear_ok'].all()
+        same = res[f'bar_b_{face}'][ok] == res[f'bar_a_{face}'][ok]
+        assert np.array_equal(check[f's_b_{face}'][same], res[f's_b_{face}'][ok][same]), face
+
+
+def test_more_bar_sizes_never_cost_more(panels):
+    full = _optimize(panels)
+    for bar in ("DB12", "DB16"):
+        one = _optimize(panels, bars=[bar])
+        both = one['feasible'] & full['feasible']
+        assert (full['cost'][both] <= one['cost'][both] * (1 + 1e-12)).all()
+        assert all(one[f'bar_{loc}'][both].tolist() == [bar] * both.sum() for loc in LOCATIONS)
+
+
+def test_chunks_and_pruning_do_not_change_the_result(panels):
+    res = _optimize(panels)
+    _same(_optimize(panels, chunk=17), res)
+    _same(_optimize(panels, h_block=1), res)
+    _same(_optimize(panels, h_block=21), res)  # whole h range at once, no pruning
@@ -0,0 +1,28 @@
+import pytest
+
+from twowayslab.core import ACI_318_COMBINATIONS
+from twowayslab.parallel import build_report, generate_reports
+from twowayslab.store import ResultStore
+
+
+@pytest.fixture
+def schedule(slabs):
+    return slabs[:30]
+
+
+@pytest.mark.parametrize("combinations", [None, ACI_318_COMBINATIONS])
+def test_workers_give_the_same_reports_in_order(schedule, combinations):
+    expected = [build_report(p, backend="svg", combinations=combinations) for p in schedule]
+    inline = list(generate_reports(iter(schedule), workers=1, backend="svg", combinations=combinations))
+    pooled = list(generate_reports(iter(schedule), workers=2, chunksize=3, max_pending=2, backend="svg",
+                                   combinations=combinations))
+    assert inline == pooled == expected
+
+
+def test_store_drawings_are_reused(tmp_path, schedule):
+    with ResultStore(tmp_path / "r.sqlite") as store:
+        first = list(generate_reports(schedule, workers=2, backend="svg", store=store))
+    with ResultStore(tmp_path / "r.sqlite") as store:
+        assert list(generate_reports(schedule, workers=1, backend="svg", store=store)) == first
+        assert store.stats['drawing_hits'] == len(schedule)
+        assert store.stats['design_misses'] == 0
@@ -0,0 +1,41 @@
+import re
+
+import pytest
+
+pytest.importorskip("fpdf")
+pytest.importorskip("matplotlib")
+from twowayslab.core import ACI_318_COMBINATIONS
+from twowayslab.pdf import PDFReportWriter, export_pdf
+
+
+def _check_structure(data):
+    """Cross-reference table entries point at their objects; returns the page count."""
+    assert data.startswith(b"%PDF-") and data.rstrip().endswith(b"%%EOF")
+    xref = int(data[data.rindex(b"startxref"):].split()[1])
+    assert data[xref:xref + 4] == b"xref"
+    head, *entries = data[xref:].split(b"trailer")[0].splitlines()[1:]
+    first, count = map(int, head.split())
+    assert len(entries) == count
+    for n, entry in enumerate(entries[1:], first + 1):
+        offset = int(entry.split()[0])
+        assert data[offset:].startswith(f"{n} 0 obj".encode()), n
+    pages = len(re.findall(rb"/Type /Page\b", data))
+    assert re.search(rb"/Count (\d+)", data).group(1) == str(pages).encode()
+    return pages
+
+
+def test_pdf_is_valid_and_shares_drawings(tmp_path, slabs):
+    path = tmp_path / "floor.pdf"
+    schedule = slabs[:6] + slabs[:6]
+    assert export_pdf(schedule, path, combinations=ACI_318_COMBINATIONS) == 12
+    data = path.read_bytes()
+    assert _check_structure(data) >= 12
+    assert len(re.findall(rb"/Subtype /Image", data)) == 6  # repeated slabs reuse the embedded drawing
+
+
+def test_finished_pages_leave_memory(tmp_path, slabs):
+    with PDFReportWriter(tmp_path / "floor.pdf") as pdf:
+        for p in slabs[:5]:
+            pdf.add_slab(p)
+            assert all(c == '' for k, c in pdf.pdf.pages.items() if k < pdf.pdf.page)
+    assert _check_structure((tmp_path / "floor.pdf").read_bytes()) >= 5
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from conftest import random_inputs
+from twowayslab.core import ACI_318_COMBINATIONS, DESIGN_FIELDS, LOAD_COMBINATIONS, SlabResult
+from twowayslab.drawing import render_section
+from twowayslab.pipeline import DesignGraph
+from twowayslab.report import generate_html_report
+
+
+def _full_recompute(params):
+    inputs = {k: params[k] for k in DESIGN_FIELDS + ('project', 'slab_id', 'engineer')}
+    result = SlabResult.from_inputs(inputs, params['combinations'])
+    img = render_section(inputs['h'], None, inputs['bar'], result.res_sum, inputs['Lx'], backend="svg")
+    return result, generate_html_report(inputs, result.rows(), img, result.res_sum)
+
+
+def test_design_graph_updates_match_full_recompute():
+    rng = random.Random(7)
+    graph = DesignGraph(random_inputs(rng), backend="svg")
+    for step in range(150):
+        fresh = random_inputs(rng)
+        fresh['combinations'] = rng.choice([None, LOAD_COMBINATIONS, ACI_318_COMBINATIONS])
+        keys = rng.sample(list(DESIGN_FIELDS) + ['engineer', 'slab_id', 'combinations'], rng.randint(1, 3))
+        if 'Ly' in keys and 'Lx' not in keys:
+            fresh['Ly'] = max(fresh['Ly'], graph.params['Lx'])
+        if 'Lx' in keys and 'Ly' not in keys:
+            fresh['Lx'] = min(fresh['Lx'], graph.params['Ly'])
+        if 'cover' in keys and 'h' not in keys:
+            keys.append('h')
+        if 'h' in keys and 'cover' not in keys:
+            fresh['h'] = max(fresh['h'], graph.params['cover'] + 1)
+        graph.update(**{k: fresh[k] for k in keys})
+        result, html = _full_recompute(graph.params)
+        assert graph.result.record() == result.record(), (step, graph.params)
+        assert graph.res_sum == result.res_sum
+        assert graph.result.governs == result.governs
+        assert graph.html == html, (step, keys)
+
+
+def test_design_graph_rejects_bad_update_without_changing():
+    graph = DesignGraph(random_inputs(random.Random(3)), backend="svg")
+    before = dict(graph.params), graph.result.record()
+    with pytest.raises(ValueError):
+        graph.update(h=graph.params['cover'])
+    assert (graph.params, graph.result.record()) == before
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from twowayslab.core import DESIGN_FIELDS, calculate_detailed
+from twowayslab.reliability import DEFAULT_SCATTER, LOCATIONS, reliability_batch
+
+EXACT = {k: ({'dist': 'normal', 'shift': 0.0, 'sd': 0.0} if 'sd' in v else {'dist': 'normal', 'bias': 1.0, 'cov': 0.0})
+         for k, v in DEFAULT_SCATTER.items()}
+
+
+def _run(panels, **kw):
+    return reliability_batch(*[[p[k] for p in panels] for k in DESIGN_FIELDS], **kw)
+
+
+@pytest.mark.parametrize("chunk", [700, 5000, 1 << 16])
+def test_results_do_not_depend_on_the_chunk_size(slabs, chunk):
+    ref = _run(slabs[:12], samples=4000, seed=2)
+    res = _run(slabs[:12], samples=4000, seed=2, chunk=chunk)
+    for k, v in ref.items():
+        assert np.array_equal(res[k], v), k
+    assert not np.array_equal(_run(slabs[:12], samples=4000, seed=3)['p_fail'], ref['p_fail'])
+
+
+def test_without_scatter_the_nominal_design_holds(slabs):
+    panels = slabs[:40]
+    res = _run(panels, samples=50, scatter=EXACT)
+    for i, p in enumerate(panels):
+        rs = calculate_detailed(p)[1]
+        for loc in LOCATIONS:
+            assert res[f's_{loc}_p05'][i] == res[f's_{loc}_p95'][i] == rs[f's_{loc}'], (p, loc)
+    assert set(res['p_fail_flexure']) <= {0.0, 1.0}  # every realization is the nominal panel
+
+
+def test_wider_spacing_than_designed_fails_more(slabs):
+    panels = slabs[:20]
+    designed = _run(panels, samples=2000)
+    sparse = _run(panels, samples=2000, provided={loc: 45.0 for loc in LOCATIONS})
+    assert (sparse['p_fail_flexure'] >= designed['p_fail_flexure']).all()
+    assert sparse['p_fail_flexure'].mean() > designed['p_fail_flexure'].mean()
+    assert np.array_equal(sparse['p_fail_shear'], designed['p_fail_shear'])
+    assert (sparse['beta'] <= designed['beta']).all()
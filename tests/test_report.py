@@ -0,0 +1,86 @@
+import io
+import re
+
+from twowayslab.core import calculate_detailed
+from twowayslab.drawcache import DrawingCache
+from twowayslab.drawing import render_section
+from twowayslab.report import HTMLReportWriter, export_html, generate_html_report, write_html_report
+
+
+def _document(panels, **kw):
+    buf = io.StringIO()
+    with HTMLReportWriter(buf, **kw) as doc:
+        for p in panels:
+            doc.add_slab(p)
+    return buf.getvalue()
+
+
+class _Sink:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, s):
+        self.chunks.append(s)
+
+
+def test_streamed_report_equals_the_page(slabs):
+    p = slabs[0]
+    rows, rs = calculate_detailed(p)
+    img = render_section(p['h'], p['cover'], p['bar'], rs, p['Lx'])
+    sink = _Sink()
+    write_html_report(sink, p, rows, img, rs)
+    assert len(sink.chunks) > len(rows)
+    assert "".join(sink.chunks) == generate_html_report(p, rows, img, rs)
+
+
+def test_document_streams_slabs_and_links_the_contents(tmp_path, slabs):
+    sink = _Sink()
+    with HTMLReportWriter(sink) as doc:
+        for i, p in enumerate(slabs[:5]):
+            doc.add_slab(p)
+            assert "".join(sink.chunks).count('<section class="slab"') == i + 1  # written as it is added
+    html = "".join(sink.chunks)
+    assert html.count("<!DOCTYPE html>") == html.count("<style>") == 1
+    anchors = re.findall(r'<section class="slab" id="([^"]+)"', html)
+    assert re.findall(r'<li><a href="#([^"]+)">', html) == anchors
+    for p in slabs[:5]:
+        assert f'>{p["slab_id"]}</a>' in html
+    assert export_html(slabs[:5], tmp_path / "floor.html") == 5
+    assert (tmp_path / "floor.html").read_text(encoding="utf-8") == html
+
+
+def test_shared_drawings_keep_ids_unique(slabs):
+    panels = [slabs[0], {**slabs[0], 'slab_id': "S-copy", 'cover': slabs[0]['cover'] + 0.5}, slabs[1], slabs[2]]
+    html = _document(panels)
+    assert html.count("<symbol ") == 3 and html.count("<use ") == 4  # cover is not drawn: the copy is shared
+    ids = re.findall(r'\bid="([^"]+)"', html)
+    assert len(ids) == len(set(ids))
+    refs = set(re.findall(r'url\(#([^)]+)\)|href="#([^"]+)"', html))
+    assert {a or b for a, b in refs} <= set(ids)
+    # Root attributes that style the drawing travel with its symbol
+    assert html.count('font-family="Sarabun, sans-serif"') == 3
+    assert "<p>4 slabs, 3 distinct drawings</p>" in html
+
+
+def test_drawing_cache_hits_memory_then_disk(tmp_path, slabs):
+    args = [(p['h'], p['cover'], p['bar'], calculate_detailed(p)[1], p['Lx']) for p in slabs[:3]]
+    cache = DrawingCache(max_entries=2, directory=tmp_path)
+    key, img = cache.render(*args[0])
+    assert img == render_section(*args[0], backend="svg")
+    assert cache.render(*args[0]) == (key, img)
+    cache.render(*args[1])
+    cache.render(*args[2])  # evicts the first drawing from memory
+    assert len(cache) == 2 and cache.render(*args[0]) == (key, img)
+    assert cache.stats == {'hits': 1, 'disk_hits': 1, 'misses': 3}
+
+    again = DrawingCache(directory=tmp_path)
+    assert again.render(*args[1])[1] == render_section(*args[1], backend="svg")
+    assert again.stats == {'hits': 0, 'disk_hits': 1, 'misses': 0}
+
+
+def test_report_renders_each_drawing_once_with_a_cache(slabs):
+    cache = DrawingCache()
+    first = _document(slabs[:20] + slabs[:20], cache=cache)
+    assert cache.stats['misses'] == len(re.findall("<symbol ", first))
+    assert _document(slabs[:20], cache=cache) == _document(slabs[:20])
+    assert cache.stats['misses'] == len(re.findall("<symbol ", first))
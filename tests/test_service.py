@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+from twowayslab.cli import parse_row
+from twowayslab.parallel import build_report
+from twowayslab.service import Client, DesignService, _design_many, load_test
+
+
+def _serve(test, **kw):
+    """Run test(service) against a service on a free port."""
+    async def run():
+        service = await DesignService(port=0, workers=1, backend="svg", **kw).start()
+        try:
+            return await test(service)
+        finally:
+            await service.close()
+    return asyncio.run(run())
+
+
+def _expected(rows):
+    return json.loads(json.dumps(_design_many([parse_row(r) for r in rows])))
+
+
+def test_concurrent_designs_are_batched(slabs):
+    async def test(service):
+        async def one(p):
+            async with Client(service.host, service.port) as c:
+                return await c.post("/design", p)
+        answers = await asyncio.gather(*[one(p) for p in slabs[:40]])
+        async with Client(service.host, service.port) as c:
+            listed = await c.post("/design", slabs[40:60])
+            metrics = json.loads((await c.get("/metrics"))[2])
+        return answers, listed, metrics
+
+    answers, listed, metrics = _serve(test)
+    assert [s for s, _, _ in answers] == [200] * 40
+    assert [json.loads(body) for _, _, body in answers] == _expected(slabs[:40])
+    assert listed[0] == 200 and json.loads(listed[2]) == _expected(slabs[40:60])
+    assert metrics['batches']['slabs'] == 60 and metrics['batches']['max_size'] > 1
+    assert metrics['endpoints']['/design']['count'] == 41
+
+
+def test_errors_and_renders(slabs):
+    async def test(service):
+        async with Client(service.host, service.port) as c:
+            return [await c.post("/design", {**slabs[0], 'h': -1}), await c.post("/design", [1, 2]),
+                    await c.get("/design"), await c.get("/nowhere"), await c.post("/report", slabs[0]),
+                    await c.post("/drawing", slabs[0])]
+
+    bad, not_objects, wrong_method, unknown, report, drawing = _serve(test)
+    assert bad[0] == 400 and "h must be greater than 0" in json.loads(bad[2])['error']
+    assert not_objects[0] == 400
+    assert (wrong_method[0], unknown[0]) == (405, 404)
+    assert report[0] == 200 and report[2].decode() == build_report(parse_row(slabs[0]), backend="svg")
+    assert drawing[0] == 200 and drawing[1]['content-type'] == "image/svg+xml"
+
+
+def test_full_queue_answers_503(slabs):
+    async def test(service):
+        async with Client(service.host, service.port) as c:
+            return await c.post("/design", slabs[:9])
+
+    status, headers, _ = _serve(test, max_queue=8)
+    assert status == 503 and headers['retry-after'] == "1"
+
+
+def test_load_test_counts_successes(slabs):
+    async def test(service):
+        return await load_test(service.host, service.port, slabs[:50], requests=200, concurrency=8)
+
+    out = _serve(test)
+    assert out['status'] == {200: 200} and out['rejected'] == 0
+    assert out['server']['endpoints']['/design']['count'] == 200
+    assert out['latency_ms']['p50'] <= out['latency_ms']['p99'] <= out['latency_ms']['max']
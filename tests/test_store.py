@@ -0,0 +1,60 @@
+import copy
+
+import pytest
+
+from twowayslab import core
+from twowayslab.core import DESIGN_FIELDS, batch_rows, design_batch
+from twowayslab.store import ResultStore, engine_version
+
+
+@pytest.fixture
+def coefficients():
+    """ACI_COEFFICIENTS, restored (and the lookup tables rebuilt) after the test."""
+    saved = copy.deepcopy(core.ACI_COEFFICIENTS)
+    yield core.ACI_COEFFICIENTS
+    core.ACI_COEFFICIENTS.clear()
+    core.ACI_COEFFICIENTS.update(saved)
+    core.reload_coefficient_tables()
+
+
+def _designed(schedule):
+    return batch_rows(design_batch(*[[p[k] for p in schedule] for k in DESIGN_FIELDS]))
+
+
+def test_only_new_panels_are_designed(tmp_path, slabs):
+    first, second = slabs[:40], slabs[20:60]
+    with ResultStore(tmp_path / "r.sqlite") as store:
+        assert store.design_many(first) == _designed(first)
+        assert store.stats['design_misses'] == 40
+    with ResultStore(tmp_path / "r.sqlite") as store:
+        assert store.design_many(second) == _designed(second)
+        assert (store.stats['design_hits'], store.stats['design_misses']) == (20, 20)
+
+
+def test_drawings_are_stored(tmp_path, slabs):
+    p = slabs[0]
+    rs = core.calculate_detailed(p)[1]
+    with ResultStore(tmp_path / "r.sqlite") as store:
+        svg = store.drawing(p['h'], p['cover'], p['bar'], rs, p['Lx'])
+    with ResultStore(tmp_path / "r.sqlite") as store:
+        assert store.drawing(p['h'], p['cover'], p['bar'], rs, p['Lx']) == svg
+        assert store.stats['drawing_hits'] == 1
+
+
+def test_version_follows_the_tables_in_use(tmp_path, slabs, coefficients):
+    path = tmp_path / "r.sqlite"
+    with ResultStore(path) as store:
+        store.design_many(slabs[:10])
+    before = engine_version()
+    coefficients[1][1.0] = [0.05] + list(coefficients[1][1.0][1:])
+    # Not in effect yet: the engine still designs with the old tables
+    assert engine_version() == before
+    assert core.get_coefficients(1, 1.0)[0] == 0.033
+
+    with ResultStore(path) as store:
+        assert store.invalidate() == 10
+        assert core.get_coefficients(1, 1.0)[0] == 0.05
+        assert store.version != before and store.stale_count() == 0
+        store.design_many(slabs[:10])
+        assert store.stats['design_misses'] == 10
+    assert engine_version() == store.version
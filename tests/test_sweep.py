@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from twowayslab.core import calculate_detailed
+from twowayslab.sweep import governing, sweep
+
+
+@pytest.fixture
+def base(slabs):
+    return dict(slabs[0])
+
+
+def test_grid_points_match_calculate_detailed(base):
+    hs, fcs = np.linspace(base['cover'] + 4, 30, 7), np.linspace(180, 350, 5)
+    res = sweep(base, ('h', hs), ('fc', fcs), cases=range(1, 10))
+    assert res['s_min'].shape == (9, 5, 7)
+    for c in (1, 5, 9):
+        for iy, fc in enumerate(fcs):
+            for ix, h in enumerate(hs):
+                rs = calculate_detailed({**base, 'h': h, 'fc': fc, 'case': c})[1]
+                for loc in ('a_neg', 'a_pos', 'b_neg', 'b_pos'):
+                    assert res[f's_{loc}'][c - 1, iy, ix] == rs[f's_{loc}'], (c, fc, h, loc)
+
+
+def test_governing_picks_the_worst_case(base):
+    res = sweep(base, ('Lx', np.linspace(2, 6, 9)), cases=range(1, 10))
+    worst, case = governing(res, 's_min')
+    assert np.array_equal(worst, res['s_min'].min(axis=0))
+    assert np.array_equal(res['s_min'][case - 1, np.arange(1)[:, None], np.arange(9)], worst)
+
+
+@pytest.mark.parametrize("x, y, message", [
+    (('h', [12.0, 0.0]), None, "sweep point h=0.0: h must be greater than 0"),
+    (('fc', [240.0, np.nan]), None, "sweep point fc=nan: fc must be a finite number"),
+    (('cover', [2.0, 3.0]), ('h', [10.0, 2.5]), "sweep point cover=3.0, h=2.5: h must be greater than cover"),
+    (('h', [5.0, 4.0]), ('bar', ['DB12', 'DB16']), "sweep point h=4.0, bar=DB16: effective depth must be positive"),
+])
+def test_invalid_grid_points_raise(base, x, y, message):
+    base.update(cover=2.0, bar='DB12')
+    with pytest.raises(ValueError, match=message):
+        sweep(base, x, y)
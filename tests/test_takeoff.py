@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from twowayslab.bench import synthetic_schedule
+from twowayslab.core import DESIGN_FIELDS, design_table
+from twowayslab.takeoff import bar_pieces, cut_stock, takeoff_table
+
+
+def _check_plan(cut, lengths, counts, stock):
+    cut_count = {}
+    for S, pieces, repeat in cut['patterns']:
+        assert S in stock
+        assert sum(l * n for l, n in pieces.items()) <= S + 1e-9
+        for l, n in pieces.items():
+            cut_count[l] = cut_count.get(l, 0) + n * repeat
+    for l, n in zip(lengths, counts):
+        assert cut_count.get(round(l, 2), 0) >= n
+    assert cut['stock_m'] == pytest.approx(sum(S * k for S, k in cut['bars'].items()))
+    assert cut['waste_m'] == pytest.approx(cut['stock_m'] - cut['demand_m'])
+
+
+def test_bar_pieces_follow_spacing():
+    spacings = {'s_a_neg': [20.0], 's_a_pos': [25.0], 's_b_neg': [float('inf')], 's_b_pos': [30.0]}
+    p = bar_pieces([4.0], [5.0], "DB12", spacings)
+    by_loc = {r['location']: r for r in p}
+    assert set(by_loc) == {'a_neg', 'a_pos', 'b_pos'}  # infinite spacing: no bars
+    assert by_loc['a_pos']['count'] == 500 // 25 + 1  # short-span bars spread over Ly
+    assert by_loc['a_neg']['count'] == 2 * (500 // 20 + 1)  # top bars at both supports
+    assert by_loc['b_pos']['count'] == 400 // 30 + 1
+    assert by_loc['a_pos']['length'] == pytest.approx(4.0 + 2 * 12 * 0.012)
+
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_cutting_plans_fit_their_stock(exact):
+    rng = np.random.default_rng(5)
+    lengths = np.round(rng.uniform(0.8, 6.5, 25), 2)
+    counts = rng.integers(1, 40, 25)
+    cut = cut_stock(lengths, counts, exact=exact)
+    _check_plan(cut, lengths, counts, (10.0, 12.0))
+    if exact:
+        assert cut['demand_m'] <= cut['lower_bound_m'] <= cut['stock_m'] + 1e-9
+        assert cut['stock_m'] <= cut_stock(lengths, counts)['stock_m']
+
+
+def test_exact_proves_a_perfect_fit():
+    cut = cut_stock([5.0, 4.0, 6.0], [4, 3, 3], stock=(10.0,), exact=True)
+    assert cut['optimal'] and cut['waste_m'] == pytest.approx(0.0)
+    assert cut['bars'] == {10.0: 5}
+
+
+def test_long_pieces_are_lapped():
+    cut = cut_stock([20.0], [2], stock=(12.0,), lap=0.5)
+    assert sorted({p for _, ps, _ in cut['patterns'] for p in ps}) == [8.5, 12.0]  # 12 + 8.5, overlapping 0.5
+    assert cut['demand_m'] == pytest.approx(2 * 20.5)
+
+
+def test_stopped_lp_bound_is_at_least_the_demand():
+    s = synthetic_schedule(120)
+    table = design_table(*[[p[k] for p in s] for k in DESIGN_FIELDS])
+    res = takeoff_table(table, exact=True, time_limit=0.01)
+    for bar, cut in res['cutting'].items():
+        assert cut['lower_bound_m'] >= cut['demand_m']
+        assert 0 <= cut['gap_m'] <= cut['waste_m'] + 1e-9, bar
+        assert cut['demand_m'] >= res['summary'][bar]['length_m']  # plus laps, rounded up to cm
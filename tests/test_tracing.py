@@ -0,0 +1,65 @@
+import json
+import os
+import threading
+import tracemalloc
+
+from twowayslab.core import calculate_detailed
+from twowayslab.parallel import build_report, generate_reports
+from twowayslab.tracing import Tracer, format_summary, span
+
+
+def test_report_stages_are_recorded_with_payloads(slabs):
+    with Tracer() as tracer:
+        with span("whole", slab=slabs[0]['slab_id']):
+            html = build_report(slabs[0], backend="svg")
+    by_name = {e['name']: e for e in tracer.events}
+    assert {'calculate_detailed', 'plot_twoway_section_svg', 'generate_html_report', 'whole'} <= set(by_name)
+    assert by_name['generate_html_report']['args']['payload_bytes'] == len(html.encode('utf-8'))
+    assert by_name['whole']['args'] == {'slab': slabs[0]['slab_id']}
+    whole = by_name['whole']
+    for e in tracer.events:
+        assert whole['ts'] <= e['ts'] and e['ts'] + e['dur'] <= whole['ts'] + whole['dur'] + 1
+    rows = tracer.summary()
+    assert [r['total_ms'] for r in rows] == sorted((r['total_ms'] for r in rows), reverse=True)
+    assert "generate_html_report" in format_summary(rows)
+
+
+def test_nothing_is_recorded_without_an_active_tracer(slabs):
+    tracer = Tracer()
+    calculate_detailed(slabs[0])
+    with tracer:
+        pass
+    calculate_detailed(slabs[0])
+    assert tracer.events == []
+
+
+def test_tracer_only_sees_its_own_thread(slabs):
+    with Tracer() as tracer:
+        t = threading.Thread(target=calculate_detailed, args=(slabs[0],))
+        t.start()
+        t.join()
+    assert tracer.events == []
+
+
+def test_allocations_are_measured_and_tracemalloc_restored(slabs):
+    assert not tracemalloc.is_tracing()
+    with Tracer(allocations=True) as tracer:
+        build_report(slabs[0], backend="svg")
+    assert not tracemalloc.is_tracing()
+    assert all('alloc_bytes' in e['args'] and e['args']['peak_bytes'] >= 0 for e in tracer.events)
+    html = next(e for e in tracer.events if e['name'] == 'generate_html_report')
+    assert html['args']['peak_bytes'] >= html['args']['payload_bytes']
+
+
+def test_worker_spans_are_merged_into_the_chrome_trace(tmp_path, slabs):
+    with Tracer() as tracer:
+        list(generate_reports(slabs[:8], workers=2, chunksize=2, backend="svg"))
+    pids = {e['pid'] for e in tracer.events}
+    assert os.getpid() not in pids and len(pids) >= 1
+    assert sum(e['name'] == 'generate_html_report' for e in tracer.events) == 8
+    path = tmp_path / "trace.json"
+    tracer.write_chrome_trace(path)
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    meta = [e for e in trace['traceEvents'] if e['ph'] == 'M']
+    assert {e['pid'] for e in meta} == pids
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in trace['traceEvents'] if e['ph'] != 'M')
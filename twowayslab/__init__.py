@@ -0,0 +1,15 @@
+"""
+RC two-way slab design (ACI Method 2) as an importable library.
+Importing the package loads only NumPy; matplotlib is pulled in lazily by
+the "matplotlib" drawing backend and Streamlit only by app2wayslab.py.
+"""
+from .core import (ACI_318_COMBINATIONS, ACI_COEFFICIENTS, BAR_INFO, CASE_DESC, DESIGN_FIELDS, LOAD_COMBINATIONS,
+                   RECORD_DTYPE, RECORD_FIELDS, SlabResult, batch_rows, build_coefficient_tables, calculate_detailed,
+                   calculate_min_thickness, design_batch, design_table, fmt, get_coefficients, get_coefficients_batch,
+                   reload_coefficient_tables, results_table)
+from .drawcache import DrawingCache, section_key
+from .drawing import fig_to_base64, plot_twoway_section_detailed, plot_twoway_section_svg, render_section
+from .report import HTMLReportWriter, export_html, generate_html_report, write_html_report
+from .parallel import build_report, generate_reports
+from .store import ResultStore, engine_version
+from .tracing import Tracer
@@ -0,0 +1,216 @@
+"""
+Benchmark suite: per-stage and end-to-end timings with scaling curves.
+
+    python -m twowayslab.bench                              # default sizes
+    python -m twowayslab.bench --sizes 1,100,100000 --json out.json
+    python -m twowayslab.bench --save-baseline baseline.json
+    python -m twowayslab.bench --baseline baseline.json     # exit 1 on regression
+
+The synthetic schedule is seeded, and cycles through every CASE_DESC case
+and every BAR_INFO bar, so runs are reproducible and cover every table.
+Rendering stages are capped at --max-render slabs per size because one
+matplotlib figure takes ~100 ms.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from .core import (BAR_INFO, CASE_DESC, DESIGN_FIELDS, calculate_detailed, calculate_min_thickness,
+                   design_batch, get_coefficients, get_coefficients_batch)
+
+DEFAULT_SIZES = (1, 10, 100, 1000, 10000, 100000)
+
+
+# ==========================================
+# 1. SYNTHETIC SCHEDULE
+# ==========================================
+def synthetic_schedule(n, seed=0):
+    """n reproducible slab inputs covering all cases and bars."""
+    rng = random.Random(seed)
+    cases = sorted(CASE_DESC)
+    bars = list(BAR_INFO)
+    out = []
+    for i in range(n):
+        Lx = round(rng.uniform(2.0, 6.0), 2)
+        Ly = round(Lx * rng.uniform(1.0, 2.2), 2)
+        out.append({
+            'project': "Benchmark", 'slab_id': f"S-{i + 1:06d}", 'engineer': "bench",
+            'Lx': Lx, 'Ly': Ly, 'h': rng.choice([10.0, 12.0, 12.5, 15.0, 18.0]),
+            'cover': rng.choice([2.0, 2.5, 3.0]), 'sdl': rng.choice([100.0, 150.0, 250.0]),
+            'll': rng.choice([150.0, 200.0, 300.0, 500.0]), 'fc': rng.choice([210.0, 240.0, 280.0, 320.0]),
+            'fy': rng.choice([2400.0, 4000.0, 5000.0]),
+            'case': cases[i % len(cases)], 'bar': bars[(i // len(cases)) % len(bars)],
+        })
+    return out
+
+
+# ==========================================
+# 2. STAGES
+# ==========================================
+# Each stage is (name, per_item, prepare, run, setup):
+#   per_item -- True: run(item) is timed per slab (latency percentiles)
+#               False: run(prepared) is timed once for the whole batch
+#   prepare  -- builds the stage input from the schedule outside the timing,
+#               once per size (not per repeat)
+#   setup    -- per-item stages only, optional: turns one prepared item into
+#               the run argument just before it is timed, e.g. opens the
+#               figure fig_to_base64 then encodes and closes, so only one
+#               figure is open at a time
+def _designed(schedule):
+    return [(p, calculate_detailed(p)) for p in schedule]
+
+
+def _open_figure(d):
+    from .drawing import plot_twoway_section_detailed
+    p, (_, rs) = d
+    return plot_twoway_section_detailed(p['h'], p['cover'], p['bar'], rs, p['Lx'])
+
+
+def _end_to_end(p):
+    # No DrawingCache: every call designs, draws and renders from scratch
+    from .parallel import build_report
+    return build_report(p, backend="matplotlib")
+
+
+def _stages():
+    from .drawing import fig_to_base64, plot_twoway_section_detailed, plot_twoway_section_svg
+    from .report import generate_html_report
+
+    return [
+        ("get_coefficients", True, lambda s: [(p['case'], p['Lx'] / p['Ly']) for p in s],
+         lambda cm: get_coefficients(*cm), None),
+        ("get_coefficients_batch", False,
+         lambda s: (np.array([p['case'] for p in s]), np.array([p['Lx'] / p['Ly'] for p in s])),
+         lambda a: get_coefficients_batch(*a), None),
+        ("calculate_min_thickness", True, lambda s: s,
+         lambda p: calculate_min_thickness(p['Lx'], p['Ly'], p['fy']), None),
+        ("calculate_detailed", True, lambda s: s, calculate_detailed, None),
+        ("design_batch", False, lambda s: [[p[k] for p in s] for k in DESIGN_FIELDS],
+         lambda cols: design_batch(*cols), None),
+        ("plot_twoway_section_detailed", True, _designed,
+         lambda d: _close(plot_twoway_section_detailed(d[0]['h'], d[0]['cover'], d[0]['bar'], d[1][1], d[0]['Lx'])),
+         None),
+        ("fig_to_base64", True, _designed, fig_to_base64, _open_figure),
+        ("plot_twoway_section_svg", True, _designed,
+         lambda d: plot_twoway_section_svg(d[0]['h'], d[0]['cover'], d[0]['bar'], d[1][1], d[0]['Lx']), None),
+        ("generate_html_report", True, lambda s: [(p, rows, "data:image/png;base64,", rs)
+                                                  for p, (rows, rs) in _designed(s)],
+         lambda a: generate_html_report(*a), None),
+        ("end_to_end", True, lambda s: s, _end_to_end, None),
+    ]
+
+
+RENDER_STAGES = {"plot_twoway_section_detailed", "fig_to_base64", "end_to_end"}
+
+
+def _close(fig):
+    from .drawing import _pyplot
+    _pyplot().close(fig)
+
+
+# ==========================================
+# 3. RUNNER
+# ==========================================
+def run_stage(name, per_item, run, items, n, setup=None):
+    """
+    Time one stage on its prepared items (for n slabs); returns a result
+    dict. Per-item stages are timed per call, so setup stays untimed.
+    """
+    clock = time.perf_counter
+    if per_item:
+        lat = np.empty(len(items))
+        for i, item in enumerate(items):
+            if setup is not None:
+                item = setup(item)
+            t = clock()
+            run(item)
+            lat[i] = clock() - t
+        total = lat.sum()
+        p50, p95, p99 = (np.percentile(lat, q) * 1e3 for q in (50, 95, 99))
+    else:
+        t = clock()
+        run(items)
+        total = clock() - t
+        p50 = p95 = p99 = total * 1e3 / max(n, 1)
+    return {'stage': name, 'n': n, 'total_s': total, 'throughput': n / total if total > 0 else float('inf'),
+            'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99}
+
+
+def run_suite(sizes=DEFAULT_SIZES, stages=None, max_render=100, seed=0, repeat=1, min_time=0.2,
+              out=sys.stdout):
+    """
+    Run every selected stage at every size. Each point is repeated at least
+    `repeat` times and until `min_time` seconds were spent; the best
+    throughput is kept. Each stage gets one untimed warm-up slab (imports,
+    caches) first.
+    """
+    results = []
+    full = synthetic_schedule(max(sizes), seed)
+    for name, per_item, prepare, run, setup in _stages():
+        if stages and name not in stages:
+            continue
+        run_stage(name, per_item, run, prepare(full[:1]), 1, setup)
+        for n in sizes:
+            if name in RENDER_STAGES and n > max_render:
+                continue
+            items = prepare(full[:n])
+            runs = []
+            while len(runs) < repeat or sum(r['total_s'] for r in runs) < min_time:
+                runs.append(run_stage(name, per_item, run, items, n, setup))
+            r = max(runs, key=lambda x: x['throughput'])
+            results.append(r)
+            if out:
+                print(f"{name:30s} n={n:>7d}  {r['throughput']:>12.1f}/s  p50={r['p50_ms']:.4f}ms  "
+                      f"p95={r['p95_ms']:.4f}ms  p99={r['p99_ms']:.4f}ms", file=out)
+    return results
+
+
+def check_regressions(results, baseline, tolerance=0.25):
+    """(stage, n, baseline, current) for every throughput more than `tolerance` below baseline."""
+    base = {(b['stage'], b['n']): b['throughput'] for b in baseline}
+    bad = []
+    for r in results:
+        ref = base.get((r['stage'], r['n']))
+        if ref and r['throughput'] < ref * (1 - tolerance):
+            bad.append((r['stage'], r['n'], ref, r['throughput']))
+    return bad
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m twowayslab.bench", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated slab counts")
+    ap.add_argument("--stages", help="comma-separated stage names (default: all)")
+    ap.add_argument("--max-render", type=int, default=100, help="max slabs for matplotlib stages")
+    ap.add_argument("--repeat", type=int, default=1, help="minimum runs per point, best throughput kept")
+    ap.add_argument("--min-time", type=float, default=0.2, help="minimum seconds spent per point")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", help="write results to this JSON file")
+    ap.add_argument("--save-baseline", help="write results as the new baseline")
+    ap.add_argument("--baseline", help="compare against this baseline and exit 1 on regression")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed throughput drop (fraction)")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    stages = set(args.stages.split(",")) if args.stages else None
+    results = run_suite(sizes, stages, args.max_render, args.seed, args.repeat, args.min_time)
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            bad = check_regressions(results, json.load(f), args.tolerance)
+        for stage, n, ref, cur in bad:
+            print(f"REGRESSION {stage} n={n}: {cur:.1f}/s vs baseline {ref:.1f}/s", file=sys.stderr)
+        if bad:
+            return 1
+        print("No regressions.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+Command-line batch runner: stream a slab schedule through the design engine.
+
+    python -m twowayslab schedule.csv -o results.csv
+    python -m twowayslab schedule.jsonl -o - --out-format jsonl
+    python -m twowayslab schedule.csv -o results.csv --html-dir reports --workers 8
+    python -m twowayslab schedule.csv -o results.csv --pdf floor.pdf --font Sarabun-Regular.ttf
+    python -m twowayslab schedule.csv -o results.csv --html floor.html --backend svg
+    python -m twowayslab schedule.csv -o results.csv --html-dir reports --trace trace.json
+    python -m twowayslab schedule.csv -o results.csv --combinations "1.4D,1.2D+1.6L"
+    python -m twowayslab schedule.csv -o results.csv --combinations aci318 --pdf floor.pdf
+
+Rows are read, designed in fixed-size chunks and written back one by one,
+so memory stays constant whatever the schedule length.
+"""
+import argparse
+import collections
+import csv
+import itertools
+import json
+import os
+import re
+import sys
+
+from .core import (ACI_318_COMBINATIONS, BAR_INFO, CASE_DESC, DESIGN_FIELDS, ENVELOPE_FIELDS, LOAD_COMBINATIONS,
+                   batch_rows, check_inputs, design_batch)
+from .tracing import span
+
+INFO_FIELDS = ('project', 'slab_id', 'engineer')
+RESULT_FIELDS = ('m', 'wu', 'Ma_neg', 'Ma_pos', 'Mb_neg', 'Mb_pos',
+                 'As_a_neg', 'As_a_pos', 'As_b_neg', 'As_b_pos',
+                 's_a_neg', 's_a_pos', 's_b_neg', 's_b_pos', 'Vu', 'phiVc', 'shear')
+OUTPUT_FIELDS = INFO_FIELDS + DESIGN_FIELDS + RESULT_FIELDS + ('error',)
+# Extra columns with --combinations: the governing combination per moment and Vu
+COMBO_FIELDS = tuple(f'combo_{k}' for k in ENVELOPE_FIELDS)
+COMBINATION_PRESETS = {'legacy': LOAD_COMBINATIONS, 'aci318': ACI_318_COMBINATIONS}
+
+# Same defaults as the sidebar form; Lx and Ly are always required
+DEFAULTS = {'project': '', 'slab_id': '', 'engineer': '', 'h': 12.0, 'cover': 2.5,
+            'sdl': 150.0, 'll': 200.0, 'fc': 240.0, 'fy': 4000.0, 'case': 1, 'bar': 'RB9'}
+
+
+# ==========================================
+# 1. READ / PARSE
+# ==========================================
+def _detect_format(path, explicit):
+    if explicit:
+        return explicit
+    return 'jsonl' if str(path).lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def read_schedule(stream, fmt='csv'):
+    """
+    Yield one raw dict per slab, without reading the whole file. A JSONL
+    line that does not parse is yielded as its ValueError, which parse_row
+    raises, so it becomes an error row instead of ending the run.
+    """
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield ValueError(f"invalid JSON: {e}")
+
+
+def parse_row(raw):
+    """Typed design inputs from one raw schedule row. Raises ValueError."""
+    if isinstance(raw, ValueError):  # unreadable line, see read_schedule
+        raise raw
+    if not isinstance(raw, dict):
+        raise ValueError(f"expected a JSON object, got {type(raw).__name__}")
+    row = {k: v for k, v in raw.items() if v not in (None, '')}
+    for k in ('Lx', 'Ly'):
+        if k not in row:
+            raise ValueError(f"missing {k}")
+    inputs = {k: row.get(k, DEFAULTS.get(k)) for k in INFO_FIELDS + DESIGN_FIELDS}
+    for k in DESIGN_FIELDS[:8]:
+        inputs[k] = float(inputs[k])
+    inputs['case'] = int(float(inputs['case']))
+    inputs['bar'] = str(inputs['bar']).strip()
+    if inputs['case'] not in CASE_DESC:
+        raise ValueError(f"unknown case {inputs['case']}")
+    if inputs['bar'] not in BAR_INFO:
+        raise ValueError(f"unknown bar {inputs['bar']}")
+    # Same auto-swap as the app: Lx is always the short span
+    if inputs['Lx'] > inputs['Ly'] > 0:
+        inputs['Lx'], inputs['Ly'] = inputs['Ly'], inputs['Lx']
+    check_inputs(inputs)
+    return inputs
+
+
+def parse_combinations(text):
+    """
+    Load combinations from a preset name (legacy, aci318) or a comma list
+    such as "1.4D, 1.2D+1.6L". Live load uses the pattern coefficients
+    unless the term ends in ":uniform", e.g. "1.2D+1.6L:uniform".
+    """
+    if text.strip().lower() in COMBINATION_PRESETS:
+        return dict(COMBINATION_PRESETS[text.strip().lower()])
+    out = {}
+    for term in text.split(","):
+        name, sep, loading = term.replace(" ", "").partition(":")
+        match = re.fullmatch(r"(\d*\.?\d+)D(?:\+(\d*\.?\d+)L)?|(\d*\.?\d+)L", name)
+        if not match or sep and loading.lower() not in ("pattern", "uniform"):
+            raise ValueError(f"bad load combination {term.strip()!r} "
+                             f"(expected e.g. 1.2D+1.6L or 1.2D+1.6L:uniform)")
+        pattern = loading.lower() != "uniform"
+        if not pattern:
+            name += ":uniform"
+        if name in out:
+            raise ValueError(f"duplicate load combination {name!r}")
+        out[name] = (float(match[1] or 0), float(match[2] or match[3] or 0), pattern)
+    return out
+
+
+# ==========================================
+# 2. DESIGN
+# ==========================================
+def design_rows(raw_rows, chunk_size=512, store=None, combinations=None):
+    """
+    Design a stream of raw rows; yields one output dict per input row, in order.
+    With a ResultStore, only panels not already stored are computed. With
+    load combinations, results are their envelope (see design_batch).
+    """
+    raw_rows = iter(raw_rows)
+    row_no = 0
+    while True:
+        chunk = list(itertools.islice(raw_rows, chunk_size))
+        if not chunk:
+            return
+        parsed = []
+        for raw in chunk:
+            row_no += 1
+            try:
+                parsed.append((raw, parse_row(raw), None))
+            except (ValueError, TypeError) as e:
+                parsed.append((raw, None, f"row {row_no}: {e}"))
+
+        ok = [p for _, p, _ in parsed if p is not None]
+        if not ok:
+            res = iter(())
+        elif store is not None:
+            res = iter(store.design_many(ok, combinations))
+        else:
+            res = iter(batch_rows(design_batch(*[[p[k] for p in ok] for k in DESIGN_FIELDS],
+                                               combinations=combinations)))
+        for raw, inputs, err in parsed:
+            if inputs is None:
+                src = raw if isinstance(raw, dict) else {}
+                yield {**{k: src.get(k, '') for k in INFO_FIELDS + DESIGN_FIELDS}, 'error': err}
+                continue
+            yield result_row(inputs, next(res))
+
+
+def result_row(inputs, r):
+    """One output dict from parsed inputs and their batch_rows result."""
+    out = dict(inputs)
+    for k in RESULT_FIELDS[:-1]:
+        out[k] = r[k]
+    out['shear'] = "PASS" if r['shear_ok'] else "FAIL"
+    out['error'] = ''
+    for k in COMBO_FIELDS:
+        if k in r:
+            out[k] = r[k]
+    return out
+
+
+# ==========================================
+# 3. WRITE
+# ==========================================
+def write_results(results, stream, fmt='csv', fields=OUTPUT_FIELDS):
+    n = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for r in results:
+            writer.writerow(r)
+            n += 1
+    else:
+        for r in results:
+            stream.write(json.dumps(r, ensure_ascii=False) + "\n")
+            n += 1
+    return n
+
+
+def write_reports(schedule, fmt, out_dir, workers=None, backend="matplotlib", store=None, drawing_cache=None,
+                  combinations=None):
+    """Second pass over the schedule file: one HTML report per valid slab."""
+    from .parallel import generate_reports
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(schedule, newline='', encoding='utf-8-sig') as fin:
+        names = collections.deque()
+
+        def inputs_iter():
+            for n, raw in enumerate(read_schedule(fin, fmt), 1):
+                try:
+                    inputs = parse_row(raw)
+                except (ValueError, TypeError):
+                    continue
+                names.append(re.sub(r'[^\w.-]+', '_', inputs['slab_id']) or f"slab_{n:05d}")
+                yield inputs
+
+        n = 0
+        for n, html in enumerate(generate_reports(inputs_iter(), workers=workers, backend=backend, store=store,
+                                                     drawing_cache=drawing_cache, combinations=combinations), 1):
+            with open(os.path.join(out_dir, f"{n:05d}_{names.popleft()}.html"), 'w', encoding='utf-8') as f:
+                f.write(html)
+    return n
+
+
+def _valid_inputs(schedule, fmt):
+    with open(schedule, newline='', encoding='utf-8-sig') as fin:
+        for raw in read_schedule(fin, fmt):
+            try:
+                yield parse_row(raw)
+            except (ValueError, TypeError):
+                continue
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m twowayslab",
+                                 description="Batch design of RC two-way slabs from a CSV/JSONL schedule.")
+    ap.add_argument("schedule", help="input schedule (.csv or .jsonl), '-' for stdin")
+    ap.add_argument("-o", "--output", default="-", help="output file, '-' for stdout (default)")
+    ap.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from extension)")
+    ap.add_argument("--out-format", choices=["csv", "jsonl"], help="output format (default: from extension)")
+    ap.add_argument("--chunk-size", type=int, default=512, help="rows designed per vectorized batch")
+    ap.add_argument("--html-dir", help="also write one HTML report per slab into this directory")
+    ap.add_argument("--workers", type=int, help="report worker processes (default: CPU count)")
+    ap.add_argument("--backend", choices=["matplotlib", "svg"], default="matplotlib",
+                    help="drawing backend for HTML reports")
+    ap.add_argument("--html", help="also write all slab reports into one HTML document with a table of contents")
+    ap.add_argument("--pdf", help="also write all slab reports into this PDF file")
+    ap.add_argument("--font", help="TrueType font for the PDF (needed for Thai text)")
+    ap.add_argument("--bold-font", help="bold TrueType font for the PDF (default: --font)")
+    ap.add_argument("--store", help="SQLite result store; only new or changed panels are recomputed")
+    ap.add_argument("--drawing-cache", help="directory of rendered drawings reused across slabs and runs")
+    ap.add_argument("--invalidate", action="store_true",
+                    help="purge store entries from older coefficient tables / code before running")
+    ap.add_argument("--combinations", type=_combinations_arg, metavar="SPEC",
+                    help="design for the envelope of these load combinations, e.g. \"1.4D,1.2D+1.6L\" or a preset "
+                         "(legacy, aci318); append :uniform to a term to drop pattern loading. Adds the governing "
+                         "combination per moment to the results and reports")
+    ap.add_argument("--trace", help="write per-stage timings as a Chrome trace JSON file")
+    ap.add_argument("--trace-allocations", action="store_true", help="also record allocations in the trace (slower)")
+    args = ap.parse_args(argv)
+    if not args.trace:
+        return _run(ap, args)
+
+    from .tracing import Tracer, format_summary
+    with Tracer(allocations=args.trace_allocations) as tracer:
+        rc = _run(ap, args)
+    tracer.write_chrome_trace(args.trace)
+    print(format_summary(tracer.summary()), file=sys.stderr)
+    print(f"Wrote {len(tracer.events)} trace events to {args.trace}", file=sys.stderr)
+    return rc
+
+
+def _combinations_arg(text):
+    try:
+        return parse_combinations(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _run(ap, args):
+    if args.schedule == "-":
+        for flag, value in (("--html-dir", args.html_dir), ("--html", args.html), ("--pdf", args.pdf)):
+            if value:
+                ap.error(f"{flag} needs a schedule file, not stdin")
+    in_fmt = _detect_format(args.schedule, args.format)
+    out_fmt = _detect_format(args.output, args.out_format)
+    store = None
+    if args.store:
+        from .store import ResultStore
+        store = ResultStore(args.store)
+        if args.invalidate:
+            print(f"Invalidated {store.invalidate()} stored entries", file=sys.stderr)
+    fin = sys.stdin if args.schedule == "-" else open(args.schedule, newline='', encoding='utf-8-sig')
+    fout = sys.stdout if args.output == "-" else open(args.output, 'w', newline='', encoding='utf-8')
+    try:
+        with span("design schedule"):
+            fields = OUTPUT_FIELDS + (COMBO_FIELDS if args.combinations else ())
+            n = write_results(design_rows(read_schedule(fin, in_fmt), args.chunk_size, store, args.combinations),
+                              fout, out_fmt, fields)
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    print(f"Designed {n} slabs", file=sys.stderr)
+    if args.html_dir:
+        with span("html reports"):
+            n = write_reports(args.schedule, in_fmt, args.html_dir, args.workers, args.backend, store,
+                              args.drawing_cache, args.combinations)
+        print(f"Wrote {n} reports to {args.html_dir}", file=sys.stderr)
+    if args.html:
+        from .drawcache import DrawingCache
+        from .report import export_html
+        cache = DrawingCache(directory=args.drawing_cache) if args.drawing_cache else None
+        with span("html document"):
+            n = export_html(_valid_inputs(args.schedule, in_fmt), args.html, args.backend, cache=cache,
+                            combinations=args.combinations)
+        print(f"Wrote {n} slabs to {args.html}", file=sys.stderr)
+    if args.pdf:
+        from .pdf import export_pdf
+        with span("pdf document"):
+            n = export_pdf(_valid_inputs(args.schedule, in_fmt), args.pdf, args.font, args.bold_font,
+                           args.combinations)
+        print(f"Wrote {n} slabs to {args.pdf}", file=sys.stderr)
+    if store is not None:
+        print("Store: " + ", ".join(f"{k}={v}" for k, v in store.stats.items()), file=sys.stderr)
+        store.close()
+    return 0
@@ -0,0 +1,621 @@
+"""
+Calculation core for the RC two-way slab design (ACI Method 2).
+Pure NumPy: importing this module never loads Streamlit or matplotlib.
+"""
+import bisect
+import math
+
+import numpy as np
+
+from .tracing import traced
+
+# ==========================================
+# 1. DATABASE & CONSTANTS
+# ==========================================
+CASE_DESC = {
+    1: "All Continuous", 2: "Short Discontinuous", 3: "Long Discontinuous",
+    4: "2 Short + 1 Long Discont.", 5: "2 Long + 1 Short Discont.", 6: "2 Adjacent Discont.",
+    7: "1 Short Discont.", 8: "1 Long Discont.", 9: "All Discontinuous"
+}
+
+ACI_COEFFICIENTS = {
+    1: {1.00: [0.033, 0.018, 0.027, 0.033, 0.018, 0.027], 0.95: [0.036, 0.020, 0.030, 0.033, 0.017, 0.026],
+        0.90: [0.040, 0.023, 0.032, 0.033, 0.016, 0.025], 0.85: [0.045, 0.025, 0.035, 0.033, 0.015, 0.024],
+        0.80: [0.050, 0.028, 0.039, 0.033, 0.014, 0.022], 0.75: [0.056, 0.031, 0.043, 0.033, 0.013, 0.021],
+        0.70: [0.063, 0.035, 0.047, 0.033, 0.012, 0.019], 0.65: [0.070, 0.038, 0.052, 0.033, 0.011, 0.017],
+        0.60: [0.077, 0.042, 0.057, 0.033, 0.010, 0.016], 0.55: [0.084, 0.045, 0.062, 0.033, 0.009, 0.014],
+        0.50: [0.091, 0.049, 0.068, 0.033, 0.008, 0.012]},
+    2: {1.00: [0.041, 0.021, 0.031, 0.041, 0.021, 0.031], 0.90: [0.048, 0.026, 0.036, 0.037, 0.018, 0.027],
+        0.80: [0.058, 0.031, 0.042, 0.032, 0.015, 0.023], 0.70: [0.070, 0.037, 0.050, 0.027, 0.012, 0.019],
+        0.60: [0.083, 0.044, 0.059, 0.022, 0.009, 0.015], 0.50: [0.097, 0.051, 0.069, 0.017, 0.007, 0.011]},
+    3: {1.00: [0.041, 0.021, 0.031, 0.041, 0.021, 0.031], 0.90: [0.040, 0.021, 0.030, 0.045, 0.023, 0.034],
+        0.80: [0.039, 0.020, 0.029, 0.051, 0.025, 0.037], 0.70: [0.036, 0.019, 0.027, 0.057, 0.028, 0.041],
+        0.60: [0.033, 0.017, 0.024, 0.065, 0.031, 0.046], 0.50: [0.029, 0.015, 0.022, 0.074, 0.035, 0.052]},
+    4: {1.00: [0.049, 0.025, 0.036, 0.048, 0.025, 0.036], 0.90: [0.057, 0.030, 0.041, 0.044, 0.022, 0.032],
+        0.80: [0.067, 0.035, 0.048, 0.038, 0.018, 0.027], 0.70: [0.078, 0.041, 0.056, 0.032, 0.015, 0.022],
+        0.60: [0.090, 0.048, 0.065, 0.025, 0.011, 0.017], 0.50: [0.103, 0.055, 0.074, 0.019, 0.008, 0.012]},
+    5: {1.00: [0.048, 0.025, 0.036, 0.049, 0.025, 0.036], 0.90: [0.048, 0.024, 0.035, 0.055, 0.028, 0.040],
+        0.80: [0.046, 0.023, 0.033, 0.062, 0.031, 0.045], 0.70: [0.044, 0.022, 0.031, 0.071, 0.035, 0.051],
+        0.60: [0.040, 0.020, 0.028, 0.081, 0.040, 0.058], 0.50: [0.036, 0.018, 0.025, 0.092, 0.045, 0.065]},
+    6: {1.00: [0.048, 0.025, 0.036, 0.048, 0.025, 0.036], 0.90: [0.055, 0.029, 0.041, 0.044, 0.022, 0.032],
+        0.80: [0.063, 0.033, 0.047, 0.039, 0.019, 0.027], 0.70: [0.074, 0.039, 0.054, 0.033, 0.016, 0.023],
+        0.60: [0.086, 0.045, 0.063, 0.027, 0.012, 0.018], 0.50: [0.099, 0.052, 0.072, 0.021, 0.009, 0.013]},
+    7: {1.00: [0.041, 0.021, 0.031, 0.041, 0.021, 0.031], 0.90: [0.045, 0.024, 0.034, 0.039, 0.020, 0.028],
+        0.80: [0.051, 0.027, 0.038, 0.036, 0.017, 0.025], 0.70: [0.058, 0.031, 0.043, 0.032, 0.015, 0.021],
+        0.60: [0.066, 0.036, 0.049, 0.028, 0.012, 0.018], 0.50: [0.074, 0.040, 0.055, 0.024, 0.010, 0.014]},
+    8: {1.00: [0.041, 0.021, 0.031, 0.041, 0.021, 0.031], 0.90: [0.043, 0.022, 0.032, 0.044, 0.023, 0.033],
+        0.80: [0.045, 0.023, 0.033, 0.048, 0.024, 0.035], 0.70: [0.047, 0.024, 0.035, 0.052, 0.026, 0.038],
+        0.60: [0.050, 0.025, 0.037, 0.057, 0.028, 0.042], 0.50: [0.053, 0.027, 0.039, 0.063, 0.031, 0.046]},
+    9: {1.00: [0.057, 0.029, 0.041, 0.057, 0.029, 0.041], 0.90: [0.064, 0.033, 0.046, 0.053, 0.027, 0.037],
+        0.80: [0.072, 0.037, 0.052, 0.048, 0.024, 0.033], 0.70: [0.082, 0.043, 0.059, 0.042, 0.020, 0.028],
+        0.60: [0.093, 0.049, 0.067, 0.036, 0.017, 0.022], 0.50: [0.106, 0.056, 0.076, 0.029, 0.013, 0.017]}
+}
+
+BAR_INFO = {
+    'RB6': {'A_cm2': 0.283, 'd_mm': 6},
+    'RB9': {'A_cm2': 0.636, 'd_mm': 9},
+    'DB10': {'A_cm2': 0.785, 'd_mm': 10},
+    'DB12': {'A_cm2': 1.131, 'd_mm': 12},
+    'DB16': {'A_cm2': 2.011, 'd_mm': 16}
+}
+
+# Engineering inputs of one panel, in design_batch argument order
+DESIGN_FIELDS = ('Lx', 'Ly', 'h', 'cover', 'sdl', 'll', 'fc', 'fy', 'case', 'bar')
+
+# Load combinations: name -> (dead load factor, live load factor, pattern).
+# With pattern=True the live load takes the pattern-loading coefficients
+# Ca_ll / Cb_ll in the positive moments, as in the original method; with
+# pattern=False it is treated as uniform and takes Ca_dl / Cb_dl.
+LOAD_COMBINATIONS = {'1.4D+1.7L': (1.4, 1.7, True)}
+ACI_318_COMBINATIONS = {'1.4D': (1.4, 0.0, True), '1.2D+1.6L': (1.2, 1.6, True)}
+# Results that record their governing combination (spacings follow their moment)
+ENVELOPE_FIELDS = ('Ma_neg', 'Ma_pos', 'Mb_neg', 'Mb_pos', 'Vu')
+
+
+# ==========================================
+# 2. HELPER FUNCTIONS
+# ==========================================
+def fmt(n, digits=2):
+    try:
+        val = float(n)
+        if math.isnan(val): return "-"
+        return f"{val:,.{digits}f}"
+    except:
+        return "-"
+
+
+def build_coefficient_tables(coefficients=None):
+    """
+    Pack ACI_COEFFICIENTS into dense arrays, built once at import.
+    Every case gets the same m-axis length; shorter tables are padded with
+    their m = 1.0 row so the padding never changes the bracket.
+    Returns (cases, m_axis[case, k], values[case, k, 6]).
+    """
+    coefficients = ACI_COEFFICIENTS if coefficients is None else coefficients
+    cases = np.array(sorted(coefficients.keys()))
+    n_k = max(len(t) for t in coefficients.values())
+    m_axis = np.empty((len(cases), n_k))
+    values = np.empty((len(cases), n_k, 6))
+    for i, c in enumerate(cases):
+        table = coefficients[int(c)]
+        keys = sorted(table.keys())
+        keys += [keys[-1]] * (n_k - len(keys))
+        m_axis[i] = keys
+        values[i] = [table[k] for k in keys]
+    return cases, m_axis, values
+
+
+def _scalar_tables(coefficients=None):
+    """case -> (sorted m keys, their rows) as plain lists, for the scalar lookup."""
+    coefficients = ACI_COEFFICIENTS if coefficients is None else coefficients
+    return {c: (sorted(t), [list(t[k]) for k in sorted(t)]) for c, t in coefficients.items()}
+
+
+_COEF_CASES, _COEF_M, _COEF_VALS = build_coefficient_tables()
+_COEF_LISTS = _scalar_tables()
+
+
+def reload_coefficient_tables():
+    """Rebuild the dense lookup tables after ACI_COEFFICIENTS has been edited."""
+    global _COEF_CASES, _COEF_M, _COEF_VALS, _COEF_LISTS
+    _COEF_CASES, _COEF_M, _COEF_VALS = build_coefficient_tables()
+    _COEF_LISTS = _scalar_tables()
+
+
+@traced()
+def get_coefficients_batch(case_arr, m_arr):
+    """
+    Vectorized get_coefficients: one row of 6 coefficients per (case, m) pair,
+    interpolated in a single step from the precomputed tables.
+    """
+    case_arr = np.asarray(case_arr, dtype=int)
+    m = np.clip(np.asarray(m_arr, dtype=float), 0.5, 1.0)
+    case_arr, m = np.broadcast_arrays(case_arr, m)
+    ci = np.searchsorted(_COEF_CASES, case_arr).clip(0, len(_COEF_CASES) - 1)
+    if np.any(_COEF_CASES[ci] != case_arr):
+        raise KeyError(f"Unknown case: {case_arr[_COEF_CASES[ci] != case_arr].flat[0]}")
+
+    keys = _COEF_M[ci]
+    i1 = (keys <= m[..., None]).sum(axis=-1) - 1
+    i2 = np.minimum(i1 + 1, keys.shape[-1] - 1)
+    m1 = np.take_along_axis(keys, i1[..., None], axis=-1)[..., 0]
+    m2 = np.take_along_axis(keys, i2[..., None], axis=-1)[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(m2 > m1, (m - m1) / (m2 - m1), 0.0)
+    v1 = _COEF_VALS[ci, i1]
+    v2 = _COEF_VALS[ci, i2]
+    return v1 + (v2 - v1) * ratio[..., None]
+
+
+def get_coefficients(case_num, m):
+    """
+    The 6 coefficients of one (case, m) pair: a bisect on the precomputed
+    m keys and the same interpolation as get_coefficients_batch, without
+    the array overhead.
+    """
+    m = max(0.5, min(1.0, m))
+    keys, rows = _COEF_LISTS[case_num]
+    i = bisect.bisect_right(keys, m) - 1
+    if i >= len(keys) - 1 or keys[i] == m:
+        return list(rows[i])
+    m1, m2 = keys[i], keys[i + 1]
+    ratio = (m - m1) / (m2 - m1)
+    return [v1 + (v2 - v1) * ratio for v1, v2 in zip(rows[i], rows[i + 1])]
+
+
+# --- Auto Calc Thickness ---
+def calculate_min_thickness(Lx_m, Ly_m, fy_ksc, beam_w_m=0.3):
+    """
+    Calculate min thickness based on ACI 318 for Two-Way Slabs with Beams (alpha_m >= 2.0).
+    Formula: h = Ln * (0.8 + fy/14000) / (36 + 9*beta)
+    fy in ksc
+    """
+    # Ensure Ly is long span
+    long_span = max(Lx_m, Ly_m)
+    short_span = min(Lx_m, Ly_m)
+
+    # Clear spans (Approximate by subtracting beam width)
+    ln = long_span - beam_w_m
+    sn = short_span - beam_w_m
+
+    if ln <= 0 or sn <= 0: return 10.0  # Fallback
+
+    beta = ln / sn
+
+    # ACI Formula Metric Equivalent (fy in ksc)
+    # Factor (0.8 + fy/14000) comes from (0.8 + fy_psi/200000)
+    numerator = ln * (0.8 + (fy_ksc / 14000))
+    denominator = 36 + (9 * beta)
+
+    h_m = numerator / denominator
+    h_cm = h_m * 100
+
+    # Check minimum 9cm per ACI
+    h_final = max(h_cm, 9.0)
+
+    # Round up to nearest 0.5 cm
+    h_final = math.ceil(h_final * 2) / 2
+    return h_final
+
+
+def min_thickness_batch(Lx_m, Ly_m, fy_ksc, beam_w_m=0.3):
+    """Vectorized calculate_min_thickness (same formula, fallback and rounding)."""
+    Lx_m, Ly_m, fy_ksc = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (Lx_m, Ly_m, fy_ksc)])
+    ln = np.maximum(Lx_m, Ly_m) - beam_w_m
+    sn = np.minimum(Lx_m, Ly_m) - beam_w_m
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = ln / sn
+        h_m = (ln * (0.8 + (fy_ksc / 14000))) / (36 + (9 * beta))
+    h_final = np.ceil(np.maximum(h_m * 100, 9.0) * 2) / 2
+    return np.where((ln <= 0) | (sn <= 0), 10.0, h_final)
+
+
+# ==========================================
+# 3. CALCULATION LOGIC
+# ==========================================
+def _bar_props(bar_arr):
+    names, inv = np.unique(np.asarray(bar_arr, dtype=str), return_inverse=True)
+    Ab = np.array([BAR_INFO[b]['A_cm2'] for b in names])[inv]
+    db = np.array([BAR_INFO[b]['d_mm'] for b in names], dtype=float)[inv]
+    return Ab, db
+
+
+def _rho_batch(Mu, d, fc, fy):
+    """Required steel ratio per strip; NaN/inf where the section cannot carry Mu."""
+    Mu_kgcm = Mu * 100
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        Rn = Mu_kgcm / (0.9 * 100 * d ** 2)
+        return (0.85 * fc / fy) * (1 - np.sqrt(1 - (2 * Rn) / (0.85 * fc)))
+
+
+def _as_spacing_batch(Mu, d, fc, fy, h, Ab):
+    rho = _rho_batch(Mu, d, fc, fy)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        rho = np.where(np.isfinite(rho), rho, 0.002)
+        As_req = np.maximum(rho * 100 * d, 0.0018 * 100 * h)
+        s = (Ab * 100) / As_req
+    s_final = np.floor(np.minimum(np.minimum(s, 3 * h), 45) * 2) / 2
+    return As_req, s, s_final
+
+
+def _as_spacing(Mu, d, fc, fy, h, Ab):
+    """Scalar _as_spacing_batch: same formula on Python floats, for one panel."""
+    try:
+        Rn = (Mu * 100) / (0.9 * 100 * d ** 2)
+        rho = (0.85 * fc / fy) * (1 - math.sqrt(1 - (2 * Rn) / (0.85 * fc)))
+    except (ValueError, ZeroDivisionError, OverflowError):
+        rho = 0.002
+    As_req = max(rho * 100 * d, 0.0018 * 100 * h)
+    s = (Ab * 100) / As_req
+    return As_req, s, math.floor(min(s, 3 * h, 45) * 2) / 2
+
+
+def _span_ratio(Lx, Ly):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return Lx / Ly
+
+
+def _loads_batch(h, sdl, ll):
+    """Self-weight, dead load and factored load (kg/m2)."""
+    w_sw = 2400 * (h / 100)
+    w_dl = w_sw + sdl
+    wu = 1.4 * w_dl + 1.7 * ll
+    return w_sw, w_dl, wu
+
+
+def _moments(coefs, wu, w_dl, w_ll, Lx):
+    """The four design moments from the six coefficients (scalars or arrays)."""
+    Ca_neg, Ca_dl, Ca_ll, Cb_neg, Cb_dl, Cb_ll = coefs
+    S2 = Lx ** 2
+    Ma_neg = Ca_neg * wu * S2
+    Ma_pos = (Ca_dl * 1.4 * w_dl * S2) + (Ca_ll * 1.7 * w_ll * S2)
+    Mb_neg = Cb_neg * wu * S2
+    Mb_pos = (Cb_dl * 1.4 * w_dl * S2) + (Cb_ll * 1.7 * w_ll * S2)
+    return Ma_neg, Ma_pos, Mb_neg, Mb_pos
+
+
+def _moments_batch(coefs, wu, w_dl, w_ll, Lx):
+    return _moments(np.moveaxis(coefs, -1, 0), wu, w_dl, w_ll, Lx)
+
+
+def _envelope_batch(coefs, w_dl, w_ll, Lx, combinations):
+    """
+    Governing factored load and moments over the load combinations, which
+    form a leading array axis. Only these products are repeated per
+    combination; steel and spacing are designed once, from the envelope.
+    Returns (wu, moments, {field: index of the governing combination}).
+    """
+    names = list(combinations)
+    if not names:
+        raise ValueError("No load combinations given")
+    shape = (len(names),) + (1,) * np.ndim(w_dl)
+    fD, fL, pattern = (np.array([combinations[k][i] for k in names]).reshape(shape) for i in range(3))
+    S2 = Lx ** 2
+    wu = fD * w_dl + fL * w_ll
+    ll_a = np.where(pattern, coefs[..., 2], coefs[..., 1])
+    ll_b = np.where(pattern, coefs[..., 5], coefs[..., 4])
+    M = {'Ma_neg': coefs[..., 0] * wu * S2,
+         'Ma_pos': (coefs[..., 1] * fD * w_dl * S2) + (ll_a * fL * w_ll * S2),
+         'Mb_neg': coefs[..., 3] * wu * S2,
+         'Mb_pos': (coefs[..., 4] * fD * w_dl * S2) + (ll_b * fL * w_ll * S2),
+         'Vu': wu}
+    env, governs = {}, {}
+    for k, v in M.items():
+        i = np.argmax(v, axis=0)
+        env[k] = np.take_along_axis(v, i[None], axis=0)[0]
+        governs[k] = i
+    return env['Vu'], [env[k] for k in ENVELOPE_FIELDS[:4]], governs
+
+
+def _depths_batch(h, cov, db):
+    """Effective depth of the short (outer) and long (inner) bars."""
+    d_short = h - cov - db / 20
+    return d_short, d_short - db / 10
+
+
+def _shear_batch(wu, Lx, fc, d_short):
+    Vu = wu * Lx / 3
+    with np.errstate(invalid='ignore'):
+        Vc = 0.53 * np.sqrt(fc) * 100 * d_short
+    return Vu, 0.85 * Vc
+
+
+def _shear(wu, Lx, fc, d_short):
+    """Scalar _shear_batch."""
+    return wu * Lx / 3, 0.85 * (0.53 * math.sqrt(fc) * 100 * d_short)
+
+
+def check_inputs(inputs):
+    """
+    Reject inputs outside the range the method is defined for (which would
+    otherwise divide by zero, design a zero-depth section or carry NaN into
+    the results). Raises ValueError.
+    """
+    for k in DESIGN_FIELDS[:8]:
+        if not math.isfinite(inputs[k]):
+            raise ValueError(f"{k} must be a finite number (got {inputs[k]})")
+    for k in ('Lx', 'Ly', 'h', 'fc', 'fy'):
+        if not inputs[k] > 0:
+            raise ValueError(f"{k} must be greater than 0 (got {inputs[k]})")
+    for k in ('cover', 'sdl', 'll'):
+        if inputs[k] < 0:
+            raise ValueError(f"{k} must not be negative (got {inputs[k]})")
+    if not inputs['h'] > inputs['cover']:
+        raise ValueError(f"h must be greater than cover (h={inputs['h']}, cover={inputs['cover']})")
+
+
+def _check_batch(Lx, Ly, h, cov, sdl, ll, fc, fy, where=None):
+    """
+    check_inputs for broadcast arrays; raises for the first failing panel.
+    where(i) names flat index i in the message (default "panel i").
+    """
+    values = (Lx, Ly, h, cov, sdl, ll, fc, fy)
+    ok = (np.isfinite(values).all(axis=0) & (Lx > 0) & (Ly > 0) & (h > 0) & (fc > 0) & (fy > 0)
+          & (cov >= 0) & (sdl >= 0) & (ll >= 0) & (h > cov))
+    if not ok.all():
+        i = np.flatnonzero(~ok)[0]
+        try:
+            check_inputs({k: v.flat[i] for k, v in zip(DESIGN_FIELDS, values)})
+        except ValueError as e:
+            raise ValueError(f"{where(i) if where else f'panel {i}'}: {e}") from None
+
+
+def _design_one(Lx, Ly, h, cov, sdl, ll, fc, fy, case, bar):
+    """
+    design_batch for a single panel on Python floats: the same formulas
+    without the array overhead. Returns the RECORD_FIELDS results in order.
+    """
+    Ab, db = BAR_INFO[bar]['A_cm2'], BAR_INFO[bar]['d_mm']
+    m = Lx / Ly
+    w_sw, w_dl, wu = _loads_batch(h, sdl, ll)
+    coefs = get_coefficients(case, m)
+    d_short, d_long = _depths_batch(h, cov, db)
+    moments = _moments(coefs, wu, w_dl, ll, Lx)
+    steel = [_as_spacing(M, d, fc, fy, h, Ab) for M, d in zip(moments, (d_short, d_short, d_long, d_long))]
+    Vu, phiVc = _shear(wu, Lx, fc, d_short)
+    return (m, w_sw, w_dl, wu, *coefs, d_short, d_long, *moments,
+            *[a[0] for a in steel], *[a[2] for a in steel], Vu, phiVc)
+
+
+@traced()
+def design_batch(Lx, Ly, h, cover, sdl, ll, fc, fy, case, bar, combinations=None):
+    """
+    Design many panels in one pass. Every argument is an array (or scalar,
+    broadcast to the batch size); returns a dict of arrays with the numbers
+    behind the calculation table of calculate_detailed. Raises ValueError
+    for the first panel that check_inputs rejects.
+
+    With `combinations` (see LOAD_COMBINATIONS) every moment and Vu is the
+    envelope over the combinations, wu is the governing factored load, and
+    combo_<field> names the governing combination of each ENVELOPE_FIELDS
+    result (the spacings follow their moment).
+    """
+    Lx, Ly, h, cov, sdl, ll, fc, fy, case, bar = np.broadcast_arrays(
+        *[np.asarray(v, dtype=float) for v in (Lx, Ly, h, cover, sdl, ll, fc, fy)],
+        np.asarray(case, dtype=int), np.asarray(bar, dtype=str))
+    _check_batch(Lx, Ly, h, cov, sdl, ll, fc, fy)
+    Ab, db = _bar_props(bar)
+
+    # 1. Geometry & loads
+    m = _span_ratio(Lx, Ly)
+    w_sw, w_dl, wu = _loads_batch(h, sdl, ll)
+
+    # 2. Moments & reinforcement
+    coefs = get_coefficients_batch(case, m)
+    d_short, d_long = _depths_batch(h, cov, db)
+    if combinations is None:
+        Ma_neg, Ma_pos, Mb_neg, Mb_pos = _moments_batch(coefs, wu, w_dl, ll, Lx)
+    else:
+        wu, (Ma_neg, Ma_pos, Mb_neg, Mb_pos), governs = _envelope_batch(coefs, w_dl, ll, Lx, combinations)
+
+    As_a_neg, _, s_a_neg = _as_spacing_batch(Ma_neg, d_short, fc, fy, h, Ab)
+    As_a_pos, _, s_a_pos = _as_spacing_batch(Ma_pos, d_short, fc, fy, h, Ab)
+    As_b_neg, _, s_b_neg = _as_spacing_batch(Mb_neg, d_long, fc, fy, h, Ab)
+    As_b_pos, _, s_b_pos = _as_spacing_batch(Mb_pos, d_long, fc, fy, h, Ab)
+
+    # 3. Shear
+    Vu, phiVc = _shear_batch(wu, Lx, fc, d_short)
+
+    res = {
+        'm': m, 'w_sw': w_sw, 'w_dl': w_dl, 'wu': wu, 'coefs': coefs,
+        'd_short': d_short, 'd_long': d_long,
+        'Ma_neg': Ma_neg, 'Ma_pos': Ma_pos, 'Mb_neg': Mb_neg, 'Mb_pos': Mb_pos,
+        'As_a_neg': As_a_neg, 'As_a_pos': As_a_pos, 'As_b_neg': As_b_neg, 'As_b_pos': As_b_pos,
+        's_a_neg': s_a_neg, 's_a_pos': s_a_pos, 's_b_neg': s_b_neg, 's_b_pos': s_b_pos,
+        'Vu': Vu, 'phiVc': phiVc, 'shear_ok': phiVc >= Vu,
+    }
+    if combinations is not None:
+        names = np.array(list(combinations))
+        for k, i in governs.items():
+            res[f'combo_{k}'] = names[i]
+        for loc, M in zip(('a_neg', 'a_pos', 'b_neg', 'b_pos'), ENVELOPE_FIELDS):
+            res[f'combo_s_{loc}'] = res[f'combo_{M}']
+    return res
+
+
+def batch_rows(res):
+    """Split a design_batch result into one dict of plain Python values per panel."""
+    n = len(res['m'])
+    cols = {k: v.tolist() for k, v in res.items()}
+    return [{k: cols[k][i] for k in cols} for i in range(n)]
+
+
+# Raw numbers of one designed panel: the DESIGN_FIELDS inputs, then the results
+RECORD_FIELDS = DESIGN_FIELDS + (
+    'm', 'w_sw', 'w_dl', 'wu', 'Ca_neg', 'Ca_dl', 'Ca_ll', 'Cb_neg', 'Cb_dl', 'Cb_ll',
+    'd_short', 'd_long', 'Ma_neg', 'Ma_pos', 'Mb_neg', 'Mb_pos',
+    'As_a_neg', 'As_a_pos', 'As_b_neg', 'As_b_pos', 's_a_neg', 's_a_pos', 's_b_neg', 's_b_pos',
+    'Vu', 'phiVc')
+_COEF_FIELDS = RECORD_FIELDS[14:20]
+
+# One row of a batch table: 8 bytes per number, 8 characters for the bar name
+RECORD_DTYPE = np.dtype([(k, 'i1' if k == 'case' else 'U8' if k == 'bar' else 'f8') for k in RECORD_FIELDS])
+
+
+def design_table(Lx, Ly, h, cover, sdl, ll, fc, fy, case, bar):
+    """
+    design_batch as a NumPy structured array of RECORD_DTYPE, one row per
+    panel, e.g. table[table['s_a_neg'] < 15] or np.sort(table, order='wu').
+    """
+    res = design_batch(Lx, Ly, h, cover, sdl, ll, fc, fy, case, bar)
+    out = np.empty(res['m'].shape, RECORD_DTYPE)
+    for k, v in zip(DESIGN_FIELDS, (Lx, Ly, h, cover, sdl, ll, fc, fy, case, bar)):
+        out[k] = v
+    for k in RECORD_FIELDS[10:]:
+        if k in _COEF_FIELDS:
+            out[k] = res['coefs'][..., _COEF_FIELDS.index(k)]
+        else:
+            out[k] = res[k]
+    return out
+
+
+def results_table(results):
+    """Pack SlabResult objects into one RECORD_DTYPE array."""
+    return np.array([r.record() for r in results], dtype=RECORD_DTYPE)
+
+
+class SlabResult:
+    """
+    Raw floats of one designed panel. The calculation table is only
+    formatted when rows() is called, i.e. when a report is rendered.
+
+    Inputs are kept as given, so rows() prints them exactly like
+    calculate_detailed always has.
+
+    `governs` maps ENVELOPE_FIELDS to (name, factors) of the governing
+    load combination when the panel was designed for several, else None.
+    It is not part of record(); rows() then gives every non-SECTION row a
+    seventh "Combination" column (see report.py / pdf.py).
+    """
+    __slots__ = RECORD_FIELDS + ('governs',)
+
+    def __init__(self, *values, governs=None):
+        for k, v in zip(RECORD_FIELDS, values):
+            setattr(self, k, v)
+        self.governs = governs
+
+    @classmethod
+    def from_inputs(cls, inputs, combinations=None):
+        """
+        Design one panel. Without combinations this runs _design_one on
+        plain floats; an envelope goes through design_batch.
+        """
+        check_inputs(inputs)
+        values = [inputs[k] for k in DESIGN_FIELDS]
+        if combinations is None:
+            return cls(*values, *_design_one(*values))
+        res = design_batch(inputs['Lx'], inputs['Ly'], inputs['h'], inputs['cover'], inputs['sdl'], inputs['ll'],
+                           inputs['fc'], inputs['fy'], [inputs['case']], [inputs['bar']], combinations)
+        coefs = res['coefs'][0].tolist()
+        for k in RECORD_FIELDS[10:]:
+            values.append(coefs[_COEF_FIELDS.index(k)] if k in _COEF_FIELDS else float(res[k][0]))
+        governs = {k: (str(res[f'combo_{k}'][0]), combinations[str(res[f'combo_{k}'][0])]) for k in ENVELOPE_FIELDS}
+        return cls(*values, governs=governs)
+
+    @classmethod
+    def from_record(cls, rec):
+        """From one row of a design_table array."""
+        return cls(*rec.item())
+
+    @classmethod
+    def from_table(cls, table):
+        return [cls(*t) for t in table.tolist()]
+
+    def record(self):
+        return tuple(getattr(self, k) for k in RECORD_FIELDS)
+
+    def as_dict(self):
+        d = {k: getattr(self, k) for k in RECORD_FIELDS}
+        d['shear_ok'] = self.shear_ok
+        return d
+
+    @property
+    def coefs(self):
+        return [getattr(self, k) for k in _COEF_FIELDS]
+
+    @property
+    def shear_ok(self):
+        return self.phiVc >= self.Vu
+
+    @property
+    def res_sum(self):
+        return {'s_a_neg': self.s_a_neg, 's_a_pos': self.s_a_pos, 's_b_neg': self.s_b_neg, 's_b_pos': self.s_b_pos}
+
+    def rows(self):
+        """The six-column calculation table of the report."""
+        rows = []
+
+        def sec(title):
+            rows.append(["SECTION", title, "", "", "", ""])
+
+        def row(item, form, subst, res, unit, stat="", combo=""):
+            rows.append([item, form, subst, res, unit, stat] + ([combo] if self.governs else []))
+
+        Lx = self.Lx;
+        Ly = self.Ly;
+        h = self.h
+        bar_name = self.bar
+        case_id = self.case
+        coefs = self.coefs
+
+        # 1. Geometry
+        sec("1. GEOMETRY & LOADS")
+        m = self.m
+        row("Short Span", "Lx", "-", f"{Lx:.2f}", "m")
+        row("Long Span", "Ly", "-", f"{Ly:.2f}", "m")
+        row("Ratio m", "Lx / Ly", f"{Lx:.2f} / {Ly:.2f}", f"{m:.2f}", "-", "OK" if m >= 0.5 else "WARN")
+
+        w_dl = self.w_dl;
+        w_ll = self.ll;
+        wu = self.wu
+        gov = self.governs or {}
+        row("Dead Load", "SW + SDL", f"{self.w_sw:.0f} + {self.sdl}", f"{w_dl:.0f}", "kg/m²")
+        if gov:
+            name, (fD, fL, _) = gov['Vu']
+            row("Factored Load", f"{fD:g}DL + {fL:g}LL", f"{fD:g}({w_dl:.0f}) + {fL:g}({w_ll})", f"{wu:.0f}",
+                "kg/m²", combo=name)
+        else:
+            row("Factored Load", "1.4DL + 1.7LL", f"1.4({w_dl:.0f}) + 1.7({w_ll})", f"{wu:.0f}", "kg/m²")
+
+        # 2. Moments & Design
+        sec(f"2. MOMENT & REINF. (CASE {case_id}: {CASE_DESC[case_id]})")
+        d_short = self.d_short;
+        d_long = self.d_long
+        S = Lx
+
+        # --- Short Neg ---
+        row("Ma (Neg)", "Ca_neg · wu · Lx²", f"{coefs[0]:.3f}·{wu:.0f}·{S}²", f"{self.Ma_neg:.2f}", "kg-m",
+            combo=gov.get('Ma_neg', ("",))[0])
+        row("As (Short-Neg)", "Calc", f"d={d_short:.2f}", f"{self.As_a_neg:.2f}", "cm²")
+        row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{self.s_a_neg:.1f}", "cm", "OK")
+
+        # --- Short Pos ---
+        row("Ma (Pos)", "Ca_dl·D + Ca_ll·L", "-", f"{self.Ma_pos:.2f}", "kg-m", combo=gov.get('Ma_pos', ("",))[0])
+        row("As (Short-Pos)", "Calc", f"d={d_short:.2f}", f"{self.As_a_pos:.2f}", "cm²")
+        row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{self.s_a_pos:.1f}", "cm", "OK")
+
+        # --- Long Neg ---
+        row("Mb (Neg)", "Cb_neg · wu · Lx²", f"{coefs[3]:.3f}·{wu:.0f}·{S}²", f"{self.Mb_neg:.2f}", "kg-m",
+            combo=gov.get('Mb_neg', ("",))[0])
+        row("As (Long-Neg)", "Calc", f"d={d_long:.2f}", f"{self.As_b_neg:.2f}", "cm²")
+        row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{self.s_b_neg:.1f}", "cm", "OK")
+
+        # --- Long Pos ---
+        row("Mb (Pos)", "Cb_dl·D + Cb_ll·L", "-", f"{self.Mb_pos:.2f}", "kg-m", combo=gov.get('Mb_pos', ("",))[0])
+        row("As (Long-Pos)", "Calc", f"d={d_long:.2f}", f"{self.As_b_pos:.2f}", "cm²")
+        row("• Spacing", f"Use {bar_name}", f"Max {3 * h:.0f} cm", f"@{self.s_b_pos:.1f}", "cm", "OK")
+
+        sec("3. CHECK SHEAR")
+        Vu = self.Vu;
+        phiVc = self.phiVc
+        status = "PASS" if phiVc >= Vu else "FAIL"
+        row("Shear Check", "φVc ≥ Vu", f"{fmt(phiVc)} ≥ {fmt(Vu)}", status, "kg", status,
+            combo=gov.get('Vu', ("",))[0])
+
+        return rows
+
+
+@traced()
+def calculate_detailed(inputs, combinations=None):
+    result = SlabResult.from_inputs(inputs, combinations)
+    return result.rows(), result.res_sum
@@ -0,0 +1,108 @@
+"""
+Content-addressed cache of section drawings.
+
+A drawing depends only on (h, bar, s_a_neg, s_a_pos, s_b_neg, s_b_pos, Lx)
+and the backend; cover is not drawn. The key hashes those values exactly
+as they are printed on the drawing (h and Lx to 0.01 m, spacings to 1 cm)
+together with the drawing.py source, so two panels whose pictures would be
+identical share one entry, and a change to the drawing code never serves
+an old picture.
+
+DrawingCache keeps recent drawings in memory (LRU) and, optionally, one
+file per drawing in a directory shared between runs and processes.
+"""
+import base64
+import collections
+import hashlib
+import os
+
+from .drawing import render_section
+
+_SPACINGS = ('s_a_neg', 's_a_pos', 's_b_neg', 's_b_pos')
+_PNG_PREFIX = "data:image/png;base64,"
+
+
+def _source_version():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'drawing.py'), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+_VERSION = _source_version()
+
+
+def section_key(h_cm, bar_name, res_sum, Lx_val, backend):
+    """Content key of one section drawing (see module docstring)."""
+    text = "|".join([_VERSION, backend, f"{h_cm / 100:.2f}", str(bar_name), f"{Lx_val:.2f}",
+                     *(f"{res_sum[k]:.0f}" for k in _SPACINGS)])
+    return hashlib.sha256(text.encode()).hexdigest()[:24]
+
+
+class DrawingCache:
+    """
+    render_section with an LRU memory cache and an optional disk cache.
+
+        cache = DrawingCache(max_entries=256, directory=".drawings")
+        key, img = cache.render(h, cover, bar, res_sum, Lx, backend="svg")
+
+    `img` is what render_section returns (SVG markup or a PNG data URI);
+    `key` identifies the picture and can be used to reference it once.
+    """
+
+    def __init__(self, max_entries=256, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.entries = collections.OrderedDict()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _path(self, key, img=None, backend=None):
+        ext = 'svg' if (backend == 'svg' if img is None else img.lstrip().startswith('<svg')) else 'png'
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def _remember(self, key, img):
+        self.entries[key] = img
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key, backend="svg"):
+        img = self.entries.get(key)
+        if img is not None:
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return img
+        if self.directory:
+            path = self._path(key, backend=backend)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    data = f.read()
+                img = data.decode('utf-8') if path.endswith('.svg') else _PNG_PREFIX + base64.b64encode(data).decode()
+                self._remember(key, img)
+                self.stats['disk_hits'] += 1
+                return img
+        return None
+
+    def put(self, key, img):
+        self._remember(key, img)
+        if self.directory:
+            path = self._path(key, img)
+            data = img.encode('utf-8') if path.endswith('.svg') else base64.b64decode(img[len(_PNG_PREFIX):])
+            # Write then rename, so concurrent runs never read a partial file
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+    def render(self, h_cm, cover_cm, bar_name, res_sum, Lx_val, backend="svg"):
+        """(key, drawing); renders only on a cache miss."""
+        key = section_key(h_cm, bar_name, res_sum, Lx_val, backend)
+        img = self.get(key, backend)
+        if img is None:
+            self.stats['misses'] += 1
+            img = render_section(h_cm, cover_cm, bar_name, res_sum, Lx_val, backend=backend)
+            self.put(key, img)
+        return key, img
@@ -0,0 +1,263 @@
+"""
+Section detail drawings. matplotlib is imported lazily, only when the
+"matplotlib" backend is actually used; the SVG backend needs nothing.
+"""
+import base64
+import html as html_lib
+import io
+
+from .tracing import traced
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+# ==========================================
+# 1. PLOTTING FUNCTIONS
+# ==========================================
+def fig_to_png(fig, dpi=None):
+    plt = _pyplot()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight', dpi=dpi)
+    plt.close(fig)
+    return buf.getvalue()
+
+
+@traced(payload=True)
+def fig_to_base64(fig):
+    return f"data:image/png;base64,{base64.b64encode(fig_to_png(fig)).decode()}"
+
+
+@traced()
+def plot_twoway_section_detailed(h_cm, cover_cm, bar_name, res_sum, Lx_val):
+    plt = _pyplot()
+    import matplotlib.patches as patches
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    beam_w = 0.30;
+    beam_d = 0.50;
+    slab_span = 2.5
+
+    slab_h_draw = 0.25  # Schematic drawing height (fixed)
+
+    # --- 1. Structure ---
+    # Beams
+    ax.add_patch(
+        patches.Rectangle((-beam_w, -beam_d), beam_w, beam_d, facecolor='white', edgecolor='black', linewidth=1.5))
+    ax.add_patch(
+        patches.Rectangle((slab_span, -beam_d), beam_w, beam_d, facecolor='white', edgecolor='black', linewidth=1.5))
+    # Slab
+    ax.add_patch(patches.Rectangle((0, -slab_h_draw), slab_span, slab_h_draw, facecolor='#f9f9f9', edgecolor='black',
+                                   linewidth=1.5))
+
+    pad = 0.04
+
+    # --- 2. Short Span Bars (Lines) ---
+    bar_y_top = -pad
+    bar_y_bot = -slab_h_draw + pad
+    top_len = slab_span * 0.25
+
+    # Short Neg (Top Line)
+    ax.plot([-beam_w + 0.05, -beam_w + 0.05, top_len], [-beam_d / 2, bar_y_top, bar_y_top], color='blue',
+            linewidth=2.5)  # Left
+    ax.plot([slab_span + beam_w - 0.05, slab_span + beam_w - 0.05, slab_span - top_len],
+            [-beam_d / 2, bar_y_top, bar_y_top], color='blue', linewidth=2.5)  # Right
+
+    # Short Pos (Bot Line)
+    ax.plot([0.1, slab_span - 0.1], [bar_y_bot, bar_y_bot], color='blue', linewidth=2.5)
+    ax.plot([0.1, 0.1], [bar_y_bot, bar_y_bot + 0.06], color='blue', linewidth=2.5)  # Hook
+    ax.plot([slab_span - 0.1, slab_span - 0.1], [bar_y_bot, bar_y_bot + 0.06], color='blue', linewidth=2.5)  # Hook
+
+    # --- 3. Long Span Bars (Dots) ---
+    dot_y_top = bar_y_top - 0.025
+    dot_y_bot = bar_y_bot + 0.025
+
+    # Long Neg (Top Dots)
+    for x in [0, 0.15, slab_span, slab_span - 0.15]:
+        ax.add_patch(patches.Circle((x, dot_y_top), radius=0.02, color='red'))
+
+    # Long Pos (Bot Dots)
+    for i in range(1, 8):
+        ax.add_patch(patches.Circle((slab_span / 8 * i, dot_y_bot), radius=0.02, color='red'))
+
+    # --- 4. Dimensions & Annotations ---
+    # Dimension: Thickness (h)
+    ax.annotate("", xy=(slab_span + beam_w + 0.1, -slab_h_draw), xytext=(slab_span + beam_w + 0.1, 0),
+                arrowprops=dict(arrowstyle='<->', linewidth=0.8))
+    ax.text(slab_span + beam_w + 0.15, -slab_h_draw / 2, f"h = {h_cm / 100:.2f} m", va='center', rotation=90)
+
+    # Dimension: Span (L)
+    ax.annotate("", xy=(0, -beam_d - 0.1), xytext=(slab_span, -beam_d - 0.1),
+                arrowprops=dict(arrowstyle='<->', linewidth=0.8))
+    ax.text(slab_span / 2, -beam_d - 0.2, f"L = {Lx_val:.2f} m", ha='center', fontweight='bold')
+
+    # --- 5. Labels ---
+    # Short Span (Neg/Top)
+    txt_short_neg = f"Short(Top): {bar_name}@{res_sum['s_a_neg']:.0f}cm"
+    ax.annotate(txt_short_neg, xy=(top_len / 2, bar_y_top), xytext=(top_len, 0.4),
+                arrowprops=dict(arrowstyle='->', connectionstyle="angle,angleA=0,angleB=90,rad=10", color='blue'),
+                fontsize=9, color='blue', fontweight='bold',
+                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="blue", alpha=0.9))
+
+    # Long Span (Neg/Top)
+    txt_long_neg = f"Long(Top): {bar_name}@{res_sum['s_b_neg']:.0f}cm"
+    ax.annotate(txt_long_neg, xy=(0.15, dot_y_top), xytext=(0.5, 0.2),
+                arrowprops=dict(arrowstyle='->', color='red'),
+                fontsize=9, color='red', fontweight='bold',
+                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="red", alpha=0.9))
+
+    # Short Span (Pos/Bot)
+    txt_short_pos = f"Short(Bot): {bar_name}@{res_sum['s_a_pos']:.0f}cm"
+    ax.annotate(txt_short_pos, xy=(slab_span / 2, bar_y_bot), xytext=(slab_span / 2, -0.6),
+                arrowprops=dict(arrowstyle='->', color='blue'),
+                fontsize=9, ha='center', color='blue', fontweight='bold',
+                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="blue", alpha=0.9))
+
+    # Long Span (Pos/Bot)
+    txt_long_pos = f"Long(Bot): {bar_name}@{res_sum['s_b_pos']:.0f}cm"
+    ax.annotate(txt_long_pos, xy=(slab_span / 2 + 0.3, dot_y_bot), xytext=(slab_span / 2 + 0.6, -0.4),
+                arrowprops=dict(arrowstyle='->', color='red'),
+                fontsize=9, color='red', fontweight='bold',
+                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="red", alpha=0.9))
+
+    ax.axis('off')
+    ax.set_ylim(-1.0, 0.6)
+    ax.set_xlim(-0.5, slab_span + 0.8)
+    plt.tight_layout()
+    return fig
+
+
+# --- SVG backend: same drawing as above, written directly as markup ---
+_SVG_X0, _SVG_X1, _SVG_Y0, _SVG_Y1 = -0.5, 3.3, -1.0, 0.6  # drawing limits (m)
+_SVG_SX, _SVG_SY = 250.0, 280.0  # px per drawing unit (matches the 10x5 figure aspect)
+
+
+def _sx(x):
+    return f"{(x - _SVG_X0) * _SVG_SX:.1f}"
+
+
+def _sy(y):
+    return f"{(_SVG_Y1 - y) * _SVG_SY:.1f}"
+
+
+def _svg_rect(x, y, w, h, fill):
+    return (f'<rect x="{_sx(x)}" y="{_sy(y + h)}" width="{w * _SVG_SX:.1f}" height="{h * _SVG_SY:.1f}" '
+            f'fill="{fill}" stroke="black" stroke-width="2"/>')
+
+
+def _svg_line(xs, ys, color, width=3.3):
+    pts = " ".join(f"{_sx(x)},{_sy(y)}" for x, y in zip(xs, ys))
+    return f'<polyline points="{pts}" fill="none" stroke="{color}" stroke-width="{width}"/>'
+
+
+def _svg_dot(x, y, r=0.02, color='red'):
+    return (f'<ellipse cx="{_sx(x)}" cy="{_sy(y)}" rx="{r * _SVG_SX:.1f}" ry="{r * _SVG_SY:.1f}" '
+            f'fill="{color}"/>')
+
+
+def _svg_label(text, xy, xytext, color, ha='left', elbow=False):
+    """Boxed label with a leader arrow, like ax.annotate(..., bbox=...)."""
+    text = html_lib.escape(text)
+    w = len(text) * 7.0 + 8
+    tx = float(_sx(xytext[0]))
+    ty = float(_sy(xytext[1]))
+    bx = tx - w / 2 if ha == 'center' else tx - 4
+    box_top, box_bot = ty - 13, ty + 5
+    ax, ay = float(_sx(xy[0])), float(_sy(xy[1]))
+    if elbow:
+        sx0 = bx if ax < bx else bx + w
+        path = f"M{sx0:.1f},{ty - 4:.1f} H{ax:.1f} V{ay:.1f}"
+    else:
+        sy0 = box_bot if ay > ty else box_top
+        sx0 = min(max(ax, bx), bx + w)
+        path = f"M{sx0:.1f},{sy0:.1f} L{ax:.1f},{ay:.1f}"
+    anchor = 'middle' if ha == 'center' else 'start'
+    return (f'<path d="{path}" fill="none" stroke="{color}" marker-end="url(#arr-{color})"/>'
+            f'<rect x="{bx:.1f}" y="{box_top:.1f}" width="{w:.1f}" height="18" rx="4" '
+            f'fill="white" fill-opacity="0.9" stroke="{color}"/>'
+            f'<text x="{tx:.1f}" y="{ty:.1f}" text-anchor="{anchor}" fill="{color}" '
+            f'font-size="12" font-weight="bold">{text}</text>')
+
+
+@traced(payload=True)
+def plot_twoway_section_svg(h_cm, cover_cm, bar_name, res_sum, Lx_val):
+    """Render the section detail as standalone SVG markup (no matplotlib)."""
+    beam_w = 0.30
+    beam_d = 0.50
+    slab_span = 2.5
+    slab_h_draw = 0.25
+    pad = 0.04
+    bar_y_top = -pad
+    bar_y_bot = -slab_h_draw + pad
+    top_len = slab_span * 0.25
+    dot_y_top = bar_y_top - 0.025
+    dot_y_bot = bar_y_bot + 0.025
+
+    width = (_SVG_X1 - _SVG_X0) * _SVG_SX
+    height = (_SVG_Y1 - _SVG_Y0) * _SVG_SY
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width:.0f} {height:.0f}" '
+           f'width="100%" style="max-width:{width:.0f}px" font-family="Sarabun, sans-serif">',
+           '<defs>']
+    for c in ('black', 'blue', 'red'):
+        out.append(f'<marker id="arr-{c}" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="7" '
+                   f'markerHeight="7" orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="{c}"/></marker>')
+    out.append('</defs>')
+
+    # --- 1. Structure ---
+    out.append(_svg_rect(-beam_w, -beam_d, beam_w, beam_d, 'white'))
+    out.append(_svg_rect(slab_span, -beam_d, beam_w, beam_d, 'white'))
+    out.append(_svg_rect(0, -slab_h_draw, slab_span, slab_h_draw, '#f9f9f9'))
+
+    # --- 2. Short Span Bars (Lines) ---
+    out.append(_svg_line([-beam_w + 0.05, -beam_w + 0.05, top_len], [-beam_d / 2, bar_y_top, bar_y_top], 'blue'))
+    out.append(_svg_line([slab_span + beam_w - 0.05, slab_span + beam_w - 0.05, slab_span - top_len],
+                         [-beam_d / 2, bar_y_top, bar_y_top], 'blue'))
+    out.append(_svg_line([0.1, 0.1, slab_span - 0.1, slab_span - 0.1],
+                         [bar_y_bot + 0.06, bar_y_bot, bar_y_bot, bar_y_bot + 0.06], 'blue'))
+
+    # --- 3. Long Span Bars (Dots) ---
+    for x in [0, 0.15, slab_span, slab_span - 0.15]:
+        out.append(_svg_dot(x, dot_y_top))
+    for i in range(1, 8):
+        out.append(_svg_dot(slab_span / 8 * i, dot_y_bot))
+
+    # --- 4. Dimensions & Annotations ---
+    xd = slab_span + beam_w + 0.1
+    out.append(f'<line x1="{_sx(xd)}" y1="{_sy(-slab_h_draw)}" x2="{_sx(xd)}" y2="{_sy(0)}" stroke="black" '
+               f'marker-start="url(#arr-black)" marker-end="url(#arr-black)"/>')
+    tx, ty = _sx(slab_span + beam_w + 0.15), _sy(-slab_h_draw / 2)
+    out.append(f'<text x="{tx}" y="{ty}" transform="rotate(-90 {tx} {ty})" text-anchor="middle" '
+               f'dy="0.8em" font-size="13">h = {h_cm / 100:.2f} m</text>')
+    yd = -beam_d - 0.1
+    out.append(f'<line x1="{_sx(0)}" y1="{_sy(yd)}" x2="{_sx(slab_span)}" y2="{_sy(yd)}" stroke="black" '
+               f'marker-start="url(#arr-black)" marker-end="url(#arr-black)"/>')
+    out.append(f'<text x="{_sx(slab_span / 2)}" y="{_sy(-beam_d - 0.2)}" text-anchor="middle" '
+               f'font-size="13" font-weight="bold">L = {Lx_val:.2f} m</text>')
+
+    # --- 5. Labels ---
+    out.append(_svg_label(f"Short(Top): {bar_name}@{res_sum['s_a_neg']:.0f}cm",
+                          (top_len / 2, bar_y_top), (top_len, 0.4), 'blue', elbow=True))
+    out.append(_svg_label(f"Long(Top): {bar_name}@{res_sum['s_b_neg']:.0f}cm",
+                          (0.15, dot_y_top), (0.5, 0.2), 'red'))
+    out.append(_svg_label(f"Short(Bot): {bar_name}@{res_sum['s_a_pos']:.0f}cm",
+                          (slab_span / 2, bar_y_bot), (slab_span / 2, -0.6), 'blue', ha='center'))
+    out.append(_svg_label(f"Long(Bot): {bar_name}@{res_sum['s_b_pos']:.0f}cm",
+                          (slab_span / 2 + 0.3, dot_y_bot), (slab_span / 2 + 0.6, -0.4), 'red'))
+    out.append('</svg>')
+    return "".join(out)
+
+
+def render_section(h_cm, cover_cm, bar_name, res_sum, Lx_val, backend="svg"):
+    """
+    Drawing for the report: inline SVG markup ("svg") or a base64 PNG data URI
+    ("matplotlib"). Both are accepted by generate_html_report.
+    """
+    if backend == "svg":
+        return plot_twoway_section_svg(h_cm, cover_cm, bar_name, res_sum, Lx_val)
+    if backend == "matplotlib":
+        return fig_to_base64(plot_twoway_section_detailed(h_cm, cover_cm, bar_name, res_sum, Lx_val))
+    raise ValueError(f"Unknown drawing backend: {backend}")
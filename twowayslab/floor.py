@@ -0,0 +1,275 @@
+"""
+Floor-plan model: a grid of beam lines with holes, designed as one batch.
+
+Beam lines at xs (grid A, B, C, ...) and ys (grid 1, 2, 3, ...) cut the floor
+into panels; panel (i, j) lies between xs[i]..xs[i+1] and ys[j]..ys[j+1].
+An edge is continuous when the panel across it is slab, and discontinuous
+at the floor boundary or next to a hole. The CASE_DESC case follows from
+how many short and long edges are discontinuous.
+
+Edits only mark the panels they touch as dirty, and design() sends just
+those through design_batch, so moving one beam line re-designs two rows
+or columns of panels, not the floor.
+"""
+import bisect
+import string
+
+import numpy as np
+
+from .core import DESIGN_FIELDS, SlabResult, design_table, results_table
+
+# (discontinuous short edges, discontinuous long edges) -> CASE_DESC case.
+# Short edges are the ones of length Lx, i.e. the supports of the long span.
+CASE_BY_DISCONTINUITY = {
+    (0, 0): 1, (2, 0): 2, (0, 2): 3, (2, 1): 4, (1, 2): 5,
+    (1, 1): 6, (1, 0): 7, (0, 1): 8, (2, 2): 9,
+}
+
+PANEL_DEFAULTS = {'h': 12.0, 'cover': 2.5, 'sdl': 150.0, 'll': 200.0,
+                  'fc': 240.0, 'fy': 4000.0, 'bar': 'RB9'}
+
+
+def grid_label(i):
+    """Column grid letter: 0 -> A, 25 -> Z, 26 -> AA."""
+    s = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        s = string.ascii_uppercase[r] + s
+    return s
+
+
+class FloorGrid:
+    """
+    A floor of rectangular panels between beam lines.
+
+        floor = FloorGrid([0, 4, 8.5, 12], [0, 5, 10], holes=[(1, 1)], ll=300)
+        floor.design()                 # whole floor, one batch
+        floor.move_line('x', 2, 9.0)   # only columns 1 and 2 become dirty
+        floor.design()                 # re-designs those panels only
+
+    Panel properties come from the floor defaults (PANEL_DEFAULTS) with
+    per-panel overrides from set_panel(). Coordinates are in m.
+    """
+
+    def __init__(self, xs, ys, holes=(), **defaults):
+        unknown = set(defaults) - set(PANEL_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown panel properties: {sorted(unknown)}")
+        self.xs = self._check_lines(xs)
+        self.ys = self._check_lines(ys)
+        self.defaults = {**PANEL_DEFAULTS, **defaults}
+        self.holes = set()
+        self.overrides = {}   # (i, j) -> {field: value}
+        self.results = {}     # (i, j) -> SlabResult
+        self.dirty = set(self.panels())
+        self.stats = {'designed': 0, 'batches': 0}
+        for cell in holes:
+            self.add_hole(*cell)
+
+    @staticmethod
+    def _check_lines(coords):
+        coords = [float(c) for c in coords]
+        if len(coords) < 2 or any(b <= a for a, b in zip(coords, coords[1:])):
+            raise ValueError("Beam lines need at least two strictly increasing coordinates")
+        return coords
+
+    # ---- spatial index -------------------------------------------------
+    @property
+    def shape(self):
+        return len(self.xs) - 1, len(self.ys) - 1
+
+    def panels(self):
+        nx, ny = self.shape
+        return [(i, j) for j in range(ny) for i in range(nx)]
+
+    def is_slab(self, i, j):
+        nx, ny = self.shape
+        return 0 <= i < nx and 0 <= j < ny and (i, j) not in self.holes
+
+    def panel_at(self, x, y):
+        """(i, j) of the panel containing point (x, y), or None outside the grid."""
+        i = bisect.bisect_right(self.xs, x) - 1
+        j = bisect.bisect_right(self.ys, y) - 1
+        nx, ny = self.shape
+        if x == self.xs[-1]:
+            i = nx - 1
+        if y == self.ys[-1]:
+            j = ny - 1
+        return (i, j) if 0 <= i < nx and 0 <= j < ny else None
+
+    def neighbours(self, i, j):
+        """Panels across the left, right, bottom and top edges (may be outside the grid)."""
+        return (i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)
+
+    def slab_id(self, i, j):
+        return f"S-{grid_label(i)}{j + 1}"
+
+    # ---- classification ------------------------------------------------
+    def classify(self, i, j):
+        """Short span, long span and continuity case of panel (i, j)."""
+        wx = self.xs[i + 1] - self.xs[i]
+        wy = self.ys[j + 1] - self.ys[j]
+        left, right, bottom, top = [not self.is_slab(*n) for n in self.neighbours(i, j)]
+        # Edges of length Lx are the short edges
+        if wx <= wy:
+            ns, nl = bottom + top, left + right
+        else:
+            ns, nl = left + right, bottom + top
+        return min(wx, wy), max(wx, wy), CASE_BY_DISCONTINUITY[(ns, nl)]
+
+    def panel_inputs(self, i, j):
+        Lx, Ly, case = self.classify(i, j)
+        return {**self.defaults, **self.overrides.get((i, j), {}),
+                'Lx': Lx, 'Ly': Ly, 'case': case, 'slab_id': self.slab_id(i, j)}
+
+    # ---- edits ---------------------------------------------------------
+    def _touch(self, cells):
+        for cell in cells:
+            if self.is_slab(*cell):
+                self.dirty.add(cell)
+
+    def add_hole(self, i, j):
+        if not self.is_slab(i, j):
+            return
+        self.holes.add((i, j))
+        self.results.pop((i, j), None)
+        self.dirty.discard((i, j))
+        self._touch(self.neighbours(i, j))
+
+    def remove_hole(self, i, j):
+        if (i, j) not in self.holes:
+            return
+        self.holes.discard((i, j))
+        self._touch([(i, j), *self.neighbours(i, j)])
+
+    def set_panel(self, i, j, **props):
+        """Override design properties (h, bar, ll, ...) of one panel."""
+        unknown = set(props) - set(PANEL_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown panel properties: {sorted(unknown)}")
+        self.overrides.setdefault((i, j), {}).update(props)
+        self._touch([(i, j)])
+
+    def set_defaults(self, **props):
+        """Change floor-wide defaults; panels overriding every changed field stay clean."""
+        unknown = set(props) - set(PANEL_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown panel properties: {sorted(unknown)}")
+        self.defaults.update(props)
+        self._touch(c for c in self.panels() if not set(props) <= set(self.overrides.get(c, {})))
+
+    def _lines(self, axis):
+        if axis not in ('x', 'y'):
+            raise ValueError("axis must be 'x' or 'y'")
+        return self.xs if axis == 'x' else self.ys
+
+    def _band(self, axis, k):
+        """Panels of column k (axis 'x') or row k (axis 'y')."""
+        nx, ny = self.shape
+        if axis == 'x':
+            return [(k, j) for j in range(ny)] if 0 <= k < nx else []
+        return [(i, k) for i in range(nx)] if 0 <= k < ny else []
+
+    def move_line(self, axis, k, pos):
+        """Move beam line k; only the two bands it bounds change span."""
+        lines = self._lines(axis)
+        lo = lines[k - 1] if k > 0 else -np.inf
+        hi = lines[k + 1] if k + 1 < len(lines) else np.inf
+        if not lo < pos < hi:
+            raise ValueError(f"Line {k} must stay between {lo} and {hi}")
+        lines[k] = float(pos)
+        self._touch(self._band(axis, k - 1) + self._band(axis, k))
+
+    def _reindex(self, axis, f):
+        """Apply an index map to every per-panel dict; cells mapped to None are dropped."""
+        def move(cell):
+            i, j = cell
+            if axis == 'x':
+                i = f(i)
+                return None if i is None else (i, j)
+            j = f(j)
+            return None if j is None else (i, j)
+
+        def remap(cells):
+            return {move(c) for c in cells} - {None}
+
+        self.holes = remap(self.holes)
+        self.dirty = remap(self.dirty)
+        self.overrides = {move(c): v for c, v in self.overrides.items() if move(c) is not None}
+        self.results = {move(c): v for c, v in self.results.items() if move(c) is not None}
+
+    def insert_line(self, axis, pos):
+        """Add a beam line, splitting the band it falls in; returns its index."""
+        lines = self._lines(axis)
+        k = bisect.bisect_left(lines, pos)
+        if k == 0 or k == len(lines) or lines[k] == pos:
+            raise ValueError("New beam line must fall strictly inside the floor, off existing lines")
+        band = k - 1
+        split = self._band(axis, band)
+        holes = {c for c in split if c in self.holes}
+        overrides = {c: self.overrides[c] for c in split if c in self.overrides}
+        self._reindex(axis, lambda n: n + 1 if n > band else n)
+        lines.insert(k, float(pos))
+        # Both halves inherit the old band's holes and overrides
+        for i, j in holes:
+            self.holes.add((i + 1, j) if axis == 'x' else (i, j + 1))
+        for (i, j), props in overrides.items():
+            self.overrides[(i + 1, j) if axis == 'x' else (i, j + 1)] = dict(props)
+        for c in split:
+            self.results.pop(c, None)
+        self._touch(self._band(axis, band) + self._band(axis, band + 1))
+        return k
+
+    def remove_line(self, axis, k):
+        """Remove interior beam line k, merging the two bands on either side."""
+        lines = self._lines(axis)
+        if not 0 < k < len(lines) - 1:
+            raise ValueError("Only interior beam lines can be removed")
+        a, b = self._band(axis, k - 1), self._band(axis, k)
+        # The merged panel is a hole only where both halves were
+        merged_holes = {ca for ca, cb in zip(a, b) if ca in self.holes and cb in self.holes}
+        self.holes -= set(a) | set(b)
+        for ca, cb in zip(a, b):
+            if ca not in self.overrides and cb in self.overrides:
+                self.overrides[ca] = self.overrides[cb]
+            self.results.pop(ca, None)
+        self._reindex(axis, lambda n: None if n == k else (n - 1 if n > k else n))
+        del lines[k]
+        self.holes |= merged_holes
+        for c in merged_holes:
+            self.results.pop(c, None)
+        # Hole status of the merged band may have changed: its neighbours re-classify too
+        self._touch(self._band(axis, k - 2) + self._band(axis, k - 1) + self._band(axis, k))
+
+    # ---- design --------------------------------------------------------
+    def design(self):
+        """Design every dirty panel in one design_batch call; returns the panel count."""
+        cells = sorted(c for c in self.dirty if self.is_slab(*c))
+        self.dirty.clear()
+        if not cells:
+            return 0
+        inputs = [self.panel_inputs(*c) for c in cells]
+        table = design_table(*[[p[k] for p in inputs] for k in DESIGN_FIELDS])
+        self.results.update(zip(cells, SlabResult.from_table(table)))
+        self.stats['designed'] += len(cells)
+        self.stats['batches'] += 1
+        return len(cells)
+
+    def rows(self):
+        """Design rows of every slab panel, grid order (A1, B1, ..., A2, ...)."""
+        self.design()
+        # Grid labels are not cached: inserting a line renumbers the panels after it
+        return [{**self.results[c].as_dict(), 'i': c[0], 'j': c[1], 'slab_id': self.slab_id(*c)}
+                for c in self.panels() if self.is_slab(*c)]
+
+    def table(self):
+        """Design results of every slab panel as one RECORD_DTYPE array, grid order."""
+        self.design()
+        return results_table(self.results[c] for c in self.panels() if self.is_slab(*c))
+
+    def schedule(self, project='', engineer=''):
+        """Panel inputs in calculate_detailed form, e.g. for export_html or export_pdf."""
+        for c in self.panels():
+            if self.is_slab(*c):
+                yield {'project': project, 'engineer': engineer, **self.panel_inputs(*c)}
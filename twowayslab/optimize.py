@@ -0,0 +1,152 @@
+"""
+Cost optimizer for slab thickness and per-location reinforcement.
+
+For every panel the search covers h from the ACI minimum
+(min_thickness_batch, with the panel's own fy) upward in 0.5 cm steps, and
+an independent bar size for each of short/long x neg/pos. Each bar gets the
+widest spacing calculate_detailed would allow. The cheapest combination of
+concrete plus steel wins, provided it passes the spacing and shear checks.
+
+All candidates of a block of thicknesses are evaluated as one array
+(panels x h x short bar x long bar). A panel leaves the search once the
+cost lower bound of the next thickness (concrete plus minimum steel)
+exceeds its best design so far.
+"""
+import numpy as np
+
+from .core import (BAR_INFO, _loads_batch, _moments_batch, _rho_batch, _shear_batch, get_coefficients_batch,
+                   min_thickness_batch)
+
+STEEL_DENSITY = 7850.0  # kg/m3
+TOP_BAR_FRACTION = 0.5  # top bars run 0.25 L from each support (see the section drawing)
+LOCATIONS = ('a_neg', 'a_pos', 'b_neg', 'b_pos')
+
+
+def _strip(Mu, d, h, fc, fy, Ab, db_cm):
+    """Widest allowed spacing of one bar for one strip, and whether it passes the checks."""
+    rho = _rho_batch(Mu, d, fc, fy)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        As_req = np.maximum(rho * 100 * d, 0.0018 * 100 * h)
+        s = np.floor(np.minimum(np.minimum((Ab * 100) / As_req, 3 * h), 45) * 2) / 2
+    # Section must work without the rho fallback, and clear spacing >= max(2.5 cm, db)
+    ok = np.isfinite(rho) & (s - db_cm >= np.maximum(2.5, db_cm))
+    return s, ok
+
+
+def _face(Mu_s, Mu_l, h, cov, fc, fy, span_s, span_l, frac, Ab, db, steel_cost, wu=None):
+    """
+    Cheapest (short bar, long bar) pair for one face (top or bottom).
+    Short bars are outermost and the long bars sit on them, as in
+    design_batch. Inputs are (m, H) arrays; bars run along extra axes.
+    Returns steel cost, short/long bar index and spacing, each (m, H).
+    """
+    B = len(Ab)
+    e1 = lambda a: a[..., None]
+    e2 = lambda a: a[..., None, None]
+    d_s = e1(h) - e1(cov) - db / 20                                  # (m,H,Bs)
+    d_l = e1(d_s) - db[:, None] / 20 - db[None, :] / 20              # (m,H,Bs,Bl)
+
+    s_s, ok_s = _strip(e1(Mu_s), d_s, e1(h), e1(fc), e1(fy), Ab, db / 10)
+    if wu is not None:
+        Vu, phiVc = _shear_batch(e1(wu), e1(span_s), e1(fc), d_s)
+        ok_s &= phiVc >= Vu
+    s_l, ok_l = _strip(e2(Mu_l), d_l, e2(h), e2(fc), e2(fy), Ab, db / 10)
+
+    # kg of steel: As provided (cm2/m) x distribution width x bar run
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kg_s = Ab * 100 / s_s * 1e-4 * e1(span_l) * e1(span_s) * frac * STEEL_DENSITY
+        kg_l = Ab * 100 / s_l * 1e-4 * e2(span_s) * e2(span_l) * frac * STEEL_DENSITY
+    total = np.where(e1(ok_s) & ok_l, (e1(kg_s) + kg_l) * steel_cost, np.inf)
+
+    flat = total.reshape(total.shape[:-2] + (B * B,))
+    k = flat.argmin(axis=-1)
+    bs, bl = np.divmod(k, B)
+    pick = lambda a, i: np.take_along_axis(a, e1(i), axis=-1)[..., 0]
+    s_l_bs = np.take_along_axis(s_l, e2(bs), axis=-2)[..., 0, :]
+    return pick(flat, k), bs, bl, pick(s_s, bs), pick(s_l_bs, bl)
+
+
+def optimize_batch(Lx, Ly, cover, sdl, ll, fc, fy, case, bars=None, concrete_cost=2400.0, steel_cost=28.0,
+                   h_steps=20, h_block=4, beam_w=0.3, chunk=2048):
+    """
+    Cheapest design per panel. Returns a dict of arrays: h, bar_<loc>/s_<loc>
+    for loc in LOCATIONS, concrete_m3, steel_kg, cost and feasible (False if
+    nothing in the h range passes).
+
+    concrete_cost -- per m3; steel_cost -- per kg (same currency)
+    h_steps       -- 0.5 cm steps searched above the ACI minimum
+    bars          -- allowed bar names (default: all of BAR_INFO)
+    """
+    bars = list(bars or BAR_INFO)
+    Ab = np.array([BAR_INFO[b]['A_cm2'] for b in bars])
+    db = np.array([BAR_INFO[b]['d_mm'] for b in bars], dtype=float)
+    Lx, Ly, cov, sdl, ll, fc, fy, case = np.broadcast_arrays(
+        *[np.asarray(v, dtype=float) for v in (Lx, Ly, cover, sdl, ll, fc, fy)], np.asarray(case, dtype=int))
+    n = Lx.shape[0] if Lx.ndim else 1
+    Lx, Ly, cov, sdl, ll, fc, fy, case = (np.atleast_1d(a) for a in (Lx, Ly, cov, sdl, ll, fc, fy, case))
+
+    out = {'h': np.full(n, np.nan), 'cost': np.full(n, np.inf)}
+    for loc in LOCATIONS:
+        out[f'bar_{loc}'] = np.empty(n, dtype=object)
+        out[f's_{loc}'] = np.full(n, np.nan)
+    for c0 in range(0, n, chunk):
+        sl = slice(c0, min(c0 + chunk, n))
+        _optimize_chunk({k: v[sl] for k, v in out.items()}, Lx[sl], Ly[sl], cov[sl], sdl[sl], ll[sl], fc[sl],
+                        fy[sl], case[sl], bars, Ab, db, concrete_cost, steel_cost, h_steps, h_block, beam_w)
+
+    out['feasible'] = np.isfinite(out['cost'])
+    out['concrete_m3'] = out['h'] / 100 * Lx * Ly
+    out['steel_kg'] = (out['cost'] - out['concrete_m3'] * concrete_cost) / steel_cost
+    return out
+
+
+def _optimize_chunk(out, Lx, Ly, cov, sdl, ll, fc, fy, case, bars, Ab, db, concrete_cost, steel_cost,
+                    h_steps, h_block, beam_w):
+    coefs = get_coefficients_batch(case, Lx / Ly)
+    h0 = min_thickness_batch(Lx, Ly, fy, beam_w)
+    active = np.ones(len(Lx), dtype=bool)
+    # Cheapest conceivable steel: shrinkage steel in both directions, bottom full length + top part
+    min_steel_kg_per_cm = 0.0018 * 1e-2 * 2 * (1 + TOP_BAR_FRACTION) * STEEL_DENSITY
+
+    for b0 in range(0, h_steps + 1, h_block):
+        idx = np.flatnonzero(active)
+        if not len(idx):
+            break
+        steps = np.arange(b0, min(b0 + h_block, h_steps + 1))
+        h = h0[idx, None] + 0.5 * steps[None, :]                                      # (m,H)
+        g = lambda a: a[idx, None]
+        _, w_dl, wu = _loads_batch(h, g(sdl), g(ll))
+        Ma_neg, Ma_pos, Mb_neg, Mb_pos = _moments_batch(coefs[idx][:, None, :], wu, w_dl, g(ll), g(Lx))
+
+        shp = lambda a: np.broadcast_to(g(a), h.shape)
+        geo = (h, shp(cov), shp(fc), shp(fy), shp(Lx), shp(Ly))
+        top = _face(Ma_neg, Mb_neg, *geo, TOP_BAR_FRACTION, Ab, db, steel_cost, wu=wu)
+        bot = _face(Ma_pos, Mb_pos, *geo, 1.0, Ab, db, steel_cost)
+        total = h / 100 * g(Lx) * g(Ly) * concrete_cost + top[0] + bot[0]          # (m,H)
+
+        j = total.argmin(axis=1)
+        r = np.arange(len(idx))
+        best = total[r, j]
+        better = best < out['cost'][idx]
+        upd = idx[better]
+        rb = r[better]
+        jb = j[better]
+        out['cost'][upd] = best[better]
+        out['h'][upd] = h[rb, jb]
+        for (cost_, bs, bl, ss, slg), (ls, ll_) in ((top, ('a_neg', 'b_neg')), (bot, ('a_pos', 'b_pos'))):
+            out[f'bar_{ls}'][upd] = [bars[i] for i in bs[rb, jb]]
+            out[f'bar_{ll_}'][upd] = [bars[i] for i in bl[rb, jb]]
+            out[f's_{ls}'][upd] = ss[rb, jb]
+            out[f's_{ll_}'][upd] = slg[rb, jb]
+
+        # Prune: next thickness can't beat the best design found
+        h_next = h0[idx] + 0.5 * (steps[-1] + 1)
+        area = Lx[idx] * Ly[idx]
+        lb = h_next * area * (concrete_cost / 100 + min_steel_kg_per_cm * steel_cost)
+        active[idx[lb >= out['cost'][idx]]] = False
+
+
+def optimize_slab(inputs, **kw):
+    """optimize_batch for one inputs dict; returns a dict of plain values."""
+    res = optimize_batch(*[[inputs[k]] for k in ('Lx', 'Ly', 'cover', 'sdl', 'll', 'fc', 'fy', 'case')], **kw)
+    return {k: (v[0].item() if hasattr(v[0], 'item') else v[0]) for k, v in res.items()}
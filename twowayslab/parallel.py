@@ -0,0 +1,136 @@
+"""
+Parallel report generation for whole floor schedules.
+
+Report rendering is CPU-bound in matplotlib, so slabs are spread across a
+process pool. Inputs are submitted in chunks with a bounded number of
+chunks in flight, and reports come back in input order. Each process
+renders a given drawing once (DrawingCache), optionally sharing a disk
+cache directory with the others. The caches live only as long as one
+generate_reports call; build_report caches nothing unless given a cache.
+When the caller has an active Tracer, workers trace too and their spans
+are merged into it.
+"""
+import collections
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import calculate_detailed
+from .drawcache import DrawingCache
+from .drawing import _pyplot, render_section
+from .report import generate_html_report
+from .store import drawing_key
+from .tracing import Tracer, current
+
+# State of a worker process, set by _init_worker
+_BACKEND = "matplotlib"
+_CACHE = None
+_TRACER = None
+
+
+def _init_worker(backend, cache_dir=None, allocations=None):
+    """
+    Runs once per worker process: pick the backend and a fresh drawing
+    cache, warm up matplotlib, and trace (allocations: None = off, else
+    True / False).
+    """
+    global _BACKEND, _CACHE, _TRACER
+    _BACKEND = backend
+    _CACHE = DrawingCache(directory=cache_dir)
+    if allocations is not None:
+        _TRACER = Tracer(allocations).__enter__()
+    if backend == "matplotlib":
+        _pyplot()
+
+
+def _build(inputs, backend, img=None, cache=None, combinations=None):
+    rows, res_sum = calculate_detailed(inputs, combinations)
+    if img is None:
+        args = (inputs['h'], inputs['cover'], inputs['bar'], res_sum, inputs['Lx'])
+        img = render_section(*args, backend=backend) if cache is None else cache.render(*args, backend=backend)[1]
+    return generate_html_report(inputs, rows, img, res_sum), img
+
+
+def build_report(inputs, backend="matplotlib", img=None, cache=None, combinations=None):
+    """
+    Full pipeline for one slab: design, drawing (unless img is given), HTML.
+    The drawing is rendered afresh unless a DrawingCache is passed. With
+    load combinations the report shows their envelope (see design_batch).
+    """
+    return _build(inputs, backend, img, cache, combinations)[0]
+
+
+def _report_chunk(tasks, backend=None, cache=None, combinations=None):
+    """
+    Reports of one chunk, plus the worker's trace events (if tracing).
+    Without a backend it runs in a worker, with the worker's backend and cache.
+    """
+    if backend is None:
+        backend, cache = _BACKEND, _CACHE
+    results = [_build(inputs, backend, img, cache, combinations) for inputs, img in tasks]
+    return results, _TRACER.take() if _TRACER is not None else []
+
+
+def _collect(future, tracer):
+    results, events = future.result()
+    if tracer is not None:
+        tracer.events.extend(events)
+    return results
+
+
+def _prepare(chunk, backend, store, combinations=None):
+    """Pair each slab with its stored drawing (or None) and the drawing's store key."""
+    if store is None:
+        return [(inputs, None) for inputs in chunk], [None] * len(chunk)
+    keys = [drawing_key(p['h'], p['cover'], p['bar'], d, p['Lx'], backend)
+            for p, d in zip(chunk, store.design_many(chunk, combinations))]
+    return [(p, store.get_drawing(k)) for p, k in zip(chunk, keys)], keys
+
+
+def _finish(results, tasks, keys, store):
+    for (html, img), (_, stored), key in zip(results, tasks, keys):
+        if store is not None and stored is None:
+            store.put_drawing(key, img)
+        yield html
+
+
+def generate_reports(inputs_iter, workers=None, chunksize=4, backend="matplotlib", max_pending=None,
+                     store=None, drawing_cache=None, combinations=None):
+    """
+    Yield one HTML report per inputs dict, in input order.
+
+    workers     -- process count (default: os.cpu_count()); 1 runs inline
+    chunksize   -- slabs per submitted task
+    max_pending -- chunks in flight at once (default: 2 * workers), which
+                   bounds memory for arbitrarily long schedules
+    store       -- optional ResultStore; stored drawings are reused and new
+                   ones saved (store access stays in this process)
+    drawing_cache -- optional directory of cached drawings shared by all
+                     workers and later runs
+    combinations  -- optional load combinations; reports show their envelope
+    """
+    workers = workers or os.cpu_count() or 1
+    inputs_iter = iter(inputs_iter)
+    chunks = iter(lambda: list(itertools.islice(inputs_iter, chunksize)), [])
+    if workers == 1:
+        cache = DrawingCache(directory=drawing_cache)
+        for chunk in chunks:
+            tasks, keys = _prepare(chunk, backend, store, combinations)
+            yield from _finish(_report_chunk(tasks, backend, cache, combinations)[0], tasks, keys, store)
+        return
+
+    tracer = current()
+    trace = None if tracer is None else tracer.allocations
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(backend, drawing_cache, trace)) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            tasks, keys = _prepare(chunk, backend, store, combinations)
+            pending.append((pool.submit(_report_chunk, tasks, combinations=combinations), tasks, keys))
+            if len(pending) >= max_pending:
+                fut, tasks, keys = pending.popleft()
+                yield from _finish(_collect(fut, tracer), tasks, keys, store)
+        while pending:
+            fut, tasks, keys = pending.popleft()
+            yield from _finish(_collect(fut, tracer), tasks, keys, store)
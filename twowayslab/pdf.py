@@ -0,0 +1,321 @@
+"""
+Streaming multi-page PDF export of the slab report (PyFPDF, the `fpdf`
+package in requirements.txt).
+
+PyFPDF normally keeps every page, image and the whole output in memory
+until output(). _StreamingFPDF writes each page to the file as soon as it
+is finished and each image the first time it is used, so peak memory does
+not depend on the number of slabs. Fonts are registered once per document
+and identical drawings are embedded once and referenced from every page.
+"""
+import io
+import os
+import tempfile
+
+from fpdf import FPDF
+
+from .core import CASE_DESC, calculate_detailed
+from .drawing import fig_to_png, plot_twoway_section_detailed
+from .store import drawing_key
+
+# Glyphs outside Latin-1 used by the calculation table (core fonts only)
+_LATIN1_SUBST = {'φ': 'phi', '≥': '>=', '•': '-', '✅': '', '⚠': ''}
+
+
+class _StreamingFPDF(FPDF):
+    """FPDF that flushes finished pages and first-use images straight to a binary stream."""
+
+    def __init__(self, stream):
+        FPDF.__init__(self, 'P', 'mm', 'A4')
+        self._stream = stream
+        self._pos = 0
+        self._kids = []
+        self._putheader()
+
+    # --- low-level output: everything outside a page goes to the stream ---
+    def _out(self, s):
+        if self.state == 2:
+            return FPDF._out(self, s)
+        if isinstance(s, bytes):
+            data = s
+        else:
+            data = str(s).encode('latin1')
+        self._stream.write(data + b"\n")
+        self._pos += len(data) + 1
+
+    def _newobj(self):
+        self.n += 1
+        self.offsets[self.n] = self._pos
+        self._out(f"{self.n} 0 obj")
+
+    def _endpage(self):
+        FPDF._endpage(self)
+        content = self.pages[self.page].encode('latin1')
+        self.pages[self.page] = ''
+        filt = ''
+        if self.compress:
+            import zlib
+            content = zlib.compress(content)
+            filt = '/Filter /FlateDecode '
+        self._newobj()
+        self._kids.append(self.n)
+        self._out('<</Type /Page')
+        self._out('/Parent 1 0 R')
+        self._out('/Resources 2 0 R')
+        self._out(f'/Contents {self.n + 1} 0 R>>')
+        self._out('endobj')
+        self._newobj()
+        self._out(f'<<{filt}/Length {len(content)}>>')
+        self._putstream(content)
+        self._out('endobj')
+
+    # --- images: write the XObject once, on first use, then drop its data ---
+    def image(self, name, x=None, y=None, w=0, h=0, type='', link=''):
+        first = name not in self.images
+        FPDF.image(self, name, x, y, w, h, type, link)
+        if first:
+            state, self.state = self.state, 1
+            info = self.images[name]
+            self._putimage(info)
+            info.pop('data', None)
+            info.pop('smask', None)
+            self.state = state
+
+    def _putimages(self):
+        pass
+
+    def _putresources(self):
+        self._putfonts()
+        self.offsets[2] = self._pos
+        self._out('2 0 obj')
+        self._out('<<')
+        self._putresourcedict()
+        self._out('>>')
+        self._out('endobj')
+
+    # --- document trailer ---
+    def _putpages(self):
+        w_pt, h_pt = (self.fw_pt, self.fh_pt) if self.def_orientation == 'P' else (self.fh_pt, self.fw_pt)
+        self.offsets[1] = self._pos
+        self._out('1 0 obj')
+        self._out('<</Type /Pages')
+        self._out('/Kids [' + ' '.join(f'{k} 0 R' for k in self._kids) + ']')
+        self._out(f'/Count {len(self._kids)}')
+        self._out(f'/MediaBox [0 0 {w_pt:.2f} {h_pt:.2f}]')
+        self._out('>>')
+        self._out('endobj')
+
+    def _putcatalog(self):
+        self._out('/Type /Catalog')
+        self._out('/Pages 1 0 R')
+        self._out('/PageLayout /OneColumn')
+
+    def _enddoc(self):
+        self._putpages()
+        self._putresources()
+        self._newobj()
+        self._out('<<')
+        self._putinfo()
+        self._out('>>')
+        self._out('endobj')
+        self._newobj()
+        self._out('<<')
+        self._putcatalog()
+        self._out('>>')
+        self._out('endobj')
+        xref = self._pos
+        self._out('xref')
+        self._out(f'0 {self.n + 1}')
+        self._out('0000000000 65535 f ')
+        for i in range(1, self.n + 1):
+            self._out(f'{self.offsets[i]:010d} 00000 n ')
+        self._out('trailer')
+        self._out('<<')
+        self._puttrailer()
+        self._out('>>')
+        self._out('startxref')
+        self._out(xref)
+        self._out('%%EOF')
+        self.state = 3
+
+
+class PDFReportWriter:
+    """
+    One PDF, one report per slab, streamed page by page.
+
+        with PDFReportWriter("floor.pdf", font_path="Sarabun-Regular.ttf") as pdf:
+            for inputs in schedule:
+                pdf.add_slab(inputs)
+
+    font_path / bold_font_path -- TrueType fonts for Thai text; without them
+    the core Helvetica font is used and non-Latin-1 text is replaced.
+    combinations -- optional load combinations; slabs designed here show
+    their envelope.
+    """
+
+    def __init__(self, path, font_path=None, bold_font_path=None, dpi=150, combinations=None):
+        self._file = open(path, 'wb')
+        self.pdf = _StreamingFPDF(self._file)
+        self.pdf.set_auto_page_break(True, margin=12)
+        self.pdf.set_title("RC Two-Way Slab Design Report")
+        self.dpi = dpi
+        self.combinations = combinations
+        self.slabs = 0
+        self.drawings = {}  # drawing key -> image name already embedded
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="twowayslab-pdf-")
+        if font_path:
+            self.family = 'slabfont'
+            self.pdf.add_font(self.family, '', font_path, uni=True)
+            self.pdf.add_font(self.family, 'B', bold_font_path or font_path, uni=True)
+            self._text = str
+        else:
+            self.family = 'helvetica'
+            self._text = self._latin1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _latin1(s):
+        s = str(s)
+        for k, v in _LATIN1_SUBST.items():
+            s = s.replace(k, v)
+        return s.encode('latin1', 'replace').decode('latin1')
+
+    def _font(self, size, bold=False):
+        self.pdf.set_font(self.family, 'B' if bold else '', size)
+
+    def _drawing(self, inputs, res_sum):
+        """Image name for this slab's drawing; rendered and embedded only once per unique drawing."""
+        key = drawing_key(inputs['h'], inputs['cover'], inputs['bar'], res_sum, inputs['Lx'], 'png')
+        if key not in self.drawings:
+            from PIL import Image  # ships with matplotlib
+
+            name = os.path.join(self._tmpdir.name, key + '.png')
+            png = fig_to_png(plot_twoway_section_detailed(inputs['h'], inputs['cover'], inputs['bar'],
+                                                          res_sum, inputs['Lx']), dpi=self.dpi)
+            # Flatten to RGB: PyFPDF splits an alpha channel in pure Python, which is very slow
+            Image.open(io.BytesIO(png)).convert('RGB').save(name, optimize=True)
+            self.drawings[key] = name
+        return self.drawings[key]
+
+    def add_slab(self, inputs, rows=None, res_sum=None):
+        """Append one slab report (starts on a new page)."""
+        if rows is None or res_sum is None:
+            rows, res_sum = calculate_detailed(inputs, self.combinations)
+        pdf, t = self.pdf, self._text
+        pdf.add_page()
+        width = pdf.w - pdf.l_margin - pdf.r_margin
+
+        # --- Title & slab mark ---
+        self._font(12, True)
+        mark = t(inputs['slab_id'])
+        mark_w = pdf.get_string_width(mark) + 8
+        pdf.set_xy(pdf.w - pdf.r_margin - mark_w, pdf.t_margin)
+        pdf.set_line_width(0.5)
+        pdf.cell(mark_w, 8, mark, border=1, align='C')
+        pdf.set_line_width(0.2)
+        pdf.set_xy(pdf.l_margin, pdf.t_margin)
+        self._font(16, True)
+        pdf.cell(width, 8, "ENGINEERING DESIGN REPORT", align='C', ln=1)
+        self._font(11, True)
+        pdf.cell(width, 6, "RC Two-Way Slab Design (ACI Method 2)", align='C', ln=1)
+        pdf.set_line_width(0.5)
+        pdf.line(pdf.l_margin, pdf.get_y() + 2, pdf.l_margin + width, pdf.get_y() + 2)
+        pdf.set_line_width(0.2)
+        pdf.ln(5)
+
+        # --- Project box ---
+        self._font(9)
+        half = width / 2 - 2
+        y0 = pdf.get_y()
+        left = [f"Project: {inputs['project']}", f"Engineer: {inputs['engineer']}", "Date: 16/12/2568"]
+        right = [f"Size: {inputs['Lx']} x {inputs['Ly']} m (Case {inputs['case']}: {CASE_DESC[inputs['case']]})",
+                 f"Thickness: {inputs['h']} cm (Cover {inputs['cover']} cm)",
+                 f"Materials: fc'={inputs['fc']}, fy={inputs['fy']} ksc"]
+        for col, lines in ((0, left), (1, right)):
+            pdf.set_xy(pdf.l_margin + col * (half + 4), y0)
+            pdf.multi_cell(half, 5, t("\n".join(lines)), border=1)
+        pdf.set_y(y0 + 17)
+
+        # --- Drawing ---
+        self._font(11, True)
+        pdf.cell(width, 7, "Design Visualization", align='C', ln=1)
+        img_w = width * 0.6
+        name = self._drawing(inputs, res_sum)
+        pdf.image(name, x=pdf.l_margin + (width - img_w) / 2, y=pdf.get_y(), w=img_w)
+        if os.path.exists(name):
+            os.remove(name)  # embedded now; later slabs reuse the image by name
+        info = pdf.images[name]
+        pdf.set_y(pdf.get_y() + img_w * info['h'] / info['w'] + 2)
+
+        # --- Calculation table ---
+        self._font(11, True)
+        pdf.cell(width, 7, "Calculation Details", ln=1)
+        # Rows of an envelope design carry the governing load combination as a 7th column
+        if max(len(r) for r in rows) > 6:
+            cols = [w * width for w in (0.22, 0.18, 0.18, 0.13, 0.08, 0.08, 0.13)]
+        else:
+            cols = [w * width for w in (0.25, 0.20, 0.20, 0.15, 0.10, 0.10)]
+        self._font(8, True)
+        pdf.set_fill_color(238, 238, 238)
+        for w, head in zip(cols, ("Item", "Formula", "Substitution", "Result", "Unit", "Status", "Combination")):
+            pdf.cell(w, 5, head, border=1, align='C', fill=1)
+        pdf.ln()
+        for r in rows:
+            if r[0] == "SECTION":
+                self._font(8, True)
+                pdf.set_fill_color(221, 221, 221)
+                pdf.cell(width, 5, t(r[1]), border=1, fill=1, ln=1)
+                continue
+            fill = "Spacing" in r[0]
+            pdf.set_fill_color(249, 251, 231)
+            for i, (w, txt) in enumerate(zip(cols, r)):
+                if i == 3:
+                    self._font(8, True)
+                    pdf.set_text_color(211, 47, 47)
+                elif i == 5 and txt:
+                    self._font(8, True)
+                    pdf.set_text_color(*((255, 0, 0) if txt == "FAIL" else (0, 128, 0)))
+                else:
+                    self._font(8)
+                pdf.cell(w, 5, t(txt), border=1, fill=fill)
+                pdf.set_text_color(0, 0, 0)
+            pdf.ln()
+
+        # --- Reinforcement summary & signature ---
+        if pdf.get_y() > pdf.page_break_trigger - 56:
+            pdf.add_page()
+        pdf.ln(3)
+        self._font(10, True)
+        pdf.cell(width, 6, t(f"Reinforcement Summary (Use {inputs['bar']})"), ln=1)
+        self._font(9)
+        for label, k in (("Short Span (Neg/Top)", 's_a_neg'), ("Short Span (Pos/Bot)", 's_a_pos'),
+                         ("Long Span (Neg/Top)", 's_b_neg'), ("Long Span (Pos/Bot)", 's_b_pos')):
+            pdf.cell(width, 5, t(f"- {label}: @ {res_sum[k]:.1f} cm"), ln=1)
+        pdf.ln(4)
+        self._font(9, True)
+        pdf.cell(60, 5, "Designed by:", ln=1)
+        pdf.ln(8)
+        pdf.line(pdf.l_margin, pdf.get_y(), pdf.l_margin + 60, pdf.get_y())
+        self._font(9)
+        pdf.cell(60, 5, t(f"({inputs['engineer']})"), align='C', ln=1)
+        pdf.cell(60, 5, "Civil Engineer", align='C', ln=1)
+        self.slabs += 1
+
+    def close(self):
+        if self.pdf.state != 3:
+            self.pdf.close()
+            self._file.close()
+            self._tmpdir.cleanup()
+
+
+def export_pdf(inputs_iter, path, font_path=None, bold_font_path=None, combinations=None):
+    """Write one PDF report page (or pages) per inputs dict; returns the slab count."""
+    with PDFReportWriter(path, font_path, bold_font_path, combinations=combinations) as pdf:
+        for inputs in inputs_iter:
+            pdf.add_slab(inputs)
+    return pdf.slabs
@@ -0,0 +1,218 @@
+"""
+Incremental design pipeline for interactive editing.
+
+calculate_detailed, the section drawing and the HTML report are split into
+named stages, each declaring the inputs and upstream stages it reads:
+
+    geometry -> coefficients -> moments -> reinforcement -> shear
+    loads, combinations --------^                  |
+    table (SlabResult) <---------------------------+
+    drawing <- reinforcement spacings
+    html <- table, drawing, project info
+
+DesignGraph.update() bumps the version of every input that really changed;
+reading a stage recomputes it only if the version of something it declares
+has moved. A stage whose new value equals the old one keeps its version,
+so e.g. a fy tweak that leaves the spacings alone does not redraw the
+section. Stages use the same helpers as design_batch, so the numbers are
+identical to calculate_detailed.
+"""
+import numpy as np
+
+from . import core
+from .core import DESIGN_FIELDS, SlabResult, get_coefficients_batch
+from .report import generate_html_report
+from .tracing import span
+
+INFO_FIELDS = ('project', 'slab_id', 'engineer')
+PARAMS = INFO_FIELDS + DESIGN_FIELDS + ('backend', 'combinations')
+LOCATIONS = ('a_neg', 'a_pos', 'b_neg', 'b_pos')
+
+
+def _a(v, dtype=float):
+    return np.asarray([v], dtype=dtype)
+
+
+# ==========================================
+# 1. STAGES
+# ==========================================
+def _geometry(Lx, Ly):
+    return {'m': core._span_ratio(_a(Lx), _a(Ly))}
+
+
+def _loads(h, sdl, ll):
+    return dict(zip(('w_sw', 'w_dl', 'wu'), core._loads_batch(_a(h), _a(sdl), _a(ll))))
+
+
+def _coefficients(case, geometry):
+    return {'coefs': get_coefficients_batch(_a(case, int), geometry['m'])}
+
+
+def _moments(Lx, ll, combinations, loads, coefficients):
+    """Moments and the factored load wu; with combinations their envelope and governing names."""
+    if combinations is None:
+        wu, governs = loads['wu'], None
+        M = core._moments_batch(coefficients['coefs'], wu, loads['w_dl'], _a(ll), _a(Lx))
+    else:
+        wu, M, index = core._envelope_batch(coefficients['coefs'], loads['w_dl'], _a(ll), _a(Lx), combinations)
+        names = list(combinations)
+        governs = {k: names[int(i[0])] for k, i in index.items()}
+    return {'wu': wu, **dict(zip(('Ma_neg', 'Ma_pos', 'Mb_neg', 'Mb_pos'), M)), 'governs': governs}
+
+
+def _reinforcement(h, cover, fc, fy, bar, moments):
+    h, fc, fy = _a(h), _a(fc), _a(fy)
+    Ab, db = core._bar_props(_a(bar, str))
+    d_short, d_long = core._depths_batch(h, _a(cover), db)
+    out = {'d_short': d_short, 'd_long': d_long}
+    for loc, M, d in zip(LOCATIONS, ('Ma_neg', 'Ma_pos', 'Mb_neg', 'Mb_pos'), (d_short, d_short, d_long, d_long)):
+        out[f'As_{loc}'], _, out[f's_{loc}'] = core._as_spacing_batch(moments[M], d, fc, fy, h, Ab)
+    return out
+
+
+def _shear(Lx, fc, moments, reinforcement):
+    Vu, phiVc = core._shear_batch(moments['wu'], _a(Lx), _a(fc), reinforcement['d_short'])
+    return {'Vu': Vu, 'phiVc': phiVc}
+
+
+def _table(Lx, Ly, h, cover, sdl, ll, fc, fy, case, bar, combinations, geometry, loads, coefficients, moments,
+           reinforcement, shear):
+    values = {**geometry, **loads, **moments, **reinforcement, **shear}  # wu from moments (the envelope)
+    coefs = coefficients['coefs'][0].tolist()
+    record = [Lx, Ly, h, cover, sdl, ll, fc, fy, case, bar]
+    for k in core.RECORD_FIELDS[10:]:
+        record.append(coefs[core._COEF_FIELDS.index(k)] if k in core._COEF_FIELDS else float(values[k][0]))
+    governs = None
+    if combinations is not None:
+        governs = {k: (name, combinations[name]) for k, name in moments['governs'].items()}
+    return SlabResult(*record, governs=governs)
+
+
+def _spacings(reinforcement):
+    return {f's_{loc}': float(reinforcement[f's_{loc}'][0]) for loc in LOCATIONS}
+
+
+def _html(project, slab_id, engineer, table, drawing):
+    inputs = {k: getattr(table, k) for k in DESIGN_FIELDS}
+    inputs.update(project=project, slab_id=slab_id, engineer=engineer)
+    return generate_html_report(inputs, table.rows(), drawing, table.res_sum)
+
+
+# name -> (declared inputs, function); inputs are PARAMS or earlier stages
+STAGES = {
+    'geometry': (('Lx', 'Ly'), _geometry),
+    'loads': (('h', 'sdl', 'll'), _loads),
+    'coefficients': (('case', 'geometry'), _coefficients),
+    'moments': (('Lx', 'll', 'combinations', 'loads', 'coefficients'), _moments),
+    'reinforcement': (('h', 'cover', 'fc', 'fy', 'bar', 'moments'), _reinforcement),
+    'shear': (('Lx', 'fc', 'moments', 'reinforcement'), _shear),
+    'table': (DESIGN_FIELDS + ('combinations', 'geometry', 'loads', 'coefficients', 'moments', 'reinforcement',
+                               'shear'), _table),
+    'spacings': (('reinforcement',), _spacings),
+    'drawing': (('h', 'bar', 'Lx', 'backend', 'spacings'), None),  # cover is not drawn
+    'html': (('project', 'slab_id', 'engineer', 'table', 'drawing'), _html),
+}
+
+
+def _same(a, b):
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, np.ndarray):
+        return np.array_equal(a, b, equal_nan=True)
+    if isinstance(a, SlabResult):
+        return a.record() == b.record() and a.governs == b.governs
+    return type(a) is type(b) and a == b
+
+
+# ==========================================
+# 2. GRAPH
+# ==========================================
+class DesignGraph:
+    """
+    One slab kept live for interactive editing.
+
+        g = DesignGraph(inputs, backend="svg")
+        page = g.html
+        g.update(engineer="...")   # next g.html re-renders the page only
+        g.update(bar="DB12")       # reinforcement, shear, drawing, html
+
+    `render` replaces render_section for the drawing stage, e.g. with a
+    memoized version; it is called as render(h, cover, bar, res_sum, Lx, backend=...).
+    With `combinations` (see core.LOAD_COMBINATIONS) the design is their
+    envelope, as in design_batch. `stats` counts how often each stage ran.
+    """
+
+    def __init__(self, inputs, backend="svg", render=None, combinations=None):
+        if render is None:
+            from .drawing import render_section as render
+        self.render = render
+        self.params = {}
+        self.values = {}
+        self.version = {}
+        self.seen = {}  # stage -> versions of its inputs when it last ran
+        self.stats = dict.fromkeys(STAGES, 0)
+        self.update(backend=backend, combinations=combinations, **{k: inputs[k] for k in PARAMS if k in inputs})
+
+    def update(self, **changes):
+        """
+        Set inputs; returns the names whose value actually changed. Raises
+        ValueError (and changes nothing) for inputs check_inputs rejects.
+        """
+        unknown = set(changes) - set(PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown inputs: {sorted(unknown)}")
+        merged = {**self.params, **changes}
+        if all(k in merged for k in DESIGN_FIELDS):
+            core.check_inputs(merged)
+        changed = []
+        for k, v in changes.items():
+            if k in self.params and _same(self.params[k], v):
+                continue
+            self.params[k] = v
+            self.version[k] = self.version.get(k, 0) + 1
+            changed.append(k)
+        return changed
+
+    def _run(self, name, args):
+        if name == 'drawing':
+            h, bar, Lx, backend, spacings = args
+            return self.render(h, None, bar, spacings, Lx, backend=backend)
+        return STAGES[name][1](*args)
+
+    def get(self, name):
+        """Value of a stage (recomputed only if a declared input changed) or an input."""
+        if name in self.params:
+            return self.params[name]
+        if name not in STAGES:
+            raise KeyError(f"Unknown input or stage: {name}" if name in PARAMS else name)
+        deps = STAGES[name][0]
+        args = [self.get(d) for d in deps]
+        seen = tuple(self.version[d] for d in deps)
+        if self.seen.get(name) != seen:
+            with span(f"stage:{name}"):
+                value = self._run(name, args)
+            self.stats[name] += 1
+            self.seen[name] = seen
+            if name not in self.values or not _same(value, self.values[name]):
+                self.values[name] = value
+                self.version[name] = self.version.get(name, 0) + 1
+        return self.values[name]
+
+    @property
+    def result(self):
+        return self.get('table')
+
+    @property
+    def res_sum(self):
+        return self.get('spacings')
+
+    def rows(self):
+        return self.get('table').rows()
+
+    @property
+    def drawing(self):
+        return self.get('drawing')
+
+    @property
+    def html(self):
+        return self.get('html')
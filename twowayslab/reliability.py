@@ -0,0 +1,244 @@
+"""
+Monte Carlo reliability of designed panels under material and load scatter.
+
+    python -m twowayslab.reliability schedule.csv -n 1000000 -o reliability.csv
+
+Each panel is first designed with its nominal inputs (design_batch), which
+fixes the provided spacings. fc, fy, SDL, LL and the as-built h and cover
+are then sampled, and every realization is pushed through the same
+load / moment / steel / shear math as calculate_detailed:
+
+  * flexure fails at a location when the section cannot carry Mu, or when
+    the provided As (bar area / design spacing) is less than the strength
+    demand rho * b * d (the 0.0018 b h minimum is not a strength check);
+  * shear fails when phiVc < Vu.
+
+Load factors and phi stay in, so the probabilities say how often the
+design checks themselves would fail had the as-built values been known.
+
+The spacing calculate_detailed would require for each realization is
+counted in 0.5 cm bins, so its quantiles are exact at any sample count.
+Panels are processed in blocks and realizations in chunks of at most
+`chunk` values, the blocks' spacing histograms included, so memory is
+bounded. Every panel has its own RNG stream
+seeded from (seed, panel index): results do not depend on the chunk size.
+"""
+import argparse
+import csv
+import math
+import statistics
+import sys
+
+import numpy as np
+
+from . import core
+from .core import DESIGN_FIELDS, design_batch, get_coefficients_batch
+
+LOCATIONS = ('a_neg', 'a_pos', 'b_neg', 'b_pos')
+SCATTER_FIELDS = ('fc', 'fy', 'sdl', 'll', 'h', 'cover')
+
+# Material and load scatter relative to the nominal value (bias = mean /
+# nominal, cov = coefficient of variation); h and cover are absolute, in cm.
+DEFAULT_SCATTER = {
+    'fc': {'dist': 'normal', 'bias': 1.10, 'cov': 0.12},
+    'fy': {'dist': 'lognormal', 'bias': 1.10, 'cov': 0.06},
+    'sdl': {'dist': 'normal', 'bias': 1.05, 'cov': 0.10},
+    'll': {'dist': 'gumbel', 'bias': 1.00, 'cov': 0.18},
+    'h': {'dist': 'normal', 'shift': 0.0, 'sd': 0.5},
+    'cover': {'dist': 'normal', 'shift': 0.3, 'sd': 0.5},
+}
+
+_SPACING_BINS = 91  # 0, 0.5, ..., 45 cm
+QUANTILES = (0.05, 0.5, 0.95)
+
+
+# ==========================================
+# 1. SAMPLING
+# ==========================================
+def _realize(spec, nominal, u):
+    """
+    Transform uniform pairs u (..., 2) into samples around nominal (...,).
+    Normal and lognormal use Box-Muller on the pair, Gumbel the first value.
+    """
+    dist = spec['dist']
+    if dist not in ('normal', 'lognormal', 'gumbel'):
+        raise ValueError(f"Unknown distribution: {dist}")
+    if dist == 'gumbel':
+        mean = nominal * spec['bias']
+        beta = mean * spec['cov'] * math.sqrt(6) / math.pi
+        return mean - 0.5772156649 * beta - beta * np.log(-np.log(np.maximum(u[..., 0], 1e-300)))
+    z = np.sqrt(-2 * np.log1p(-u[..., 0])) * np.cos(2 * np.pi * u[..., 1])
+    if 'sd' in spec:
+        return nominal + spec['shift'] + spec['sd'] * z
+    mean = nominal * spec['bias']
+    if dist == 'normal':
+        return mean * (1 + spec['cov'] * z)
+    s2 = math.log1p(spec['cov'] ** 2)
+    return mean * np.exp(math.sqrt(s2) * z - s2 / 2)
+
+
+# ==========================================
+# 2. SIMULATION
+# ==========================================
+def _simulate(nom, scatter, rngs, c):
+    """
+    One chunk of c realizations for a block of panels; nom holds (B, 1)
+    nominal arrays. Returns flexure failures (B, c, 4), shear failures
+    (B, c) and the required spacings (B, c, 4).
+    """
+    u = np.stack([rng.random((c, len(SCATTER_FIELDS), 2)) for rng in rngs])
+    x = {k: _realize(scatter[k], nom[k], u[:, :, i]) for i, k in enumerate(SCATTER_FIELDS)}
+    h, cov = np.maximum(x['h'], 0.0), np.maximum(x['cover'], 0.0)
+    fc, fy, sdl, ll = (np.maximum(x[k], 0.0) for k in ('fc', 'fy', 'sdl', 'll'))
+
+    w_sw, w_dl, wu = core._loads_batch(h, sdl, ll)
+    M = core._moments_batch(nom['coefs'][:, None, :], wu, w_dl, ll, nom['Lx'])
+    d_short, d_long = core._depths_batch(h, cov, nom['db'])
+
+    flex = np.empty(h.shape + (4,), dtype=bool)
+    s_req = np.empty(h.shape + (4,))
+    for j, (loc, Mu, d) in enumerate(zip(LOCATIONS, M, (d_short, d_short, d_long, d_long))):
+        rho = core._rho_batch(Mu, d, fc, fy)
+        with np.errstate(invalid='ignore'):
+            flex[..., j] = ~np.isfinite(rho) | (nom[f'As_prov_{loc}'] < rho * 100 * d)
+        s_req[..., j] = core._as_spacing_batch(Mu, d, fc, fy, h, nom['Ab'])[2]
+    Vu, phiVc = core._shear_batch(wu, nom['Lx'], fc, d_short)
+    with np.errstate(invalid='ignore'):
+        shear = ~(phiVc >= Vu)
+    return flex, shear, s_req
+
+
+def _quantiles(hist, qs):
+    """Exact quantiles of 0.5 cm binned spacings; hist is (..., bins)."""
+    cum = np.cumsum(hist, axis=-1)
+    total = cum[..., -1:]
+    return [np.argmax(cum >= np.maximum(np.ceil(q * total), 1), axis=-1) / 2 for q in qs]
+
+
+def reliability_batch(Lx, Ly, h, cover, sdl, ll, fc, fy, case, bar, samples=100_000, scatter=None, seed=0,
+                      chunk=1 << 18, provided=None):
+    """
+    Failure probabilities and spacing distributions for n panels.
+
+    `provided` optionally maps 'a_neg'.. to the spacings actually detailed
+    (default: the design_batch spacings). Returns a dict of (n,) arrays:
+    p_fail_<loc>, p_fail_flexure, p_fail_shear, p_fail (any), beta
+    (reliability index of p_fail), s_<loc> (provided) and
+    s_<loc>_p05 / _p50 / _p95 of the required spacing.
+    """
+    scatter = {**DEFAULT_SCATTER, **(scatter or {})}
+    cols = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (Lx, Ly, h, cover, sdl, ll, fc, fy)],
+                               np.asarray(case, dtype=int), np.asarray(bar, dtype=str))
+    cols = [np.atleast_1d(c).ravel() for c in cols]
+    nominal = dict(zip(DESIGN_FIELDS, cols))
+    res = design_batch(*cols)
+    n = len(res['m'])
+    Ab, db = core._bar_props(nominal['bar'])
+    s_prov = {loc: np.broadcast_to(np.asarray(provided[loc], dtype=float), (n,)) if provided else res[f's_{loc}']
+              for loc in LOCATIONS}
+    coefs = get_coefficients_batch(nominal['case'], res['m'])
+
+    flex_n = np.zeros((n, 4), dtype=np.int64)
+    any_flex_n = np.zeros(n, dtype=np.int64)
+    shear_n = np.zeros(n, dtype=np.int64)
+    any_n = np.zeros(n, dtype=np.int64)
+    quant = np.zeros((len(QUANTILES), n, 4))
+
+    # A block's per-panel state is its realizations plus its spacing histogram
+    block = max(1, min(n, chunk // (samples + 4 * _SPACING_BINS)))
+    c_max = max(1, chunk // block)
+    for b0 in range(0, n, block):
+        sl = slice(b0, min(n, b0 + block))
+        col = lambda a: a[sl, None]
+        nom = {k: col(nominal[k]) for k in ('Lx', 'h', 'cover', 'sdl', 'll', 'fc', 'fy')}
+        nom.update(coefs=coefs[sl], db=col(db), Ab=col(Ab))
+        for loc in LOCATIONS:
+            with np.errstate(divide='ignore'):
+                nom[f'As_prov_{loc}'] = col(Ab * 100 / s_prov[loc])
+        rngs = [np.random.default_rng([seed, i]) for i in range(sl.start, sl.stop)]
+        hist = np.zeros((sl.stop - sl.start, 4, _SPACING_BINS), dtype=np.int64)
+        for c0 in range(0, samples, c_max):
+            c = min(c_max, samples - c0)
+            flex, shear, s_req = _simulate(nom, scatter, rngs, c)
+            flex_n[sl] += flex.sum(axis=1)
+            any_flex = flex.any(axis=-1)
+            any_flex_n[sl] += any_flex.sum(axis=1)
+            shear_n[sl] += shear.sum(axis=1)
+            any_n[sl] += (any_flex | shear).sum(axis=1)
+            bins = np.clip(np.nan_to_num(s_req * 2), 0, _SPACING_BINS - 1).astype(np.int64)
+            # Flat (panel, location, bin) index so one bincount fills the histogram
+            bins += (np.arange(hist.shape[0])[:, None, None] * 4 + np.arange(4)) * _SPACING_BINS
+            hist += np.bincount(bins.ravel(), minlength=hist.size).reshape(hist.shape)
+        for qi, q in enumerate(_quantiles(hist, QUANTILES)):
+            quant[qi, sl] = q
+
+    out = {}
+    for j, loc in enumerate(LOCATIONS):
+        out[f'p_fail_{loc}'] = flex_n[:, j] / samples
+    out['p_fail_flexure'] = any_flex_n / samples
+    out['p_fail_shear'] = shear_n / samples
+    out['p_fail'] = any_n / samples
+    out['beta'] = np.array([_beta(p) for p in out['p_fail']])
+    for j, loc in enumerate(LOCATIONS):
+        out[f's_{loc}'] = np.asarray(s_prov[loc], dtype=float)
+        for qi, q in enumerate(QUANTILES):
+            out[f's_{loc}_p{round(q * 100):02d}'] = quant[qi, :, j]
+    return out
+
+
+def _beta(p):
+    """Reliability index -Phi^-1(p); inf when no realization failed."""
+    if p <= 0:
+        return math.inf
+    if p >= 1:
+        return -math.inf
+    return -statistics.NormalDist().inv_cdf(p)
+
+
+def reliability_slab(inputs, **kw):
+    """reliability_batch for one calculate_detailed-style inputs dict; plain values."""
+    out = reliability_batch(*[[inputs[k]] for k in DESIGN_FIELDS], **kw)
+    return {k: v[0].item() for k, v in out.items()}
+
+
+# ==========================================
+# 3. COMMAND LINE
+# ==========================================
+def main(argv=None):
+    from .cli import INFO_FIELDS, _detect_format, parse_row, read_schedule
+
+    ap = argparse.ArgumentParser(prog="python -m twowayslab.reliability", description=__doc__.split("\n\n")[0])
+    ap.add_argument("schedule", help="CSV or JSONL slab schedule")
+    ap.add_argument("-o", "--output", default="-", help="CSV output file (default: stdout)")
+    ap.add_argument("--format", choices=("csv", "jsonl"), help="input format (default: from extension)")
+    ap.add_argument("-n", "--samples", type=int, default=100_000, help="realizations per slab")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--chunk", type=int, default=1 << 18, help="max realizations held in memory at once")
+    args = ap.parse_args(argv)
+
+    schedule = []
+    with open(args.schedule, newline='', encoding='utf-8-sig') as f:
+        for n, raw in enumerate(read_schedule(f, _detect_format(args.schedule, args.format)), 1):
+            try:
+                schedule.append(parse_row(raw))
+            except (ValueError, TypeError) as e:
+                print(f"row {n}: skipped ({e})", file=sys.stderr)
+    if not schedule:
+        return 0
+    out = reliability_batch(*[[p[k] for p in schedule] for k in DESIGN_FIELDS], samples=args.samples,
+                            seed=args.seed, chunk=args.chunk)
+    fields = INFO_FIELDS + DESIGN_FIELDS + tuple(out)
+    stream = sys.stdout if args.output == "-" else open(args.output, 'w', newline='', encoding='utf-8')
+    try:
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        for i, p in enumerate(schedule):
+            writer.writerow([p[k] for k in INFO_FIELDS + DESIGN_FIELDS] + [out[k][i] for k in out])
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
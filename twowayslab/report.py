@@ -0,0 +1,281 @@
+"""
+HTML report rendering.
+
+Reports are written as chunks to a file-like sink, so cost is linear in the
+table size and a multi-slab document never has to sit in memory:
+generate_html_report returns one standalone page, HTMLReportWriter streams
+many slabs into one document with a shared stylesheet and a table of
+contents. In a multi-slab document each distinct drawing is written once,
+as an SVG <symbol>, and every slab showing it references it with <use>.
+"""
+import base64
+import hashlib
+import io
+import re
+import struct
+
+from .core import calculate_detailed
+from .tracing import traced
+
+_HEAD_OPEN = """
+    <!DOCTYPE html>
+    <html lang="th">
+    <head>
+        <link href="https://fonts.googleapis.com/css2?family=Sarabun:wght@400;700&display=swap" rel="stylesheet">
+        <style>
+            body { font-family: 'Sarabun', sans-serif; padding: 20px; }
+            .report-table { width: 100%; border-collapse: collapse; font-size: 14px; margin-top: 20px; }
+            .report-table th, .report-table td { border: 1px solid #444; padding: 8px; }
+            .report-table th { background-color: #eee; text-align: center; }
+            .pass-ok { color: green; font-weight: bold; }
+            .pass-no { color: red; font-weight: bold; }
+            @media print { .no-print { display: none !important; } }"""
+
+_HEAD_CLOSE = """
+        </style>
+    </head>
+    <body>
+        <div class="no-print" style="text-align: center; margin-bottom: 20px;">
+            <button onclick="window.print()" style="background-color: #4CAF50; border: none; color: white; padding: 12px 24px; display: inline-flex; align-items: center; gap: 8px; font-size: 16px; cursor: pointer; border-radius: 5px; font-family: 'Sarabun'; font-weight: bold;">
+                🖨️ Print This Page / พิมพ์หน้านี้
+            </button>
+        </div>
+"""
+
+_TAIL = """    </body>
+    </html>
+    """
+
+# Extra rules for multi-slab documents. The table of contents is written
+# last (it is only known at the end) and moved to the top with flex order.
+_MULTI_CSS = """
+            body { display: flex; flex-direction: column; }
+            .no-print { order: -2; }
+            .toc { order: -1; }
+            .toc ul { columns: 3; }
+            .slab { break-before: page; }
+            .pass-warn { color: #E65100; font-weight: bold; }"""
+
+
+# ==========================================
+# 1. HTML REPORT
+# ==========================================
+def _drawing_html(img):
+    if img.lstrip().startswith("<svg"):
+        return img
+    return f'<img src="{img}" style="max-width:90%; height:auto;" />'
+
+
+def _drawing_size(img):
+    """Intrinsic (width, height) in px of SVG markup or a PNG data URI."""
+    if img.lstrip().startswith("<svg"):
+        w, h = re.search(r'viewBox="0 0 ([\d.]+) ([\d.]+)"', img).groups()
+        return w, h
+    head = base64.b64decode(img[img.index(",") + 1:][:44])
+    return struct.unpack(">II", head[16:24])  # PNG IHDR width, height
+
+
+# Root <svg> attributes that only size or place the drawing; the others
+# (font-family, fill, ...) style its content and move onto the <symbol>
+_SVG_LAYOUT_ATTRS = ('viewBox', 'width', 'height', 'x', 'y', 'style')
+
+
+def _drawing_symbol(key, img, size):
+    """
+    Hidden definition of a shared drawing, referenced by _drawing_use.
+    Ids inside an SVG drawing (arrow markers) are prefixed with the key, so
+    several drawings in one document don't define the same id.
+    """
+    w, h = size
+    attrs = ""
+    if img.lstrip().startswith("<svg"):
+        root = img.index(">")
+        attrs = "".join(f' {k}="{v}"' for k, v in re.findall(r'([\w:-]+)="([^"]*)"', img[:root])
+                        if k not in _SVG_LAYOUT_ATTRS and not k.startswith('xmlns'))
+        inner = re.sub(r'(\bid="|url\(#|href="#)', rf'\g<1>dwg-{key}-', img[root + 1:img.rindex("</svg>")])
+    else:
+        inner = f'<image href="{img}" width="{w}" height="{h}"/>'
+    return (f'<svg width="0" height="0" style="position:absolute" aria-hidden="true">'
+            f'<symbol id="dwg-{key}" viewBox="0 0 {w} {h}"{attrs}>{inner}</symbol></svg>')
+
+
+def _drawing_use(key, size):
+    w, h = size
+    return f'<svg viewBox="0 0 {w} {h}" width="100%" style="max-width:{w}px"><use href="#dwg-{key}"/></svg>'
+
+
+def _table_row(r, ncols=6):
+    if r[0] == "SECTION":
+        return f"<tr style='background-color:#ddd; font-weight:bold;'><td colspan='{ncols}'>{r[1]}</td></tr>"
+    status_class = "pass-ok"
+    if r[5] == "FAIL":
+        status_class = "pass-no"
+    elif "WARN" in r[5]:
+        status_class = "pass-warn"
+    bg = "background-color:#f9fbe7;" if "Spacing" in r[0] else ""
+    return (f"<tr style='{bg}'><td>{r[0]}</td><td>{r[1]}</td><td>{r[2]}</td>"
+            f"<td style='color:#D32F2F; font-weight:bold;'>{r[3]}</td><td>{r[4]}</td>"
+            f"<td class='{status_class}'>{r[5]}</td>" + "".join(f"<td>{c}</td>" for c in r[6:]) + "</tr>")
+
+
+def _write_slab(write, inputs, rows, drawing, res_sum):
+    """Body of one slab report: header, project box, drawing, table, summary."""
+    write(f"""
+        <div style="border-bottom: 2px solid #333; padding-bottom: 10px; margin-bottom: 20px; position: relative;">
+            <div style="position: absolute; top:0; right:0; border: 2px solid #000; padding: 5px 15px; font-weight: bold;">{inputs['slab_id']}</div>
+            <h1 style="text-align:center; margin:0;">ENGINEERING DESIGN REPORT</h1>
+            <h3 style="text-align:center; margin:5px;">RC Two-Way Slab Design (ACI Method 2)</h3>
+        </div>
+
+        <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px; margin-bottom: 20px;">
+            <div style="border: 1px solid #ddd; padding: 10px;">
+                <strong>Project:</strong> {inputs['project']}<br>
+                <strong>Engineer:</strong> {inputs['engineer']}<br>
+                <strong>Date:</strong> 16/12/2568
+            </div>
+            <div style="border: 1px solid #ddd; padding: 10px;">
+                <strong>Size:</strong> {inputs['Lx']} x {inputs['Ly']} m (Case {inputs['case']})<br>
+                <strong>Thickness:</strong> {inputs['h']} cm (Cover {inputs['cover']} cm)<br>
+                <strong>Materials:</strong> fc'={inputs['fc']}, fy={inputs['fy']} ksc
+            </div>
+        </div>
+
+        <h3 style="text-align:center;">Design Visualization</h3>
+        <div style="text-align:center; border:1px solid #eee; padding:10px;">
+            """)
+    write(drawing)
+    # Rows of an envelope design carry the governing load combination as a 7th column
+    ncols = max(len(r) for r in rows)
+    write(f"""
+        </div>
+
+        <h3>Calculation Details</h3>
+        <table class="report-table">
+            <thead>
+                <tr><th width="25%">Item</th><th width="20%">Formula</th><th width="20%">Substitution</th><th width="15%">Result</th><th width="10%">Unit</th><th width="10%">Status</th>{'<th>Combination</th>' if ncols > 6 else ''}</tr>
+            </thead>
+            <tbody>""")
+    for r in rows:
+        write(_table_row(r, ncols))
+    write(f"""</tbody>
+        </table>
+
+        <div style="margin-top: 40px; page-break-inside: avoid;">
+            <h4>Reinforcement Summary (Use {inputs['bar']})</h4>
+            <ul>
+                <li><strong>Short Span (Neg/Top):</strong> @ {res_sum['s_a_neg']:.1f} cm</li>
+                <li><strong>Short Span (Pos/Bot):</strong> @ {res_sum['s_a_pos']:.1f} cm</li>
+                <li><strong>Long Span (Neg/Top):</strong> @ {res_sum['s_b_neg']:.1f} cm</li>
+                <li><strong>Long Span (Pos/Bot):</strong> @ {res_sum['s_b_pos']:.1f} cm</li>
+            </ul>
+            <div style="width: 250px; text-align: center; margin-top: 20px;">
+                <div style="text-align: left; font-weight: bold;">Designed by:</div>
+                <div style="border-bottom: 1px solid #000; margin: 30px 0 5px 0;"></div>
+                <div>({inputs['engineer']})</div>
+                <div>Civil Engineer</div>
+            </div>
+        </div>
+""")
+
+
+def write_html_report(sink, inputs, rows, img_base64, res_sum):
+    """Write one standalone report page to a file-like sink."""
+    sink.write(_HEAD_OPEN + _HEAD_CLOSE)
+    _write_slab(sink.write, inputs, rows, _drawing_html(img_base64), res_sum)
+    sink.write(_TAIL)
+
+
+@traced(payload=True)
+def generate_html_report(inputs, rows, img_base64, res_sum):
+    buf = io.StringIO()
+    write_html_report(buf, inputs, rows, img_base64, res_sum)
+    return buf.getvalue()
+
+
+# ==========================================
+# 2. MULTI-SLAB DOCUMENT
+# ==========================================
+class HTMLReportWriter:
+    """
+    Stream many slab reports into one HTML document.
+
+        with open("floor.html", "w", encoding="utf-8") as f, HTMLReportWriter(f) as doc:
+            for inputs in schedule:
+                doc.add_slab(inputs)
+
+    The stylesheet, font link and print button are written once; each slab
+    is a <section> and a linked table of contents is added on close().
+    Drawings are content-addressed (drawcache.section_key): one that was
+    already written is not rendered again, only referenced. An optional
+    DrawingCache serves drawings rendered by earlier documents or runs.
+    With load combinations, slabs designed here show their envelope.
+    """
+
+    def __init__(self, sink, title="RC Two-Way Slab Design Reports", cache=None, combinations=None):
+        self.sink = sink
+        self.title = title
+        self.cache = cache
+        self.combinations = combinations
+        self.toc = []  # (anchor, slab_id, summary) per slab, small
+        self.drawings = {}  # key -> size of every drawing already written
+        self.closed = False
+        sink.write(_HEAD_OPEN + _MULTI_CSS + _HEAD_CLOSE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_slab(self, inputs, rows=None, res_sum=None, img=None, backend="svg"):
+        """Append one slab section; the design and drawing are computed if not given."""
+        if rows is None or res_sum is None:
+            rows, res_sum = calculate_detailed(inputs, self.combinations)
+        if img is None:
+            from .drawcache import section_key
+            key = section_key(inputs['h'], inputs['bar'], res_sum, inputs['Lx'], backend)
+            if key not in self.drawings:
+                img = self._render(inputs, res_sum, backend)
+        else:
+            key = hashlib.sha256(img.encode()).hexdigest()[:24]
+        if key in self.drawings:
+            drawing = _drawing_use(key, self.drawings[key])
+        else:
+            size = self.drawings[key] = _drawing_size(img)
+            drawing = _drawing_symbol(key, img, size) + _drawing_use(key, size)
+        anchor = f"slab-{len(self.toc) + 1}"
+        shear = rows[-1][5]
+        self.toc.append((anchor, inputs['slab_id'],
+                         f"{inputs['Lx']} x {inputs['Ly']} m, Case {inputs['case']}, {inputs['bar']} &middot; "
+                         f"<span class='{'pass-ok' if shear == 'PASS' else 'pass-no'}'>{shear}</span>"))
+        self.sink.write(f'\n        <section class="slab" id="{anchor}">')
+        _write_slab(self.sink.write, inputs, rows, drawing, res_sum)
+        self.sink.write('        </section>\n')
+
+    def _render(self, inputs, res_sum, backend):
+        args = (inputs['h'], inputs['cover'], inputs['bar'], res_sum, inputs['Lx'])
+        if self.cache is not None:
+            return self.cache.render(*args, backend=backend)[1]
+        from .drawing import render_section
+        return render_section(*args, backend=backend)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        write = self.sink.write
+        write(f'\n        <nav class="toc">\n            <h1>{self.title}</h1>\n'
+              f'            <p>{len(self.toc)} slabs, {len(self.drawings)} distinct drawings</p>\n            <ul>\n')
+        for anchor, slab_id, summary in self.toc:
+            write(f'                <li><a href="#{anchor}">{slab_id}</a> &mdash; {summary}</li>\n')
+        write('            </ul>\n        </nav>\n')
+        write(_TAIL)
+
+
+def export_html(inputs_iter, path, backend="svg", title="RC Two-Way Slab Design Reports", cache=None,
+                combinations=None):
+    """Write a multi-slab HTML document; returns the slab count."""
+    with open(path, 'w', encoding='utf-8') as f, HTMLReportWriter(f, title, cache, combinations) as doc:
+        for inputs in inputs_iter:
+            doc.add_slab(inputs, backend=backend)
+    return len(doc.toc)
@@ -0,0 +1,504 @@
+"""
+Local HTTP/JSON design service for programmatic clients (BIM plug-ins).
+
+    python -m twowayslab.service serve --port 8765 --workers 4
+    python -m twowayslab.service load -n 20000 -c 64             # in-process server
+    python -m twowayslab.service load --url http://127.0.0.1:8765 --endpoint report
+
+Standard library asyncio only, bound to 127.0.0.1 by default: nothing is
+fetched from the network. Endpoints (request bodies are schedule rows as
+JSON, with the same defaults and validation as the batch CLI):
+
+    POST /design    one slab -> results (or a JSON list -> list of results)
+    POST /report    one slab -> HTML report
+    POST /drawing   one slab -> section drawing (SVG or PNG)
+    GET  /metrics   latency, throughput, batching and queue figures
+    GET  /health
+
+Concurrent /design requests are not designed one by one: they wait in a
+queue, and a single batcher task takes everything queued (up to
+max_batch) into one design_batch call, run in a thread so the event loop
+keeps accepting connections. While one batch runs the next one fills, so
+batches grow with the load and a lone request is not delayed.
+
+Drawings and reports are rendered in a process pool (see parallel.py),
+each worker keeping its own DrawingCache.
+
+Backpressure: the design queue holds at most max_queue slabs and at most
+max_render renders are in flight; beyond that requests get 503 with
+Retry-After instead of piling up in memory.
+"""
+import argparse
+import asyncio
+import base64
+import collections
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from . import parallel
+from .cli import parse_row, result_row
+from .core import DESIGN_FIELDS, batch_rows, calculate_detailed, design_batch
+
+MAX_BODY = 1 << 20
+_WINDOW = 10.0  # seconds of history behind throughput_rps
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+ROUTES = {'/design': 'POST', '/report': 'POST', '/drawing': 'POST', '/metrics': 'GET', '/health': 'GET'}
+
+
+class Overloaded(Exception):
+    """The design queue or the render pool is full."""
+
+
+def _design_many(inputs):
+    res = batch_rows(design_batch(*[[p[k] for p in inputs] for k in DESIGN_FIELDS]))
+    return [result_row(p, r) for p, r in zip(inputs, res)]
+
+
+def _render_report(inputs, backend):
+    """Runs in a report worker, with the worker's DrawingCache."""
+    return parallel.build_report(inputs, backend, cache=parallel._CACHE)
+
+
+def _render_drawing(inputs, backend):
+    """Runs in a report worker: its DrawingCache renders each distinct drawing once."""
+    _, res_sum = calculate_detailed(inputs)
+    return parallel._CACHE.render(inputs['h'], inputs['cover'], inputs['bar'], res_sum, inputs['Lx'],
+                                  backend=backend)[1]
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    v = sorted(values)
+    pick = lambda q: round(v[min(len(v) - 1, math.ceil(q * len(v)) - 1)] * 1000, 3)
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'max': round(v[-1] * 1000, 3)}
+
+
+# ==========================================
+# 1. METRICS
+# ==========================================
+class Metrics:
+    """Request counts and the latencies of the last `keep` requests per endpoint."""
+
+    def __init__(self, keep=10000):
+        self.started = time.monotonic()
+        self.keep = keep
+        self.endpoints = {}
+        self.done = collections.deque()  # completion times within _WINDOW
+        self.batches = {'count': 0, 'slabs': 0, 'max_size': 0, 'last_size': 0}
+
+    def _endpoint(self, path):
+        if path not in self.endpoints:
+            self.endpoints[path] = {'count': 0, 'errors': 0, 'rejected': 0,
+                                    'latency': collections.deque(maxlen=self.keep)}
+        return self.endpoints[path]
+
+    def request(self, path, status, seconds):
+        e = self._endpoint(path if path in ROUTES else 'other')
+        e['count'] += 1
+        e['latency'].append(seconds)
+        if status == 503:
+            e['rejected'] += 1
+        elif status >= 400:
+            e['errors'] += 1
+        now = time.monotonic()
+        self.done.append(now)
+        while self.done and self.done[0] < now - _WINDOW:
+            self.done.popleft()
+
+    def batch(self, size):
+        b = self.batches
+        b['count'] += 1
+        b['slabs'] += size
+        b['max_size'] = max(b['max_size'], size)
+        b['last_size'] = size
+
+    def snapshot(self):
+        now = time.monotonic()
+        window = min(_WINDOW, now - self.started) or 1e-9
+        b = self.batches
+        return {
+            'uptime_s': round(now - self.started, 3),
+            'throughput_rps': round(sum(1 for t in self.done if t >= now - _WINDOW) / window, 1),
+            'endpoints': {path: {'count': e['count'], 'errors': e['errors'], 'rejected': e['rejected'],
+                                 'latency_ms': _percentiles(e['latency'])}
+                          for path, e in self.endpoints.items()},
+            'batches': {**b, 'mean_size': round(b['slabs'] / b['count'], 2) if b['count'] else 0.0},
+        }
+
+
+# ==========================================
+# 2. SERVER
+# ==========================================
+class DesignService:
+    """
+    The HTTP service; one instance per event loop.
+
+        service = DesignService(port=0, workers=2, backend="svg")
+        await service.start()          # service.port is the bound port
+        ...
+        await service.close()
+
+    workers     -- render processes (default: os.cpu_count())
+    max_batch   -- slabs per design_batch call
+    max_queue   -- slabs waiting for design before /design answers 503
+    max_render  -- renders in flight before /report and /drawing answer 503
+                   (default: 4 * workers)
+    drawing_cache -- optional directory of cached drawings (see drawcache.py)
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, workers=None, backend="svg", max_batch=256,
+                 max_queue=4096, max_render=None, drawing_cache=None):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.max_render = max_render or 4 * self.workers
+        self.drawing_cache = drawing_cache
+        self.metrics = Metrics()
+        self.rendering = 0
+        self._queue = None
+        self._server = None
+        self._batcher = None
+        self._pool = None
+        self._connections = {}  # handler task -> its writer
+
+    # ---------- lifecycle ----------
+    async def start(self):
+        self._queue = asyncio.Queue(self.max_queue)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=parallel._init_worker,
+                                         initargs=(self.backend, self.drawing_cache))
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        # Closing the transports ends idle keep-alive handlers at their next read
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        self._pool.shutdown(cancel_futures=True)
+
+    # ---------- design batching ----------
+    def design(self, inputs):
+        """Queue parsed inputs; returns a future of the result row. Raises Overloaded."""
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((inputs, fut))
+        except asyncio.QueueFull:
+            raise Overloaded("design queue full") from None
+        return fut
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self.metrics.batch(len(batch))
+            try:
+                rows = await loop.run_in_executor(None, _design_many, [p for p, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut), row in zip(batch, rows):
+                if not fut.done():
+                    fut.set_result(row)
+
+    async def _render(self, fn, *args):
+        if self.rendering >= self.max_render:
+            raise Overloaded("render pool busy")
+        self.rendering += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self.rendering -= 1
+
+    # ---------- endpoints ----------
+    async def _dispatch(self, method, path, body):
+        """(status, content type, payload bytes) of one request."""
+        if path not in ROUTES:
+            return _json(404, {'error': f"unknown path {path}"})
+        if method != ROUTES[path]:
+            return _json(405, {'error': f"use {ROUTES[path]} {path}"})
+        if path == '/health':
+            return _json(200, {'status': 'ok'})
+        if path == '/metrics':
+            return _json(200, {**self.metrics.snapshot(), 'queue_depth': self._queue.qsize(),
+                               'queue_limit': self.max_queue, 'render_in_flight': self.rendering,
+                               'render_limit': self.max_render, 'workers': self.workers})
+        try:
+            raw = json.loads(body or b'null')
+            items = raw if path == '/design' and isinstance(raw, list) else [raw]
+            if not all(isinstance(r, dict) for r in items):
+                raise ValueError("expected a JSON object" + (" or a list of objects" if path == '/design' else ""))
+            inputs = [parse_row(r) for r in items]
+        except (ValueError, TypeError) as e:
+            return _json(400, {'error': str(e)})
+
+        if path == '/design':
+            if isinstance(raw, list):
+                if len(inputs) > self.max_queue - self._queue.qsize():
+                    raise Overloaded("design queue full")
+                rows = await asyncio.gather(*[self.design(p) for p in inputs])
+                return _json(200, rows)
+            return _json(200, await self.design(inputs[0]))
+        if path == '/report':
+            html = await self._render(_render_report, inputs[0], self.backend)
+            return 200, "text/html; charset=utf-8", html.encode('utf-8')
+        img = await self._render(_render_drawing, inputs[0], self.backend)
+        if img.startswith("data:image/png;base64,"):
+            return 200, "image/png", base64.b64decode(img.split(",", 1)[1])
+        return 200, "image/svg+xml", img.encode('utf-8')
+
+    # ---------- HTTP/1.1 ----------
+    async def _handle(self, reader, writer):
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                request = await _read_message(reader, request=True)
+                if request is None:
+                    break
+                (method, target, version), headers, body = request
+                t0 = time.perf_counter()
+                path = urlsplit(target).path
+                if body is None:
+                    status, ctype, payload = _json(413, {'error': f"body larger than {MAX_BODY} bytes"})
+                else:
+                    try:
+                        status, ctype, payload = await self._dispatch(method, path, body)
+                    except Overloaded as e:
+                        status, ctype, payload = _json(503, {'error': str(e)})
+                    except Exception as e:
+                        status, ctype, payload = _json(500, {'error': f"{type(e).__name__}: {e}"})
+                close = (body is None or version == 'HTTP/1.0'
+                         or headers.get('connection', '').lower() == 'close')
+                head = [f"HTTP/1.1 {status} {_REASONS[status]}", f"Content-Type: {ctype}",
+                        f"Content-Length: {len(payload)}"]
+                if status == 503:
+                    head.append("Retry-After: 1")
+                if close:
+                    head.append("Connection: close")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + payload)
+                await writer.drain()
+                self.metrics.request(path, status, time.perf_counter() - t0)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+
+def _json(status, obj):
+    """A JSON response; results that are not finite numbers answer 400 (strict JSON has no NaN/Infinity)."""
+    try:
+        body = json.dumps(obj, ensure_ascii=False, allow_nan=False)
+    except ValueError:
+        return _json(400, {'error': "result is not a finite number; check the inputs"})
+    return status, "application/json", body.encode('utf-8')
+
+
+async def _read_message(reader, request):
+    """
+    Start line, headers and body of one HTTP message; None at end of
+    stream. A request body over MAX_BODY is not read and comes back None.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    start = line.decode('latin-1').rstrip("\r\n").split(" ", 2)
+    if len(start) != 3:
+        raise ValueError("malformed start line")
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        k, _, v = h.decode('latin-1').partition(":")
+        headers[k.strip().lower()] = v.strip()
+    n = int(headers.get('content-length', 0))
+    if request and n > MAX_BODY:
+        return start, headers, None
+    return start, headers, await reader.readexactly(n)
+
+
+async def serve(**kw):
+    service = await DesignService(**kw).start()
+    print(f"twowayslab service on http://{service.host}:{service.port} "
+          f"({service.workers} render workers, backend {service.backend})", file=sys.stderr)
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
+
+
+# ==========================================
+# 3. LOAD-TEST CLIENT
+# ==========================================
+class Client:
+    """
+    Minimal keep-alive client for one connection.
+
+        async with Client("127.0.0.1", 8765) as c:
+            status, headers, body = await c.post("/design", {"Lx": 4, "Ly": 5})
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def __aenter__(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def request(self, method, path, obj=None):
+        body = b"" if obj is None else json.dumps(obj).encode('utf-8')
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n"
+        if obj is not None:
+            head += "Content-Type: application/json\r\n"
+        self.writer.write((head + "\r\n").encode('latin-1') + body)
+        await self.writer.drain()
+        (_, status, _), headers, data = await _read_message(self.reader, request=False)
+        return int(status), headers, data
+
+    async def get(self, path):
+        return await self.request("GET", path)
+
+    async def post(self, path, obj):
+        return await self.request("POST", path, obj)
+
+
+async def load_test(host, port, payloads, requests=10000, concurrency=64, endpoint="/design", retries=5):
+    """
+    Send `requests` POSTs over `concurrency` keep-alive connections, cycling
+    through payloads. A 503 is retried up to `retries` times, after its
+    Retry-After doubled per attempt, plus up to as much again of jitter. Returns client-side figures: throughput_rps counts
+    successful (200) requests only, latency is per successful request
+    including its retries, `status` holds the final status of each request
+    and `rejected` every 503 received. Plus the server's /metrics at the end.
+    """
+    latencies, statuses = [], collections.Counter()
+    rejected = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal rejected
+        async with Client(host, port) as c:
+            for i in counter:
+                t0 = time.perf_counter()
+                for attempt in range(retries + 1):
+                    status, headers, _ = await c.post(endpoint, payloads[i % len(payloads)])
+                    if status != 503:
+                        break
+                    rejected += 1
+                    if attempt < retries:
+                        # Jitter spreads the retries so they do not all return at once
+                        delay = float(headers.get('retry-after', 1)) * 2 ** attempt
+                        await asyncio.sleep(delay * random.uniform(1, 2))
+                if status == 200:
+                    latencies.append(time.perf_counter() - t0)
+                statuses[status] += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(max(1, min(concurrency, requests)))])
+    seconds = time.perf_counter() - t0
+    async with Client(host, port) as c:
+        server = json.loads((await c.get("/metrics"))[2])
+    return {'endpoint': endpoint, 'requests': requests, 'concurrency': concurrency, 'seconds': round(seconds, 3),
+            'throughput_rps': round(statuses[200] / seconds, 1), 'status': dict(statuses), 'rejected': rejected,
+            'latency_ms': _percentiles(latencies), 'server': server}
+
+
+async def _load_local(args, payloads):
+    service = await DesignService(port=0, workers=args.workers, backend=args.backend).start()
+    try:
+        return await load_test(service.host, service.port, payloads, args.requests, args.concurrency, args.endpoint,
+                               args.retries)
+    finally:
+        await service.close()
+
+
+# ==========================================
+# 4. COMMAND LINE
+# ==========================================
+def main(argv=None):
+    from .bench import synthetic_schedule
+
+    ap = argparse.ArgumentParser(prog="python -m twowayslab.service", description=__doc__.split("\n\n")[0])
+    sub = ap.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("serve", help="run the service")
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=8765)
+    s.add_argument("--max-batch", type=int, default=256, help="slabs per vectorized design call")
+    s.add_argument("--max-queue", type=int, default=4096, help="queued slabs before answering 503")
+    s.add_argument("--max-render", type=int, help="renders in flight before answering 503 (default: 4 x workers)")
+    s.add_argument("--drawing-cache", help="directory of rendered drawings reused across requests and runs")
+    ld = sub.add_parser("load", help="load-test a service (default: one started in this process)")
+    ld.add_argument("--url", help="service to test, e.g. http://127.0.0.1:8765")
+    ld.add_argument("-n", "--requests", type=int, default=10000)
+    ld.add_argument("-c", "--concurrency", type=int, default=64)
+    ld.add_argument("--endpoint", choices=("design", "report", "drawing"), default="design")
+    ld.add_argument("--retries", type=int, default=5, help="retries of a 503 answer, after its Retry-After")
+    ld.add_argument("--seed", type=int, default=0)
+    ld.add_argument("--json", help="also write the figures to this JSON file")
+    for p in (s, ld):
+        p.add_argument("--workers", type=int, help="render worker processes (default: CPU count)")
+        p.add_argument("--backend", choices=("matplotlib", "svg"), default="svg", help="drawing backend")
+    args = ap.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(host=args.host, port=args.port, workers=args.workers, backend=args.backend,
+                              max_batch=args.max_batch, max_queue=args.max_queue, max_render=args.max_render,
+                              drawing_cache=args.drawing_cache))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    args.endpoint = "/" + args.endpoint
+    payloads = synthetic_schedule(min(args.requests, 1000), args.seed)
+    if args.url:
+        u = urlsplit(args.url)
+        out = asyncio.run(load_test(u.hostname, u.port or 80, payloads, args.requests, args.concurrency,
+                                    args.endpoint, args.retries))
+    else:
+        out = asyncio.run(_load_local(args, payloads))
+    lat = out['latency_ms']
+    print(f"{out['endpoint']}: {out['requests']} requests, {out['concurrency']} connections, {out['seconds']} s, "
+          f"{out['throughput_rps']} successful req/s, {out['rejected']} rejected (503) answers")
+    print(f"latency ms: p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  max {lat['max']}")
+    print(f"status: {out['status']}  server batches: mean {out['server']['batches']['mean_size']}, "
+          f"max {out['server']['batches']['max_size']}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(out, f, indent=2)
+    return 0 if set(out['status']) <= {200} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
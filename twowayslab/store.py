@@ -0,0 +1,167 @@
+"""
+Persistent on-disk result store (SQLite).
+
+Designs and rendered drawings are keyed by a content hash of their inputs
+and tagged with engine_version(), a hash of the coefficient lookup tables
+the engine reads, BAR_INFO and the engine source. Re-running a schedule only computes panels that are new
+or changed; rows from an older version never match and can be purged with
+ResultStore.invalidate().
+"""
+import hashlib
+import json
+import os
+import sqlite3
+
+from . import core
+from .core import DESIGN_FIELDS, batch_rows, design_batch
+from .drawcache import section_key
+from .drawing import render_section
+
+_SOURCES = ('core.py', 'drawing.py')
+_SQL_VARS = 500  # keys per IN (...) lookup, below SQLite's variable limit
+
+
+def _hash(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def engine_version():
+    """
+    Version tag: coefficient/bar tables plus the design and drawing code.
+    The coefficients are hashed as built (core._COEF_*), not from
+    ACI_COEFFICIENTS, so an edit only counts once reload_coefficient_tables()
+    has put it into effect.
+    """
+    h = hashlib.sha256()
+    for table in (core._COEF_CASES, core._COEF_M, core._COEF_VALS):
+        h.update(table.tobytes())
+    h.update(json.dumps(core.BAR_INFO, sort_keys=True).encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in _SOURCES:
+        with open(os.path.join(here, name), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def design_key(inputs, combinations=None):
+    """Content hash of the engineering inputs of one panel (and its load combinations, if any)."""
+    values = [int(inputs[k]) if k == 'case' else str(inputs[k]) if k == 'bar' else float(inputs[k])
+              for k in DESIGN_FIELDS]
+    if combinations is not None:
+        values.append(sorted([name, float(d), float(l), bool(p)] for name, (d, l, p) in combinations.items()))
+    return _hash(values)
+
+
+def drawing_key(h_cm, cover_cm, bar_name, res_sum, Lx_val, backend):
+    """Content key of a drawing; cover is accepted for symmetry but not drawn."""
+    return section_key(h_cm, bar_name, res_sum, Lx_val, backend)
+
+
+class ResultStore:
+    """
+    File-backed cache of design results and drawings.
+
+        with ResultStore("results.sqlite") as store:
+            results = store.design_many(schedule)
+            print(store.stats)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version = engine_version()
+        self.stats = {'design_hits': 0, 'design_misses': 0, 'drawing_hits': 0, 'drawing_misses': 0}
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS designs (key TEXT PRIMARY KEY, version TEXT NOT NULL, result TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS drawings (key TEXT PRIMARY KEY, version TEXT NOT NULL, data TEXT NOT NULL);
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    # --- designs ---
+    def _lookup(self, table, col, keys):
+        found = {}
+        keys = list(set(keys))
+        for i in range(0, len(keys), _SQL_VARS):
+            part = keys[i:i + _SQL_VARS]
+            q = f"SELECT key, {col} FROM {table} WHERE version = ? AND key IN ({','.join('?' * len(part))})"
+            found.update(self.db.execute(q, [self.version, *part]).fetchall())
+        return found
+
+    def design_many(self, inputs_list, combinations=None):
+        """
+        design_batch results (one dict per panel, see core.batch_rows) for a
+        list of inputs dicts. Only panels missing from the store are computed,
+        and they are computed together in one batch. Envelope results (with
+        load combinations) are stored under their own keys.
+        """
+        keys = [design_key(p, combinations) for p in inputs_list]
+        found = {k: json.loads(v) for k, v in self._lookup('designs', 'result', keys).items()}
+        missing = {}
+        for k, p in zip(keys, inputs_list):
+            if k not in found:
+                missing.setdefault(k, p)
+        self.stats['design_hits'] += len(keys) - sum(1 for k in keys if k in missing)
+        self.stats['design_misses'] += sum(1 for k in keys if k in missing)
+        if missing:
+            todo = list(missing.values())
+            rows = batch_rows(design_batch(*[[p[f] for p in todo] for f in DESIGN_FIELDS],
+                                           combinations=combinations))
+            new = dict(zip(missing.keys(), rows))
+            self.db.executemany("INSERT OR REPLACE INTO designs VALUES (?, ?, ?)",
+                                [(k, self.version, json.dumps(r)) for k, r in new.items()])
+            self.db.commit()
+            found.update(new)
+        return [found[k] for k in keys]
+
+    # --- drawings ---
+    def get_drawing(self, key):
+        row = self.db.execute("SELECT data FROM drawings WHERE key = ? AND version = ?",
+                              (key, self.version)).fetchone()
+        self.stats['drawing_hits' if row else 'drawing_misses'] += 1
+        return row[0] if row else None
+
+    def put_drawing(self, key, data):
+        self.db.execute("INSERT OR REPLACE INTO drawings VALUES (?, ?, ?)", (key, self.version, data))
+        self.db.commit()
+
+    def drawing(self, h_cm, cover_cm, bar_name, res_sum, Lx_val, backend="svg"):
+        """render_section, served from the store when the same drawing was rendered before."""
+        key = drawing_key(h_cm, cover_cm, bar_name, res_sum, Lx_val, backend)
+        data = self.get_drawing(key)
+        if data is None:
+            data = render_section(h_cm, cover_cm, bar_name, res_sum, Lx_val, backend=backend)
+            self.put_drawing(key, data)
+        return data
+
+    # --- maintenance ---
+    def stale_count(self):
+        """Rows written under another engine version (changed tables or code)."""
+        return sum(self.db.execute(f"SELECT COUNT(*) FROM {t} WHERE version != ?", (self.version,)).fetchone()[0]
+                   for t in ('designs', 'drawings'))
+
+    def invalidate(self, everything=False):
+        """
+        Call after editing ACI_COEFFICIENTS / BAR_INFO: rebuilds the lookup
+        tables, re-tags the store with the new version and deletes every row
+        from older versions (or all rows with everything=True).
+        Returns the number of deleted rows.
+        """
+        core.reload_coefficient_tables()
+        self.version = engine_version()
+        n = 0
+        for t in ('designs', 'drawings'):
+            if everything:
+                n += self.db.execute(f"DELETE FROM {t}").rowcount
+            else:
+                n += self.db.execute(f"DELETE FROM {t} WHERE version != ?", (self.version,)).rowcount
+        self.db.commit()
+        return n
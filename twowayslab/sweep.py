@@ -0,0 +1,127 @@
+"""
+Parametric sweeps: one or two inputs varied over a grid, optionally for
+all nine cases at once.
+
+    res = sweep(inputs, ('h', np.linspace(10, 25, 200)), ('fc', np.linspace(180, 350, 200)),
+                cases=range(1, 10))
+    res['s_min'].shape    # (9, 200, 200): case, y, x
+    worst, case = governing(res, 's_min')
+
+Every result has the shape (case, y, x), with y of length 1 for a
+one-input sweep. The swept values and the base inputs are laid out along
+their own axes and only broadcast inside the arithmetic, so the bar
+lookup runs once per bar and the coefficient interpolation once per
+(case, Lx/Ly) pair. The steps are the design_batch helpers, so every
+grid point equals calculate_detailed for the same inputs. A 200 x 200
+grid takes a few milliseconds per case.
+"""
+import numpy as np
+
+from . import core
+from .core import BAR_INFO, get_coefficients_batch
+
+# Sweepable inputs -> axis label; 'm' is Lx/Ly with Lx held at its base value
+SWEEP_PARAMS = {
+    'm': "Lx/Ly ratio", 'Lx': "Short span Lx (m)", 'Ly': "Long span Ly (m)", 'h': "Thickness h (cm)",
+    'cover': "Cover (cm)", 'sdl': "SDL (kg/m²)", 'll': "LL (kg/m²)", 'fc': "fc' (ksc)", 'fy': "fy (ksc)",
+    'bar': "Bar size",
+}
+LOCATIONS = ('a_neg', 'a_pos', 'b_neg', 'b_pos')
+# Outputs where a larger value governs; for the others (spacings, shear margin) the smaller one does
+_LARGER_GOVERNS = ('As_a_neg', 'As_a_pos', 'As_b_neg', 'As_b_pos', 'As_max', 'Vu')
+
+
+def _axis_values(name, values, shape):
+    if name not in SWEEP_PARAMS:
+        raise ValueError(f"Cannot sweep {name!r}; choose from {sorted(SWEEP_PARAMS)}")
+    if name == 'bar':
+        unknown = [b for b in values if b not in BAR_INFO]
+        if unknown:
+            raise ValueError(f"Unknown bar: {unknown[0]}")
+        return [str(b) for b in values]
+    return np.asarray(values, dtype=float).reshape(shape)
+
+
+def _grid_point(index, x, y):
+    """Label of grid point (1, iy, ix) by the swept values there, for error messages."""
+    named = [(x, index[2])] + ([(y, index[1])] if y is not None else [])
+    return "sweep point " + ", ".join(f"{name}={values[i]}" for (name, values), i in named)
+
+
+def sweep(inputs, x, y=None, cases=None):
+    """
+    Evaluate the design over a grid around the base `inputs` dict.
+
+    x, y  -- (name, values) with name in SWEEP_PARAMS; y is optional
+    cases -- case numbers for the first axis (default: the base case)
+
+    Returns a dict with the axes ('x', 'y', 'cases', 'x_name', 'y_name')
+    and (case, y, x) arrays: As_<loc>, s_<loc>, As_max, s_min, Vu, phiVc
+    and shear_margin = phiVc / Vu - 1 (negative where shear fails).
+    """
+    axes = [(x, (1, 1, -1))] + ([(y, (1, -1, 1))] if y is not None else [])
+    v = {k: np.float64(inputs[k]) for k in ('Lx', 'Ly', 'h', 'cover', 'sdl', 'll', 'fc', 'fy')}
+    bar_names = np.array([[[inputs['bar']]]])
+    m_sweep = None
+    for (name, values), shape in axes:
+        vals = _axis_values(name, values, shape)
+        if name == 'bar':
+            bar_names = np.array(vals).reshape(shape)
+        elif name == 'm':
+            m_sweep = vals
+        else:
+            v[name] = vals
+    Lx, Ly = v['Lx'], v['Ly']
+    if m_sweep is not None:
+        Ly = Lx / m_sweep
+    # Same auto-swap as the app: Lx is always the short span
+    Lx, Ly = np.minimum(Lx, Ly), np.maximum(Lx, Ly)
+    case = np.asarray([inputs['case']] if cases is None else list(cases), dtype=int).reshape(-1, 1, 1)
+    Ab = np.array([BAR_INFO[b]['A_cm2'] for b in bar_names.ravel()]).reshape(bar_names.shape)
+    db = np.array([BAR_INFO[b]['d_mm'] for b in bar_names.ravel()], dtype=float).reshape(bar_names.shape)
+    h, fc, fy, ll = v['h'], v['fc'], v['fy'], v['ll']
+    values = np.broadcast_arrays(Lx, Ly, h, v['cover'], v['sdl'], ll, fc, fy, db)
+    where = lambda i: _grid_point(np.unravel_index(i, values[0].shape), x, y)
+    core._check_batch(*values[:-1], where=where)
+    d_short, d_long = core._depths_batch(h, v['cover'], db)
+    # The inner (long) bars must still sit inside the section
+    shallow = np.flatnonzero(np.broadcast_to(d_long, values[0].shape) <= 0)
+    if len(shallow):
+        i = shallow[0]
+        raise ValueError(f"{where(i)}: effective depth must be positive "
+                         f"(h={values[2].flat[i]}, cover={values[3].flat[i]}, bar {values[-1].flat[i]:g} mm)")
+
+    m = core._span_ratio(Lx, Ly)
+    _, w_dl, wu = core._loads_batch(h, v['sdl'], ll)
+    coefs = get_coefficients_batch(case, m)
+    moments = core._moments_batch(coefs, wu, w_dl, ll, Lx)
+
+    full = (len(case), len(y[1]) if y is not None else 1, len(x[1]))
+    out = {'x': np.asarray(x[1]) if x[0] == 'bar' else np.asarray(x[1], dtype=float), 'x_name': x[0],
+           'y': None if y is None else np.asarray(y[1]) if y[0] == 'bar' else np.asarray(y[1], dtype=float),
+           'y_name': None if y is None else y[0], 'cases': case.ravel()}
+    for loc, M, d in zip(LOCATIONS, moments, (d_short, d_short, d_long, d_long)):
+        As, _, s = core._as_spacing_batch(M, d, fc, fy, h, Ab)
+        out[f'As_{loc}'] = np.broadcast_to(As, full)
+        out[f's_{loc}'] = np.broadcast_to(s, full)
+    out['As_max'] = np.maximum.reduce([out[f'As_{loc}'] for loc in LOCATIONS])
+    out['s_min'] = np.minimum.reduce([out[f's_{loc}'] for loc in LOCATIONS])
+    Vu, phiVc = core._shear_batch(wu, Lx, fc, d_short)
+    out['Vu'] = np.broadcast_to(Vu, full)
+    out['phiVc'] = np.broadcast_to(phiVc, full)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['shear_margin'] = np.broadcast_to(phiVc / Vu - 1, full)
+    return out
+
+
+def governing(res, key):
+    """
+    Worst value of res[key] over the case axis and the case number giving
+    it, both (y, x). NaN never governs.
+    """
+    a = res[key]
+    if key in _LARGER_GOVERNS:
+        i = np.argmax(np.where(np.isnan(a), -np.inf, a), axis=0)
+    else:
+        i = np.argmin(np.where(np.isnan(a), np.inf, a), axis=0)
+    return np.take_along_axis(a, i[None], axis=0)[0], res['cases'][i]
@@ -0,0 +1,399 @@
+"""
+Rebar quantity takeoff and cutting-stock optimization.
+
+    python -m twowayslab.takeoff schedule.csv
+    python -m twowayslab.takeoff schedule.csv --exact --stock 10,12 --json takeoff.json
+
+Every panel contributes four groups of bars, laid out as in the section
+drawing:
+
+  * bottom bars (a_pos / b_pos) run the full span plus a hook at each end;
+  * top bars (a_neg / b_neg) sit at both supports and run TOP_EXTENSION x
+    span into the panel (top_len in the drawing) plus ANCHORAGE into the
+    support beam.
+
+Bars of the short span are spread over Ly and bars of the long span over
+Lx, at floor(width / s) + 1 bars per group. Pieces longer than the
+longest stock bar are split with lap splices.
+
+Pieces are then cut from the stock lengths (10 m and 12 m by default),
+separately for each bar size. The default heuristic is best-fit
+decreasing over groups of equal lengths: each bar takes as many pieces
+of a length as fit, and each bar is finally cut from the shortest stock
+length that holds it. Hundreds of thousands of pieces take a couple of
+seconds.
+
+exact=True solves the LP relaxation by column generation, pricing new
+patterns with a bounded knapsack. It cuts the rounded-down LP patterns,
+finishes the residual with the heuristic and keeps the heuristic plan if
+that is shorter. The LP value (or, if max_iter or time_limit stops the LP
+early, the larger of the Farley bound and the demand length) is a lower
+bound, so the result reports the remaining gap and whether the plan is
+provably optimal; a gap of one stock bar is usually just the integrality
+gap. Each iteration solves an m x m system and one knapsack per stock
+length (m distinct lengths), about 10 ms at m = 100: a 300-panel schedule
+does not converge within max_iter and would take ~25 s, so the LP stops
+after time_limit seconds per bar size (default EXACT_TIME_LIMIT).
+"""
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from .core import BAR_INFO, DESIGN_FIELDS, design_table
+from .optimize import LOCATIONS, STEEL_DENSITY
+
+STOCK_LENGTHS = (10.0, 12.0)  # m
+TOP_EXTENSION = 0.25  # fraction of the bar's span, from each support (top_len in the drawing)
+ANCHORAGE = 0.50  # m into the support: across the beam and bent down (see the drawing)
+HOOK_DB = 12  # bottom bar hook, bar diameters per end
+LAP_DB = 40  # lap splice, bar diameters
+EXACT_TIME_LIMIT = 2.0  # s of column generation per bar size with exact=True
+
+PIECE_DTYPE = np.dtype([('panel', 'i4'), ('location', 'U5'), ('bar', 'U8'), ('length', 'f8'), ('count', 'i8')])
+
+
+# ==========================================
+# 1. TAKEOFF
+# ==========================================
+def bar_pieces(Lx, Ly, bars, spacings, top_extension=TOP_EXTENSION, anchorage=ANCHORAGE, hook_db=HOOK_DB):
+    """
+    Bar pieces of n panels as a PIECE_DTYPE array (one row per panel,
+    location and piece length; `count` pieces each, length in m).
+
+    bars     -- bar name(s) for all locations, or a mapping loc -> names
+                (e.g. the bar_<loc> fields of optimize_batch)
+    spacings -- mapping with s_<loc> arrays, e.g. a design_table array
+    Locations with a non-finite spacing (infeasible designs) are skipped.
+    """
+    Lx, Ly = np.atleast_1d(np.asarray(Lx, dtype=float)), np.atleast_1d(np.asarray(Ly, dtype=float))
+    n = len(Lx)
+    parts = []
+    for loc in LOCATIONS:
+        names = bars[f'bar_{loc}'] if isinstance(bars, dict) else bars
+        names = np.broadcast_to(np.asarray(names, dtype=str), (n,))
+        s = np.broadcast_to(np.asarray(spacings[f's_{loc}'], dtype=float), (n,))
+        db = np.array([BAR_INFO[b]['d_mm'] for b in names], dtype=float) / 1000
+        span, width = (Lx, Ly) if loc.startswith('a') else (Ly, Lx)
+        ok = np.isfinite(s) & (s > 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            count = np.where(ok, np.floor(width * 100 / s + 1e-9) + 1, 0).astype(np.int64)
+        if loc.endswith('pos'):
+            length = span + 2 * hook_db * db
+        else:
+            length = top_extension * span + anchorage
+            count = count * 2  # one group at each support
+        part = np.empty(n, PIECE_DTYPE)
+        part['panel'] = np.arange(n)
+        part['location'] = loc
+        part['bar'] = names
+        part['length'] = length
+        part['count'] = count
+        parts.append(part[count > 0])
+    return np.concatenate(parts)
+
+
+def bar_weight(bar, length_m):
+    """kg of `length_m` metres of one bar size."""
+    return BAR_INFO[bar]['A_cm2'] * 1e-4 * length_m * STEEL_DENSITY
+
+
+def summarize(pieces):
+    """Per bar size: piece count, total length (m) and weight (kg)."""
+    out = {}
+    for bar in sorted(set(pieces['bar'].tolist()), key=lambda b: BAR_INFO[b]['d_mm']):
+        p = pieces[pieces['bar'] == bar]
+        length = float((p['length'] * p['count']).sum())
+        out[bar] = {'count': int(p['count'].sum()), 'length_m': length, 'weight_kg': bar_weight(bar, length)}
+    return out
+
+
+def _split(length_cm, count, stock_cm, lap_cm):
+    """Pieces longer than the longest stock: k segments joined by k - 1 laps."""
+    long_ = length_cm > stock_cm
+    if not long_.any():
+        return length_cm, count
+    L, c = length_cm[long_], count[long_]
+    k = np.ceil((L - lap_cm) / (stock_cm - lap_cm)).astype(np.int64)
+    last = L + (k - 1) * lap_cm - (k - 1) * stock_cm
+    lengths = np.concatenate([length_cm[~long_], np.full(len(L), stock_cm), last])
+    counts = np.concatenate([count[~long_], c * (k - 1), c])
+    return lengths, counts
+
+
+def _demand(lengths_cm, counts):
+    """Group equal lengths; returns distinct lengths (descending) and counts."""
+    u, inv = np.unique(lengths_cm, return_inverse=True)
+    c = np.bincount(inv.ravel(), weights=counts).astype(np.int64)
+    keep = c > 0
+    return u[keep][::-1].copy(), c[keep][::-1].copy()
+
+
+# ==========================================
+# 2. CUTTING STOCK
+# ==========================================
+def _knapsack(lengths, values, bounds, capacity):
+    """
+    Bounded knapsack over integer lengths (cm): at most bounds[i] pieces of
+    lengths[i], total length <= capacity, maximizing the summed values.
+    Counts are split in powers of two, so each stage is one array step.
+    Returns (pieces per length, best value).
+    """
+    dp = np.full(capacity + 1, -np.inf)  # best value using exactly c cm
+    dp[0] = 0.0
+    stages = []
+    for i, (L, v, r) in enumerate(zip(lengths.tolist(), values.tolist(), bounds.tolist())):
+        r = min(int(r), capacity // L)
+        mult = 1
+        while r > 0:
+            m = min(mult, r)
+            w = m * L
+            cand = dp[:-w] + m * v
+            take = np.zeros(capacity + 1, dtype=bool)
+            take[w:] = cand > dp[w:] + 1e-12
+            dp = dp.copy()
+            dp[w:] = np.where(take[w:], cand, dp[w:])
+            stages.append((i, m, w, take))
+            r -= m
+            mult *= 2
+    c = int(np.argmax(dp))
+    best = float(dp[c])
+    pattern = np.zeros(len(lengths), dtype=np.int64)
+    for i, m, w, take in reversed(stages):
+        if take[c]:
+            pattern[i] += m
+            c -= w
+    return pattern, best
+
+
+def _heuristic(lengths, demand, stock):
+    """
+    Best-fit decreasing on grouped lengths; returns [(stock_cm, pattern, repeat)].
+    Bars are opened at the longest stock length, each piece goes to the open
+    bar with the least room left that still fits it, and finally every bar
+    is cut from the shortest stock length that holds its pieces.
+    """
+    S_max = stock[-1]
+    room = np.zeros(S_max + 1, dtype=np.int64)  # open bars per remaining room (cm)
+    by_room = [[] for _ in range(S_max + 1)]
+    bars = []  # per bar: pieces per length index
+    for i in np.argsort(-lengths, kind='stable').tolist():
+        L, d = int(lengths[i]), int(demand[i])
+        if L > S_max:
+            raise ValueError("A piece is longer than every stock length")
+        for r in (np.flatnonzero(room[L:]) + L).tolist():
+            while d and by_room[r]:
+                b = by_room[r].pop()
+                room[r] -= 1
+                k = min(r // L, d)
+                bars[b][i] = bars[b].get(i, 0) + k
+                d -= k
+                by_room[r - k * L].append(b)
+                room[r - k * L] += 1
+            if not d:
+                break
+        per_bar = S_max // L
+        while d:
+            k = min(per_bar, d)
+            bars.append({i: k})
+            by_room[S_max - k * L].append(len(bars) - 1)
+            room[S_max - k * L] += 1
+            d -= k
+
+    plan = {}
+    for b in bars:
+        used = sum(int(lengths[i]) * k for i, k in b.items())
+        S = next(S for S in stock if S >= used)
+        key = (S, tuple(sorted(b.items())))
+        plan[key] = plan.get(key, 0) + 1
+    out = []
+    for (S, items), repeat in plan.items():
+        pattern = np.zeros(len(lengths), dtype=np.int64)
+        for i, k in items:
+            pattern[i] = k
+        out.append((S, pattern, repeat))
+    return out
+
+
+def _column_generation(lengths, demand, stock, max_iter=500, time_limit=None):
+    """
+    LP relaxation of min total stock length s.t. demand is covered, by
+    revised simplex with knapsack pricing. Returns (lower bound in cm,
+    [(stock_cm, pattern, x)] of the basic patterns). The bound is the LP
+    value once no pattern prices out; if max_iter or time_limit (s) stops
+    the loop first it is the Farley bound z / max(value / S) of the best
+    iteration, which is still valid but can be weak.
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    m = len(lengths)
+    S0 = max(stock)
+    # Start from one homogeneous pattern per length: B is diagonal and feasible
+    cols = [(S0, np.eye(m, dtype=np.int64)[i] * (S0 // lengths[i])) for i in range(m)]
+    B = np.array([c[1] for c in cols], dtype=float).T
+    cost = np.array([float(c[0]) for c in cols])
+    bound = 0.0
+    for _ in range(max_iter):
+        x = np.linalg.solve(B, demand)
+        y = np.linalg.solve(B.T, cost)
+        if (y < -1e-9).any():
+            i = int(y.argmin())  # surplus column -e_i has reduced cost y_i
+            S, a, c = None, -np.eye(m)[i], 0.0
+        else:
+            # Pricing: the pattern of highest dual value per stock length
+            best, theta = None, 1.0
+            for S in stock:
+                pattern, value = _knapsack(lengths, y, np.full(m, S), S)
+                theta = max(theta, value / S)
+                if S - value < -1e-6 and (best is None or S - value < best[0]):
+                    best = (S - value, S, pattern)
+            bound = max(bound, float(cost @ x) / theta)
+            if best is None or deadline is not None and time.perf_counter() > deadline:
+                break
+            _, S, a = best
+            c = float(S)
+        u = np.linalg.solve(B, np.asarray(a, dtype=float))
+        pos = u > 1e-12
+        if not pos.any():
+            break
+        ratios = np.where(pos, x / np.where(pos, u, 1), np.inf)
+        r = int(ratios.argmin())
+        B[:, r] = a
+        cost[r] = c
+        cols[r] = (S, np.asarray(a, dtype=np.int64))
+    x = np.linalg.solve(B, demand)
+    basic = [(S, p, xi) for (S, p), xi in zip(cols, x) if S is not None and xi > 1e-9]
+    return bound, basic
+
+
+def cut_stock(lengths, counts, stock=STOCK_LENGTHS, exact=False, lap=0.0, time_limit=EXACT_TIME_LIMIT):
+    """
+    Cut pieces (lengths in m, counts) from stock bars of the given lengths.
+
+    Returns a dict: patterns [(stock_m, {piece_m: n}, repeat)], bars
+    {stock_m: n}, stock_m, demand_m, waste_m, waste_pct and, with
+    exact=True, lower_bound_m, gap_m and optimal. time_limit caps the LP
+    of exact=True in seconds (None: until converged or max_iter).
+    """
+    stock_cm = sorted({int(round(S * 100)) for S in stock})
+    L = np.ceil(np.asarray(lengths, dtype=float) * 100 - 1e-6).astype(np.int64)
+    L, c = _split(L, np.asarray(counts, dtype=np.int64), stock_cm[-1], int(math.ceil(lap * 100)))
+    L, demand = _demand(L, c)
+    out = {'demand_m': float((L * demand).sum()) / 100}
+    if not len(L):
+        plan = []
+    elif exact:
+        bound, basic = _column_generation(L, demand.astype(float), stock_cm, time_limit=time_limit)
+        # A stopped LP's Farley bound can fall below the length that has to be cut anyway
+        bound = max(bound, float((L * demand).sum()))
+        plan, remaining = [], demand.copy()
+        for S, p, xi in basic:
+            k = int(math.floor(xi + 1e-9))
+            if k:
+                plan.append((S, p, k))
+                remaining = np.maximum(remaining - p * k, 0)
+        plan += _heuristic(L, remaining, stock_cm) if remaining.any() else []
+        # An unconverged LP can round worse than the plain heuristic
+        fallback = _heuristic(L, demand, stock_cm)
+        total = sum(S * k for S, _, k in plan)
+        if sum(S * k for S, _, k in fallback) < total:
+            plan, total = fallback, sum(S * k for S, _, k in fallback)
+        out['lower_bound_m'] = bound / 100
+        out['gap_m'] = (total - _min_total(bound, stock_cm)) / 100
+        out['optimal'] = out['gap_m'] <= 1e-9
+    else:
+        plan = _heuristic(L, demand, stock_cm)
+
+    out['patterns'] = [(S / 100, {int(l) / 100: int(n) for l, n in zip(L, p) if n}, k) for S, p, k in plan]
+    bars = {}
+    for S, _, k in plan:
+        bars[S / 100] = bars.get(S / 100, 0) + k
+    out['bars'] = dict(sorted(bars.items()))
+    out['stock_m'] = sum(S * k for S, k in out['bars'].items())
+    out['waste_m'] = out['stock_m'] - out['demand_m']
+    out['waste_pct'] = 100 * out['waste_m'] / out['stock_m'] if out['stock_m'] else 0.0
+    return out
+
+
+def _min_total(lp_cm, stock_cm):
+    """Smallest sum of whole stock bars that is >= the LP bound."""
+    g = math.gcd(*stock_cm)
+    units = [S // g for S in stock_cm]
+    target = math.ceil((lp_cm - 1e-6) / g)
+    reach = np.zeros(target + max(units) + 1, dtype=bool)
+    reach[0] = True
+    for i in range(1, len(reach)):
+        reach[i] = any(i >= u and reach[i - u] for u in units)
+    return (target + int(np.argmax(reach[target:]))) * g
+
+
+# ==========================================
+# 3. BUILDING TAKEOFF
+# ==========================================
+def takeoff(Lx, Ly, bars, spacings, stock=STOCK_LENGTHS, exact=False, time_limit=EXACT_TIME_LIMIT, **piece_kw):
+    """
+    Full takeoff: pieces, summary per bar size and cutting plan per bar size.
+    Stock weights (what is bought) are added to each summary entry.
+    """
+    pieces = bar_pieces(Lx, Ly, bars, spacings, **piece_kw)
+    summary = summarize(pieces)
+    cutting = {}
+    for bar in summary:
+        p = pieces[pieces['bar'] == bar]
+        lap = LAP_DB * BAR_INFO[bar]['d_mm'] / 1000
+        cutting[bar] = cut_stock(p['length'], p['count'], stock, exact, lap, time_limit)
+        summary[bar]['stock_kg'] = bar_weight(bar, cutting[bar]['stock_m'])
+    return {'pieces': pieces, 'summary': summary, 'cutting': cutting}
+
+
+def takeoff_table(table, **kw):
+    """takeoff of a design_table / FloorGrid.table() array."""
+    return takeoff(table['Lx'], table['Ly'], table['bar'], table, **kw)
+
+
+# ==========================================
+# 4. COMMAND LINE
+# ==========================================
+def main(argv=None):
+    from .cli import _detect_format, parse_row, read_schedule
+
+    ap = argparse.ArgumentParser(prog="python -m twowayslab.takeoff", description=__doc__.split("\n\n")[0])
+    ap.add_argument("schedule", help="CSV or JSONL slab schedule")
+    ap.add_argument("--format", choices=("csv", "jsonl"), help="input format (default: from extension)")
+    ap.add_argument("--stock", default=",".join(f"{s:g}" for s in STOCK_LENGTHS), help="stock lengths in m")
+    ap.add_argument("--exact", action="store_true", help="LP-based cutting with optimality bound")
+    ap.add_argument("--time-limit", type=float, default=EXACT_TIME_LIMIT,
+                    help="seconds of LP per bar size with --exact (0: no limit)")
+    ap.add_argument("--json", help="write summary and cutting plans to this JSON file")
+    args = ap.parse_args(argv)
+
+    schedule = []
+    with open(args.schedule, newline='', encoding='utf-8-sig') as f:
+        for n, raw in enumerate(read_schedule(f, _detect_format(args.schedule, args.format)), 1):
+            try:
+                schedule.append(parse_row(raw))
+            except (ValueError, TypeError) as e:
+                print(f"row {n}: skipped ({e})", file=sys.stderr)
+    if not schedule:
+        return 0
+    table = design_table(*[[p[k] for p in schedule] for k in DESIGN_FIELDS])
+    stock = [float(s) for s in args.stock.split(",")]
+    res = takeoff_table(table, stock=stock, exact=args.exact, time_limit=args.time_limit or None)
+
+    print(f"{'Bar':<6}{'Pieces':>9}{'Length m':>11}{'Weight kg':>11}  {'Stock bars':<22}{'Waste %':>8}")
+    for bar, s in res['summary'].items():
+        cut = res['cutting'][bar]
+        bars = ", ".join(f"{n} x {S:g} m" for S, n in cut['bars'].items())
+        print(f"{bar:<6}{s['count']:>9}{s['length_m']:>11.1f}{s['weight_kg']:>11.1f}  {bars:<22}"
+              f"{cut['waste_pct']:>8.2f}" + ("" if not args.exact else "  optimal" if cut['optimal']
+                                              else f"  gap {cut['gap_m']:.2f} m"))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'summary': res['summary'], 'cutting': res['cutting']}, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
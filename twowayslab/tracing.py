@@ -0,0 +1,195 @@
+"""
+Per-stage timing instrumentation with Chrome trace export.
+
+The expensive steps of a report (design_batch and its coefficient
+interpolation, calculate_detailed, the matplotlib / SVG drawing,
+fig_to_base64 and generate_html_report) are wrapped with @traced. While a
+Tracer is active in the current thread, every call records a span with
+its wall time, the payload size of the result (drawings and HTML) and,
+with allocations=True, the memory it allocated (tracemalloc):
+
+    with Tracer(allocations=True) as tracer:
+        build_report(inputs)
+    tracer.summary()                       # per-stage totals
+    tracer.write_chrome_trace("trace.json")  # chrome://tracing, Perfetto
+
+With no active Tracer a wrapped call costs one thread-local lookup, so
+the instrumentation stays in place in production. span() times any other
+block the same way. The batch CLI writes traces with --trace; the report
+workers of parallel.generate_reports send theirs back to the parent.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class _State(threading.local):
+    tracer = None
+
+
+_state = _State()
+
+
+def current():
+    """The Tracer active in this thread, or None."""
+    return _state.tracer
+
+
+def _nbytes(value):
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return None
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start', 'mem0', 'peak')
+
+    def __init__(self, tracer, name, args):
+        self.tracer, self.name, self.args = tracer, name, args
+
+    def __enter__(self):
+        t = self.tracer
+        if t.allocations:
+            cur, peak = tracemalloc.get_traced_memory()
+            if t.stack:
+                t.stack[-1].peak = max(t.stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.mem0 = self.peak = cur
+        t.stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self.args
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        t = self.tracer
+        t.stack.pop()
+        if t.allocations:
+            cur, peak = tracemalloc.get_traced_memory()
+            peak = max(self.peak, peak)
+            self.args['alloc_bytes'] = cur - self.mem0
+            self.args['peak_bytes'] = peak - self.mem0
+            if t.stack:
+                t.stack[-1].peak = max(t.stack[-1].peak, peak)
+        t.events.append({'name': self.name, 'cat': 'twowayslab', 'ph': 'X', 'ts': self.start / 1000,
+                         'dur': (end - self.start) / 1000, 'pid': t.pid, 'tid': t.tid, 'args': self.args})
+        return False
+
+
+class _NullSpan:
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+def span(name, **args):
+    """Context manager timing a block under the current Tracer (no-op without one)."""
+    tracer = _state.tracer
+    return _NULL if tracer is None else _Span(tracer, name, args)
+
+
+def traced(name=None, payload=False):
+    """
+    Decorator recording each call as a span named `name` (default: the
+    function name). With payload=True the size of a str/bytes result is
+    stored as payload_bytes.
+    """
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kw):
+            tracer = _state.tracer
+            if tracer is None:
+                return fn(*args, **kw)
+            with _Span(tracer, label, {}) as info:
+                out = fn(*args, **kw)
+                if payload:
+                    info['payload_bytes'] = _nbytes(out)
+                return out
+        return wrapper
+    return wrap
+
+
+class Tracer:
+    """
+    Records spans of the thread that enters it. Spans are Chrome trace
+    "complete" events (times in microseconds) in self.events.
+    """
+
+    def __init__(self, allocations=False):
+        self.allocations = allocations
+        self.events = []
+        self.stack = []
+        self.pid = os.getpid()
+        self.tid = None
+        self._prev = None
+        self._own_tracemalloc = False
+
+    def __enter__(self):
+        self.tid = threading.get_ident()
+        self._prev, _state.tracer = _state.tracer, self
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracemalloc = True
+        return self
+
+    def __exit__(self, *exc):
+        _state.tracer = self._prev
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+            self._own_tracemalloc = False
+        return False
+
+    def take(self):
+        """Remove and return the recorded events (e.g. to ship them to another process)."""
+        events, self.events = self.events, []
+        return events
+
+    def summary(self):
+        """Per-stage totals, slowest first: count, total/mean/max ms, bytes."""
+        out = {}
+        for e in self.events:
+            s = out.setdefault(e['name'], {'stage': e['name'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                           'alloc_bytes': 0, 'peak_bytes': 0, 'payload_bytes': 0})
+            ms = e['dur'] / 1000
+            s['count'] += 1
+            s['total_ms'] += ms
+            s['max_ms'] = max(s['max_ms'], ms)
+            a = e['args']
+            s['alloc_bytes'] += a.get('alloc_bytes', 0)
+            s['peak_bytes'] = max(s['peak_bytes'], a.get('peak_bytes', 0))
+            s['payload_bytes'] += a.get('payload_bytes') or 0
+        rows = sorted(out.values(), key=lambda s: -s['total_ms'])
+        for s in rows:
+            s['mean_ms'] = s['total_ms'] / s['count']
+        return rows
+
+    def chrome_trace(self):
+        """The events as a Chrome trace (JSON object format)."""
+        names = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': f"twowayslab {pid}"}}
+                 for pid in sorted({e['pid'] for e in self.events})]
+        return {'traceEvents': names + self.events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def format_summary(rows):
+    """Plain-text table of summary() rows."""
+    lines = [f"{'Stage':<30}{'Calls':>8}{'Total ms':>12}{'Mean ms':>10}{'Max ms':>10}{'Alloc kB':>11}"
+             f"{'Payload kB':>12}"]
+    for s in rows:
+        lines.append(f"{s['stage']:<30}{s['count']:>8}{s['total_ms']:>12.1f}{s['mean_ms']:>10.3f}"
+                     f"{s['max_ms']:>10.2f}{s['alloc_bytes'] / 1024:>11.1f}{s['payload_bytes'] / 1024:>12.1f}")
+    return "\n".join(lines)